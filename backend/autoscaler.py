@@ -0,0 +1,226 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+import config
+from models import AutoscalePolicy, AutoscaleStatus, ClusterUtilization, SparkWorkerMetrics
+from cluster_manager import ClusterManager, worker_service_name
+from job_manager import Job, JobManager
+from capacity import PlacementError
+from status_cache import StatusCache
+
+
+def decide(policy: AutoscalePolicy, utilization: Optional[ClusterUtilization], worker_count: int,
+           since_last_scale: Optional[float]) -> tuple[str, int, str]:
+    """Return (action, target worker count, reason) where action is up, down or hold"""
+    if worker_count < policy.min_workers:
+        return "up", policy.min_workers, f"below the minimum of {policy.min_workers} worker(s)"
+    if worker_count > policy.max_workers:
+        return "down", worker_count - 1, f"above the maximum of {policy.max_workers} worker(s)"
+    if utilization is None or utilization.state == "unreachable":
+        return "hold", worker_count, "no metrics from the Spark master"
+
+    def cooling_down(cooldown: float) -> bool:
+        return since_last_scale is not None and since_last_scale < cooldown
+
+    if utilization.waiting_applications or utilization.core_utilization >= policy.scale_up_utilization:
+        if worker_count >= policy.max_workers:
+            return "hold", worker_count, f"saturated but already at the maximum of {policy.max_workers} worker(s)"
+        if cooling_down(policy.scale_up_cooldown):
+            return "hold", worker_count, "saturated but scale-up cooldown is active"
+        target = min(worker_count + policy.scale_up_step, policy.max_workers)
+        return "up", target, (f"{utilization.cores_used}/{utilization.cores_total} cores in use, "
+                              f"{utilization.waiting_applications} waiting application(s)")
+
+    if utilization.core_utilization <= policy.scale_down_utilization:
+        if worker_count <= policy.min_workers:
+            return "hold", worker_count, "idle at the minimum worker count"
+        if cooling_down(policy.scale_down_cooldown):
+            return "hold", worker_count, "idle but scale-down cooldown is active"
+        return "down", worker_count - 1, (f"{utilization.cores_used}/{utilization.cores_total} cores in use, "
+                                          f"below {policy.scale_down_utilization:.0%}")
+
+    return "hold", worker_count, "utilization within thresholds"
+
+
+def find_worker(utilization: Optional[ClusterUtilization], ui_port: int) -> Optional[SparkWorkerMetrics]:
+    """The master's record of the worker whose UI is on ``ui_port``; each spark-worker-N has its own"""
+    if not utilization:
+        return None
+    matches = [w for w in utilization.workers
+               if w.state != "DEAD" and w.ui_url and urlparse(w.ui_url).port == ui_port]
+    # A recreated worker re-registers under a new ID; the latest heartbeat wins
+    return max(matches, key=lambda w: w.last_heartbeat or 0, default=None)
+
+
+class Autoscaler:
+    """Adds and removes worker services according to an AutoscalePolicy.
+
+    Decisions are driven by the Spark utilization attached to the status
+    cache. Scale-ups append workers shaped like ``policy.worker``.
+    Scale-downs only ever remove the highest-numbered worker: it is first
+    decommissioned on the master so no new executors land on it, and the
+    service is removed once its last executor is gone. Scaling runs as a
+    cluster job, so it queues behind configuration changes made by users.
+    """
+
+    def __init__(self, cluster_manager: ClusterManager, status_cache: StatusCache,
+                 job_manager: JobManager, log: Callable[[str], None]):
+        self.cluster_manager = cluster_manager
+        self.status_cache = status_cache
+        self.job_manager = job_manager
+        self.log = log
+        self.policy = self._load_policy()
+        self.cluster_manager.warm_pool_shape = self.policy.worker
+        self.draining: Optional[int] = None
+        self.last_scaled_at: Optional[float] = None
+        self.last_scaled_wall: Optional[datetime] = None
+        self.last_decision: Optional[str] = None
+        self.last_decision_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_policy(self) -> AutoscalePolicy:
+        try:
+            with open(self.cluster_manager.layout.autoscale_policy_file, 'r') as f:
+                return AutoscalePolicy(**json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading autoscale policy, using defaults: {e}")
+        return AutoscalePolicy(
+            enabled=config.AUTOSCALE_ENABLED,
+            min_workers=config.AUTOSCALE_MIN_WORKERS,
+            max_workers=config.AUTOSCALE_MAX_WORKERS
+        )
+
+    def set_policy(self, policy: AutoscalePolicy):
+        """Replace and persist the policy"""
+        self.policy = policy
+        # Pooled workers take effect at the next compose regeneration
+        self.cluster_manager.warm_pool_shape = policy.worker
+        with open(self.cluster_manager.layout.autoscale_policy_file, 'w') as f:
+            json.dump(policy.model_dump(), f, indent=2)
+        self.log(f"Autoscaler {'enabled' if policy.enabled else 'disabled'}: "
+                 f"{policy.min_workers}-{policy.max_workers} worker(s) of "
+                 f"{policy.worker.memory}/{policy.worker.cores} core(s)")
+
+    def status(self) -> AutoscaleStatus:
+        return AutoscaleStatus(
+            policy=self.policy,
+            draining=worker_service_name(self.draining) if self.draining else None,
+            last_decision=self.last_decision,
+            last_decision_at=self.last_decision_at.isoformat() if self.last_decision_at else None,
+            last_scaled_at=self.last_scaled_wall.isoformat() if self.last_scaled_wall else None
+        )
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(config.AUTOSCALE_INTERVAL)
+            try:
+                await self.evaluate()
+            except Exception as e:
+                print(f"Error evaluating autoscale policy: {e}")
+
+    def _record(self, message: str):
+        """Log a decision to the cluster log, skipping repeats of the previous one"""
+        self.last_decision_at = datetime.now()
+        if message != self.last_decision:
+            self.last_decision = message
+            self.log(f"Autoscaler: {message}")
+
+    async def evaluate(self):
+        """Take one scaling decision based on the latest status snapshot"""
+        snapshot = self.status_cache.snapshot
+        current = self.cluster_manager.config
+        if not self.policy.enabled or not snapshot or not snapshot.running or not current:
+            return
+        # Let user-initiated and earlier scaling jobs finish first
+        if self.job_manager.is_busy(self.cluster_manager.layout.cluster_id):
+            return
+
+        workers = current.get_worker_configs()
+        utilization = self.status_cache.utilization
+        if self.draining:
+            await self._continue_drain(workers, utilization)
+            return
+
+        since = time.monotonic() - self.last_scaled_at if self.last_scaled_at else None
+        action, target, reason = decide(self.policy, utilization, len(workers), since)
+        if action == "up":
+            added = target - len(workers)
+            scaled = workers + [self.policy.worker.model_copy() for _ in range(added)]
+            # Never shrink shapes here: an autoscaled worker either fits as configured or is not added
+            mode = "off" if config.PLACEMENT_MODE == "off" else "reject"
+            try:
+                self.cluster_manager.check_placement(current.model_copy(update={"workers": scaled}), mode=mode)
+            except PlacementError:
+                self._record(f"holding at {len(workers)} worker(s): saturated, but another worker would not fit on the host")
+                return
+            self._record(f"scaling up to {target} worker(s): {reason}")
+            self._scale(scaled)
+        elif action == "down":
+            self._record(f"scaling down to {target} worker(s): {reason}")
+            await self._start_drain(len(workers), utilization)
+        else:
+            self._record(f"holding at {len(workers)} worker(s): {reason}")
+
+    async def _start_drain(self, index: int, utilization: Optional[ClusterUtilization]):
+        name = worker_service_name(index)
+        worker = find_worker(utilization, self.cluster_manager.layout.worker_ui_port(index))
+        if not worker:
+            self._record(f"{name} is not registered with the master, removing it")
+            self._scale(self.cluster_manager.config.get_worker_configs()[:index - 1])
+            return
+        if not await self.status_cache.spark_metrics.decommission_worker(worker.host):
+            # Without decommissioning, executors would keep landing on the worker
+            self.last_scaled_at = time.monotonic()
+            self._record(f"could not decommission {name}, keeping it")
+            return
+        self.draining = index
+        self._record(f"draining {name} ({worker.executors} executor(s) running)")
+
+    async def _continue_drain(self, workers: List, utilization: Optional[ClusterUtilization]):
+        name = worker_service_name(self.draining)
+        if len(workers) != self.draining:
+            # The worker list was changed by hand while draining
+            self._record(f"cancelled draining {name}: worker configuration changed")
+            self.draining = None
+            return
+        worker = find_worker(utilization, self.cluster_manager.layout.worker_ui_port(self.draining))
+        if worker and worker.executors:
+            self._record(f"waiting for {name} to finish {worker.executors} executor(s)")
+            return
+        self._record(f"{name} has no executors left, retiring it")
+        self.draining = None
+        self._scale(workers[:-1])
+
+    def _scale(self, workers: List):
+        """Apply a new worker list as a cluster job"""
+        cluster_config = self.cluster_manager.config.model_copy(update={"workers": workers})
+        self.last_scaled_at = time.monotonic()
+        self.last_scaled_wall = datetime.now()
+
+        async def run(job: Job) -> tuple[bool, str]:
+            # The cluster may have been stopped while the job waited in the queue
+            status = await self.cluster_manager.get_cluster_status()
+            if not status.running:
+                message = f"cluster is not running, skipped scaling to {len(workers)} worker(s)"
+                self._record(message)
+                return True, message
+            success, message = await self.cluster_manager.update_cluster_config(cluster_config, job.report)
+            self.log(f"Autoscaler: {message}")
+            self.status_cache.invalidate()
+            return success, message
+
+        self.job_manager.submit("autoscale", run, cluster_id=self.cluster_manager.layout.cluster_id)
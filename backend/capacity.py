@@ -0,0 +1,131 @@
+import math
+import os
+import re
+from typing import List, Optional
+import config
+from models import HostCapacity, WorkerConfig
+from docker_client import DockerClient
+
+
+MEMORY_PATTERN = re.compile(r"^\s*(\d+)\s*([kmgt]?)b?\s*$", re.IGNORECASE)
+MEMORY_UNITS_MB = {"k": 1 / 1024, "": 1, "m": 1, "g": 1024, "t": 1024 * 1024}
+# Smallest worker the "scale" placement mode will shrink to
+MIN_WORKER_MEMORY_MB = 512
+
+
+class PlacementError(ValueError):
+    """Raised when a cluster configuration does not fit on the host"""
+
+
+def parse_memory_mb(value: str) -> int:
+    """Convert a Spark memory string ("512m", "2g") to megabytes"""
+    match = MEMORY_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid memory size: {value!r}")
+    return int(int(match.group(1)) * MEMORY_UNITS_MB[match.group(2).lower()])
+
+
+def format_memory(mb: int) -> str:
+    return f"{mb // 1024}g" if mb % 1024 == 0 else f"{mb}m"
+
+
+def detect_host_capacity(docker: Optional[DockerClient] = None) -> HostCapacity:
+    """Capacity of the Docker host: env overrides, then the daemon, then this machine.
+
+    The daemon's view matters on Docker Desktop, where containers run in a
+    VM that is smaller than the machine running the backend.
+    """
+    if config.HOST_CPUS and config.HOST_MEMORY:
+        return HostCapacity(cpus=int(config.HOST_CPUS), memory_mb=parse_memory_mb(config.HOST_MEMORY),
+                            source="env")
+    if docker and docker.available():
+        try:
+            info = docker.info()
+            return HostCapacity(cpus=info["NCPU"], memory_mb=info["MemTotal"] // (1024 * 1024), source="docker")
+        except Exception as e:
+            print(f"Error reading host capacity from Docker, using local capacity: {e}")
+    memory_mb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    return HostCapacity(cpus=os.cpu_count() or 1, memory_mb=memory_mb, source="host")
+
+
+def worker_memory_limit_mb(worker: WorkerConfig) -> int:
+    """Container memory for a worker: executor heap plus off-heap overhead plus the worker daemon.
+
+    A tmpfs for local dirs is memory too, and counts against the same limit.
+    """
+    memory = parse_memory_mb(worker.memory)
+    overhead = max(parse_memory_mb(config.WORKER_MEMORY_OVERHEAD_MIN),
+                   math.ceil(memory * config.WORKER_MEMORY_OVERHEAD_FRACTION))
+    scratch = 0
+    if worker.local_dirs and worker.local_dirs.type == "tmpfs":
+        scratch = parse_memory_mb(worker.local_dirs.size)
+    return memory + overhead + parse_memory_mb(config.WORKER_DAEMON_MEMORY) + scratch
+
+
+def available_resources(host: HostCapacity) -> tuple[int, int]:
+    """Whole cores and megabytes left for workers after the reserved headroom"""
+    cpus = max(0, math.floor(host.cpus - config.RESERVED_CPUS))
+    memory = max(0, host.memory_mb - parse_memory_mb(config.RESERVED_MEMORY))
+    return cpus, memory
+
+
+def required_resources(workers: List[WorkerConfig]) -> tuple[int, int]:
+    return sum(w.cores for w in workers), sum(worker_memory_limit_mb(w) for w in workers)
+
+
+def fit_workers(workers: List[WorkerConfig], host: HostCapacity,
+                mode: str) -> tuple[List[WorkerConfig], List[str]]:
+    """Check workers against the host; returns the workers to use and notes on any changes.
+
+    In "reject" mode a config that does not fit raises PlacementError. In
+    "scale" mode cores and memory are shrunk proportionally, keeping each
+    worker at one core and 512 MB or more.
+    """
+    if mode == "off":
+        return workers, []
+    cpus, memory = available_resources(host)
+    need_cpus, need_memory = required_resources(workers)
+    if need_cpus <= cpus and need_memory <= memory:
+        return workers, []
+
+    shortfall = (f"{len(workers)} worker(s) need {need_cpus} core(s) and {format_memory(need_memory)}, "
+                 f"but only {cpus} core(s) and {format_memory(memory)} are available after reserving "
+                 f"{config.RESERVED_CPUS:g} core(s) and {config.RESERVED_MEMORY} for the master and Jupyter")
+    if mode != "scale":
+        raise PlacementError(shortfall)
+
+    scaled = [w.model_copy() for w in workers]
+    if need_cpus > cpus:
+        factor = cpus / need_cpus
+        for w in scaled:
+            w.cores = max(1, math.floor(w.cores * factor))
+    if need_memory > memory:
+        factor = 1.0
+        while required_resources(scaled)[1] > memory and factor > 0:
+            factor -= 0.05
+            for w, original in zip(scaled, workers):
+                mb = max(MIN_WORKER_MEMORY_MB, math.floor(parse_memory_mb(original.memory) * factor / 128) * 128)
+                w.memory = format_memory(mb)
+
+    need_cpus, need_memory = required_resources(scaled)
+    if need_cpus > cpus or need_memory > memory:
+        raise PlacementError(f"{shortfall}; even the smallest worker shapes do not fit")
+    notes = [f"Scaled worker-{i} from {o.memory}/{o.cores} core(s) to {w.memory}/{w.cores} core(s) to fit the host"
+             for i, (o, w) in enumerate(zip(workers, scaled), 1) if o != w]
+    return scaled, notes
+
+
+def assign_cpusets(workers: List[WorkerConfig], host: HostCapacity) -> List[Optional[str]]:
+    """Pin workers to disjoint CPUs after the ones left to the master and Jupyter.
+
+    Returns None for every worker when pinning is disabled or the workers
+    would need more CPUs than the host has.
+    """
+    first = math.ceil(config.RESERVED_CPUS)
+    if not config.PIN_WORKER_CPUS or first + sum(w.cores for w in workers) > host.cpus:
+        return [None] * len(workers)
+    cpusets = []
+    for w in workers:
+        cpusets.append(f"{first}-{first + w.cores - 1}" if w.cores > 1 else str(first))
+        first += w.cores
+    return cpusets
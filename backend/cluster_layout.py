@@ -0,0 +1,174 @@
+import re
+import socket
+from pathlib import Path
+from typing import Iterable, Optional
+import config
+from models import ClusterPorts
+
+
+CLUSTER_ID_PATTERN = re.compile(r"^[a-z][a-z0-9-]{0,23}$")
+# Offsets of each service's host port in a named cluster's block; workers come after WORKER_UI_OFFSET
+PORT_OFFSETS = {"master": 0, "master_ui": 1, "jupyter": 2, "history": 3, "connect": 4, "connect_ui": 5}
+WORKER_UI_OFFSET = 10
+
+
+class ClusterError(ValueError):
+    """Raised for invalid or unknown cluster IDs, and when no port block is free"""
+
+
+def default_ports() -> ClusterPorts:
+    """The default cluster's fixed ports"""
+    return ClusterPorts(
+        master=config.SPARK_MASTER_PORT,
+        master_ui=config.SPARK_MASTER_WEBUI_PORT,
+        jupyter=config.JUPYTER_PORT,
+        history=config.HISTORY_SERVER_PORT,
+        connect=config.SPARK_CONNECT_PORT,
+        connect_ui=config.SPARK_CONNECT_UI_PORT,
+        worker_ui_base=config.WORKER_UI_BASE_PORT
+    )
+
+
+def port_in_use(port: int) -> bool:
+    """Whether something on this host already listens on ``port``"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("", port))
+        except OSError:
+            return True
+    return False
+
+
+class PortAllocator:
+    """Hands out blocks of ``CLUSTER_PORT_BLOCK_SIZE`` host ports to named clusters.
+
+    Block k starts at ``CLUSTER_PORT_RANGE_START + k * CLUSTER_PORT_BLOCK_SIZE``.
+    The master, its UI, Jupyter, the history and Spark Connect servers take
+    the first ports of a block and worker UIs the rest, so clusters never
+    share a port. Blocks held by another cluster, or with a service port
+    already bound on the host, are skipped.
+    """
+
+    def __init__(self, start: Optional[int] = None, block_size: Optional[int] = None):
+        self.start = start or config.CLUSTER_PORT_RANGE_START
+        self.block_size = block_size or config.CLUSTER_PORT_BLOCK_SIZE
+
+    def block(self, base: int) -> ClusterPorts:
+        return ClusterPorts(
+            **{name: base + offset for name, offset in PORT_OFFSETS.items()},
+            worker_ui_base=base + WORKER_UI_OFFSET
+        )
+
+    def allocate(self, taken: Iterable[ClusterPorts]) -> ClusterPorts:
+        taken_bases = {ports.master for ports in taken}
+        for k in range(config.MAX_CLUSTERS):
+            base = self.start + k * self.block_size
+            if base in taken_bases:
+                continue
+            ports = self.block(base)
+            if any(port_in_use(getattr(ports, name)) for name in PORT_OFFSETS):
+                continue
+            return ports
+        raise ClusterError(f"No free block of {self.block_size} ports from {self.start}")
+
+
+class ClusterLayout:
+    """Where one named cluster lives: its compose project, files and host ports.
+
+    The default cluster keeps the original layout: docker-compose.yml at the
+    repository root, its state directly under ``.playground/`` and the
+    fixed ports. Every other cluster gets ``CLUSTERS_DIR/<id>/``, a compose
+    project (and so a network) named ``<project>-<id>``, containers
+    prefixed with its ID and the ports it was allocated. Compose files are
+    always run from the repository root, so their relative paths resolve
+    the same wherever the file is.
+    """
+
+    def __init__(self, cluster_id: str = config.DEFAULT_CLUSTER_ID, ports: Optional[ClusterPorts] = None):
+        self.cluster_id = cluster_id
+        self.is_default = cluster_id == config.DEFAULT_CLUSTER_ID
+        self.ports = ports or default_ports()
+        if self.is_default:
+            self.project = config.COMPOSE_PROJECT_NAME
+            self.compose_file = config.DOCKER_COMPOSE_FILE
+            self.state_dir = config.STATE_DIR
+            self.state_file = config.CLUSTER_STATE_FILE
+            self.spark_conf_dir = config.SPARK_CONF_DIR
+            self.events_dir = config.SPARK_EVENTS_DIR
+            self.kernel_stats_dir = config.KERNEL_STATS_DIR
+            self.autoscale_policy_file = config.AUTOSCALE_POLICY_FILE
+            self.shared_tables_file = config.SHARED_TABLES_FILE
+        else:
+            self.project = f"{config.COMPOSE_PROJECT_NAME}-{cluster_id}"
+            self.state_dir = config.CLUSTERS_DIR / cluster_id
+            self.compose_file = self.state_dir / "docker-compose.yml"
+            self.state_file = self.state_dir / "cluster-state.json"
+            self.spark_conf_dir = self.state_dir / "spark-conf"
+            self.events_dir = self.state_dir / "spark-events"
+            self.kernel_stats_dir = self.state_dir / "kernels"
+            self.autoscale_policy_file = self.state_dir / "autoscale.json"
+            self.shared_tables_file = self.state_dir / "shared-tables.json"
+
+    def create_dirs(self):
+        for path in [self.state_dir, self.spark_conf_dir, self.events_dir, self.kernel_stats_dir]:
+            path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def max_workers(self) -> int:
+        """Workers (warm pool included) whose UI ports fit in the cluster's block"""
+        if self.is_default:
+            # Worker UIs count up from 8081 and stop below the next fixed port, Jupyter's 8888 by default
+            base = self.ports.worker_ui_base
+            fixed = [port for port in self.ports.model_dump().values() if port > base]
+            fixed += [port for port in (config.BACKEND_PORT, config.CLUSTER_PORT_RANGE_START) if port > base]
+            return max(0, min(fixed) - base - 1)
+        return config.CLUSTER_PORT_BLOCK_SIZE - WORKER_UI_OFFSET - 1
+
+    def container_name(self, service: str) -> str:
+        """Container names are global to the Docker host, so named clusters prefix theirs"""
+        return service if self.is_default else f"{self.cluster_id}-{service}"
+
+    def worker_ui_port(self, index: int) -> int:
+        return self.ports.worker_ui_base + index
+
+    def worker_index(self, port: Optional[int]) -> Optional[int]:
+        """The worker whose UI is on ``port``, if any"""
+        if port is None or port <= self.ports.worker_ui_base:
+            return None
+        return port - self.ports.worker_ui_base
+
+    def host_path(self, path: Path) -> str:
+        """``path`` as a compose volume source, relative to the repository root"""
+        return f"./{path.relative_to(config.BASE_DIR).as_posix()}"
+
+    def _url(self, default: str, url: str) -> str:
+        # The default cluster's URLs can be overridden from the environment
+        return default if self.is_default else url
+
+    @property
+    def master_url(self) -> str:
+        return self._url(config.SPARK_MASTER_URL, f"spark://localhost:{self.ports.master}")
+
+    @property
+    def master_ui_url(self) -> str:
+        return self._url(config.SPARK_MASTER_UI_URL, f"http://localhost:{self.ports.master_ui}")
+
+    @property
+    def metrics_url(self) -> str:
+        return self._url(config.SPARK_METRICS_URL, self.master_ui_url)
+
+    @property
+    def jupyter_url(self) -> str:
+        return self._url(config.JUPYTER_URL, f"http://localhost:{self.ports.jupyter}")
+
+    @property
+    def history_url(self) -> str:
+        return self._url(config.HISTORY_SERVER_URL, f"http://localhost:{self.ports.history}")
+
+    @property
+    def connect_url(self) -> str:
+        return self._url(config.SPARK_CONNECT_URL, f"sc://localhost:{self.ports.connect}")
+
+    @property
+    def connect_ui_url(self) -> str:
+        return self._url(config.SPARK_CONNECT_UI_URL, f"http://localhost:{self.ports.connect_ui}")
@@ -1,157 +1,473 @@
-import subprocess
-import os
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 import config
-from models import ClusterConfig, ClusterStatus, WorkerConfig
+import metrics
+from models import ClusterConfig, ClusterState, ClusterStatus, HostCapacity, StartupTimeline, WorkerConfig
+from docker_client import DockerClient
+from capacity import PlacementError, assign_cpusets, detect_host_capacity, fit_workers, required_resources
+from spark_tuning import render_spark_defaults, warmup_settings
+from readiness import ReadinessProbe
+from cluster_layout import ClusterLayout
+import compose_model
+from compose_model import worker_service_name
+
+
+ProgressCallback = Callable[[str], None]
+OutputCallback = Callable[[str, str], None]  # (line, level)
+
+
+def diff_worker_configs(old: List[WorkerConfig],
+                        new: List[WorkerConfig]) -> tuple[List[int], List[int], List[int]]:
+    """Compare two worker lists and return (added, removed, changed) worker indices (1-based)"""
+    added = list(range(len(old) + 1, len(new) + 1))
+    removed = list(range(len(new) + 1, len(old) + 1))
+    changed = [i for i in range(1, min(len(old), len(new)) + 1) if old[i - 1] != new[i - 1]]
+    return added, removed, changed
+
+
+def worker_image() -> str:
+    """Worker image tag derived from the Dockerfile, so edits to it produce a new image"""
+    digest = hashlib.sha256(config.WORKER_DOCKERFILE.read_bytes()).hexdigest()[:12]
+    return f"{config.WORKER_IMAGE_NAME}:{digest}"
 
 
 class ClusterManager:
     """Manages Spark cluster configuration and lifecycle"""
     
-    def __init__(self):
+    def __init__(self, layout: Optional[ClusterLayout] = None):
+        # Compose project, files and ports of the cluster; the default cluster unless given
+        self.layout = layout or ClusterLayout()
         self.config: Optional[ClusterConfig] = None
         self.is_running = False
+        self.docker = DockerClient()
+        self._host_capacity: Optional[HostCapacity] = None
+        # Shape of pooled workers; set from the autoscaler's worker template
+        self.warm_pool_shape: Optional[WorkerConfig] = None
+        # Receives docker-compose output lines, e.g. to show them in the cluster log
+        self.output_sink: Optional[OutputCallback] = None
+        # Readiness of the last start; status_listener is told whenever it changes
+        self.readiness = ReadinessProbe(self.layout.master_url, self.layout.metrics_url, self.layout.jupyter_url,
+                                        self.layout.ports.worker_ui_base)
+        self.startup: Optional[StartupTimeline] = None
+        self.status_listener: Optional[Callable[[], None]] = None
+        # Workers of the other clusters on this host, which placement leaves room for; set by the registry
+        self.neighbour_workers: Optional[Callable[[], List[WorkerConfig]]] = None
+
+    def host_capacity(self) -> HostCapacity:
+        """Detect the Docker host's capacity once and reuse it"""
+        if self._host_capacity is None:
+            self._host_capacity = detect_host_capacity(self.docker)
+            print(f"Host capacity: {self._host_capacity.cpus} CPUs, "
+                  f"{self._host_capacity.memory_mb} MB ({self._host_capacity.source})")
+        return self._host_capacity
+
+    def check_placement(self, cluster_config: ClusterConfig,
+                        mode: Optional[str] = None) -> tuple[ClusterConfig, List[str]]:
+        """Fit the config's workers on the host; raises PlacementError if they can't be placed"""
+        workers = cluster_config.get_worker_configs()
+        if len(workers) + len(self.warm_pool_workers(len(workers))) > self.layout.max_workers:
+            raise PlacementError(f"Cluster {self.layout.cluster_id} has ports for at most "
+                                 f"{self.layout.max_workers} worker(s), warm pool included")
+        host = self.host_capacity()
+        neighbours = self.neighbour_workers() if self.neighbour_workers else []
+        if neighbours:
+            cpus, memory = required_resources(neighbours)
+            host = host.model_copy(update={"cpus": max(0, host.cpus - cpus),
+                                           "memory_mb": max(0, host.memory_mb - memory)})
+        try:
+            workers, notes = fit_workers(workers, host, mode or config.PLACEMENT_MODE)
+        except PlacementError as e:
+            if not neighbours:
+                raise
+            raise PlacementError(f"{e} ({len(neighbours)} worker(s) of other running clusters share the host)")
+        return cluster_config.model_copy(update={"workers": workers}), notes
         
+    def render_compose(self, cluster_config: ClusterConfig) -> str:
+        """Render docker-compose.yml for a config without writing it"""
+        worker_configs = cluster_config.get_worker_configs()
+        pool = self.warm_pool_workers(len(worker_configs))
+        doc = compose_model.build_compose(
+            compose_model.load_base(),
+            self.layout,
+            worker_configs,
+            self.cpusets(worker_configs),
+            worker_image(),
+            pool,
+            # Pool slots get the CPUs they will keep once they become active
+            self.cpusets(worker_configs + pool)[len(worker_configs):],
+            shuffle_service=cluster_config.shuffle_service,
+            history_server=cluster_config.history_server,
+            connect_server=cluster_config.connect_server
+        )
+        return compose_model.render(doc)
+
+    def cpusets(self, workers: List[WorkerConfig]) -> List[Optional[str]]:
+        """CPUs to pin each worker to; only the default cluster pins, as pinned clusters would overlap"""
+        if not self.layout.is_default:
+            return [None] * len(workers)
+        return assign_cpusets(workers, self.host_capacity())
+
     def generate_docker_compose(self, cluster_config: ClusterConfig) -> bool:
-        """Generate docker-compose.yml from template with worker nodes"""
+        """Write docker-compose.yml for the config and record it in the state file"""
         try:
-            # Read template
-            with open(config.DOCKER_COMPOSE_TEMPLATE, 'r') as f:
-                template = f.read()
-            
-            # Get worker configurations
-            worker_configs = cluster_config.get_worker_configs()
-            
-            # Generate worker services
-            workers_config = []
-            # print(worker_configs)
-            for i, worker_cfg in enumerate(worker_configs, 1):
-                port = 8080 + i
-                worker_service = f"""
-  spark-worker-{i}:
-    build:
-      context: .
-      dockerfile: docker/Dockerfile.spark-worker
-    container_name: spark-worker-{i}
-    hostname: spark-worker-{i}
-    ports:
-      - "{port}:{port}"
-    networks:
-      - spark-network
-    environment:
-      - SPARK_MODE=worker
-      - SPARK_MASTER_URL=spark://spark-master:7077
-      - SPARK_WORKER_MEMORY={worker_cfg.memory}
-      - SPARK_WORKER_CORES={worker_cfg.cores}
-      - SPARK_WORKER_WEBUI_PORT={port}
-      - SPARK_PUBLIC_DNS=localhost
-    depends_on:
-      - spark-master
-"""
-                workers_config.append(worker_service)
-            
-            # Replace placeholder with workers
-            workers_yaml = "\n".join(workers_config) if workers_config else "  # No workers configured"
-            final_config = template.replace("{{WORKERS}}", workers_yaml)
-            
-            # Write docker-compose.yml
-            with open(config.DOCKER_COMPOSE_FILE, 'w') as f:
-                f.write(final_config)
-            
+            text = self.render_compose(cluster_config)
+            self.layout.create_dirs()
+            with open(self.layout.compose_file, 'w') as f:
+                f.write(text)
+            self.write_spark_defaults(cluster_config)
+            self._prepare_local_dirs(cluster_config.get_worker_configs() + self.warm_pool_workers(0))
+            self._make_shared_dir(self.layout.events_dir)
+            self._make_shared_dir(self.layout.kernel_stats_dir)
             self.config = cluster_config
-            print(f"Generated docker-compose.yml with {len(worker_configs)} workers")
+            self._save_state(compose_model.content_hash(text))
+
+            worker_configs = cluster_config.get_worker_configs()
+            metrics.COMPOSE_REGENERATIONS.labels("success").inc()
+            print(f"Generated {self.layout.compose_file.name} for cluster {self.layout.cluster_id} "
+                  f"with {len(worker_configs)} workers")
             for i, wcfg in enumerate(worker_configs, 1):
                 print(f"  Worker-{i}: {wcfg.memory} memory, {wcfg.cores} cores")
             return True
             
         except Exception as e:
+            metrics.COMPOSE_REGENERATIONS.labels("error").inc()
             print(f"Error generating docker-compose: {e}")
             import traceback
             traceback.print_exc()
             return False
-    
-    def start_cluster(self) -> tuple[bool, str]:
-        """Start the Spark cluster using docker-compose"""
+
+    def _prepare_local_dirs(self, workers: List[WorkerConfig]):
+        """Create host directories used as local dirs, writable by the container's spark user"""
+        for i, worker_cfg in enumerate(workers, 1):
+            if not worker_cfg.local_dirs or worker_cfg.local_dirs.type != "host":
+                continue
+            # Relative paths resolve against the compose file's directory, as docker-compose does
+            self._make_shared_dir(config.BASE_DIR / worker_cfg.local_dirs.path
+                                  / self.layout.container_name(worker_service_name(i)))
+
+    def _make_shared_dir(self, path: Path):
+        """Create a bind-mounted host directory that any container user can write to"""
         try:
-            # Change to project directory
-            os.chdir(config.BASE_DIR)
-            
+            path.mkdir(parents=True, exist_ok=True)
+            path.chmod(0o1777)
+        except OSError as e:
+            print(f"Error preparing directory {path}: {e}")
+
+    def write_spark_defaults(self, cluster_config: ClusterConfig) -> bool:
+        """Write spark-defaults.conf and the kernel warm-up settings; returns whether either changed"""
+        defaults_changed = self._replace_if_changed(
+            self.layout.spark_conf_dir / "spark-defaults.conf", render_spark_defaults(cluster_config)
+        )
+        warmup_changed = self._replace_if_changed(
+            self.layout.spark_conf_dir / config.WARMUP_SETTINGS_FILE,
+            json.dumps(warmup_settings(cluster_config), indent=2)
+        )
+        return defaults_changed or warmup_changed
+
+    def _replace_if_changed(self, path: Path, text: str) -> bool:
+        try:
+            if path.read_text() == text:
+                return False
+        except OSError:
+            pass
+        # Replace atomically so a starting driver never reads a half-written file
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(text)
+        tmp_path.replace(path)
+        return True
+
+    def load_state(self) -> Optional[ClusterState]:
+        """The last config written to docker-compose.yml, if any"""
+        try:
+            with open(self.layout.state_file, 'r') as f:
+                return ClusterState(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cluster state, ignoring it: {e}")
+            return None
+
+    def _save_state(self, compose_hash: str):
+        state = ClusterState(config=self.config, compose_hash=compose_hash, updated_at=datetime.now().isoformat())
+        tmp_path = self.layout.state_file.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(state.model_dump(), f, indent=2)
+        tmp_path.replace(self.layout.state_file)
+
+    async def reconcile(self, default_config: ClusterConfig,
+                        progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
+        """Bring docker-compose.yml and the containers in line with the saved state on startup.
+
+        When the saved config renders to exactly the compose file on disk,
+        nothing is rewritten or restarted. Otherwise the file is regenerated
+        and, if the cluster is running, ``up`` lets compose recreate only the
+        services whose definition changed. Without a saved state the defaults
+        are written but a running cluster is left alone, since its real
+        topology is unknown.
+        """
+        state = self.load_state()
+        desired = state.config if state else default_config
+        text = self.render_compose(desired)
+        try:
+            on_disk = self.layout.compose_file.read_text()
+        except OSError:
+            on_disk = None
+
+        unchanged = state is not None and on_disk == text and state.compose_hash == compose_model.content_hash(text)
+        if unchanged:
+            self.config = desired
+            self.write_spark_defaults(desired)
+            metrics.COMPOSE_REGENERATIONS.labels("unchanged").inc()
+            self._report(progress, "docker-compose.yml matches the saved cluster state")
+        elif not self.generate_docker_compose(desired):
+            return False, "Failed to generate docker-compose configuration"
+
+        running = set(await self.running_services())
+        self.is_running = "spark-master" in running
+        if not self.is_running:
+            return True, "Cluster is stopped"
+        if state is None:
+            return True, "Cluster is running with an unknown configuration; apply a configuration to manage it"
+
+        try:
+            if not unchanged:
+                self._report(progress, "Cluster definition changed, updating the changed services...")
+                returncode, _, stderr = await self._run_compose(
+                    ["up", "-d", "--remove-orphans"], timeout=config.COMPOSE_UP_TIMEOUT
+                )
+                if returncode != 0:
+                    return False, f"Error reconciling cluster: {stderr or 'Unknown error'}"
+                await self._refill_warm_pool(progress)
+                return True, "Cluster reconciled with the saved configuration"
+
+            expected = {worker_service_name(i) for i in range(1, len(desired.get_worker_configs()) + 1)}
+            missing = sorted(expected - running)
+            if missing:
+                self._report(progress, f"Starting missing workers: {', '.join(missing)}")
+                returncode, _, stderr = await self._run_compose(
+                    ["up", "-d", "--no-deps", *missing], timeout=config.COMPOSE_UP_TIMEOUT
+                )
+                if returncode != 0:
+                    return False, f"Error starting missing workers: {stderr or 'Unknown error'}"
+                return True, f"Cluster running; restarted {len(missing)} missing worker(s)"
+        except asyncio.TimeoutError:
+            return False, "Timeout: Reconciling the cluster took too long"
+        return True, "Cluster running and matches the saved configuration"
+
+    def warm_pool_workers(self, active_count: int) -> List[WorkerConfig]:
+        """Shapes of the pooled workers that follow ``active_count`` active ones"""
+        if not config.WARM_POOL_SIZE or not self.warm_pool_shape:
+            return []
+        return [self.warm_pool_shape.model_copy() for _ in range(config.WARM_POOL_SIZE)]
+
+    async def _ensure_worker_image(self, progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
+        """Build the shared worker image unless its tag already exists locally"""
+        image = worker_image()
+        if await self._docker_api_available():
+            try:
+                if await asyncio.to_thread(self.docker.inspect_image, image):
+                    return True, ""
+            except Exception as e:
+                print(f"Docker API request failed, checking the image with the docker CLI: {e}")
+        returncode, _, _ = await self._run_docker(["image", "inspect", image], timeout=config.COMPOSE_PS_TIMEOUT)
+        if returncode == 0:
+            return True, ""
+
+        self._report(progress, f"Building worker image {image}...")
+        returncode, _, stderr = await self._run_docker(
+            ["build", "-t", image, "-f", str(config.WORKER_DOCKERFILE), str(config.DOCKER_DIR)],
+            timeout=config.IMAGE_BUILD_TIMEOUT
+        )
+        if returncode != 0:
+            return False, f"Error building worker image: {stderr or 'Unknown error'}"
+        return True, ""
+
+    async def _refill_warm_pool(self, progress: Optional[ProgressCallback] = None):
+        """Create (but don't start) the pooled worker containers"""
+        workers = self.config.get_worker_configs() if self.config else []
+        pool = self.warm_pool_workers(len(workers))
+        if not pool:
+            return
+        services = [worker_service_name(i) for i in range(len(workers) + 1, len(workers) + len(pool) + 1)]
+        self._report(progress, f"Pre-creating warm pool workers {', '.join(services)}...")
+        try:
+            returncode, _, stderr = await self._run_compose(
+                ["up", "--no-start", "--no-deps", *services],
+                timeout=config.COMPOSE_UP_TIMEOUT
+            )
+            if returncode != 0:
+                print(f"Error creating warm pool workers: {stderr}")
+        except asyncio.TimeoutError:
+            print("Timeout creating warm pool workers")
+
+    async def _run_docker(self, args: List[str], timeout: int) -> tuple[int, str, str]:
+        """Run a docker CLI command without blocking the event loop"""
+        process = await asyncio.create_subprocess_exec(
+            "docker", *args,
+            cwd=str(config.BASE_DIR),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    async def _run_compose(self, args: List[str], timeout: int) -> tuple[int, str, str]:
+        """Run a docker-compose subcommand on this cluster's project without blocking the event loop"""
+        project_args = ["-p", self.layout.project, "-f", str(self.layout.compose_file),
+                        "--project-directory", str(config.BASE_DIR)]
+        with metrics.track_compose(args[0]) as outcome:
+            process = await asyncio.create_subprocess_exec(
+                "docker-compose", *project_args, *args,
+                cwd=str(config.BASE_DIR),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+            outcome["exit_code"] = process.returncode
+        stdout, stderr = stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        if self.output_sink and args[0] != "ps":
+            # docker-compose reports progress ("Creating spark-worker-1 ... done") on stderr
+            level = "info" if process.returncode == 0 else "error"
+            for line in (stdout + stderr).splitlines():
+                if line.strip():
+                    self.output_sink(line.rstrip(), level)
+        return process.returncode, stdout, stderr
+
+    def _report(self, progress: Optional[ProgressCallback], message: str):
+        print(message)
+        if progress:
+            progress(message)
+
+    async def start_cluster(self, progress: Optional[ProgressCallback] = None,
+                            wait_ready: Optional[float] = None) -> tuple[bool, str]:
+        """Start the Spark cluster using docker-compose.
+
+        Succeeds once the cluster is ready (see ``wait_until_ready``), not
+        merely when the containers exist.
+        """
+        try:
+            image_ok, image_error = await self._ensure_worker_image(progress)
+            if not image_ok:
+                return False, image_error
+
+            self._report(progress, "Running docker-compose up...")
             # Start docker-compose with orphan cleanup
-            result = subprocess.run(
-                ["docker-compose", "up", "-d", "--remove-orphans"],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes timeout
+            up_started = time.monotonic()
+            returncode, stdout, stderr = await self._run_compose(
+                ["up", "-d", "--remove-orphans"],
+                timeout=config.COMPOSE_UP_TIMEOUT
             )
             
-            if result.returncode == 0:
+            if returncode == 0:
                 self.is_running = True
-                print("Cluster started successfully")
-                print(f"stdout: {result.stdout}")
-                return True, "Cluster started successfully"
+                compose_seconds = round(time.monotonic() - up_started, 3)
+                await self._refill_warm_pool(progress)
+                ready, detail = await self.wait_until_ready(wait_ready, compose_seconds, progress)
+                if not ready:
+                    return False, f"Cluster started but {detail}"
+                message = f"Cluster started successfully{detail}"
+                self._report(progress, message)
+                return True, message
             else:
-                error_msg = result.stderr if result.stderr else "Unknown error"
+                error_msg = stderr if stderr else "Unknown error"
                 print(f"Error starting cluster: {error_msg}")
                 return False, f"Error starting cluster: {error_msg}"
                 
-        except subprocess.TimeoutExpired:
-            return False, "Timeout: Cluster took too long to start (>5 min)"
+        except asyncio.TimeoutError:
+            return False, f"Timeout: Cluster took too long to start (>{config.COMPOSE_UP_TIMEOUT}s)"
         except Exception as e:
             return False, f"Exception starting cluster: {str(e)}"
     
-    def stop_cluster(self) -> tuple[bool, str]:
+    async def stop_cluster(self, progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
         """Stop the Spark cluster"""
         try:
-            os.chdir(config.BASE_DIR)
-            
-            result = subprocess.run(
-                ["docker-compose", "down"],
-                capture_output=True,
-                text=True,
-                timeout=120
+            self._report(progress, "Running docker-compose down...")
+            returncode, stdout, stderr = await self._run_compose(
+                ["down"],
+                timeout=config.COMPOSE_DOWN_TIMEOUT
             )
             
-            if result.returncode == 0:
+            if returncode == 0:
                 self.is_running = False
-                print("Cluster stopped successfully")
+                self.startup = None
+                self._report(progress, "Cluster stopped successfully")
                 return True, "Cluster stopped successfully"
             else:
-                error_msg = result.stderr if result.stderr else "Unknown error"
+                error_msg = stderr if stderr else "Unknown error"
                 print(f"Error stopping cluster: {error_msg}")
                 return False, f"Error stopping cluster: {error_msg}"
                 
+        except asyncio.TimeoutError:
+            return False, f"Timeout: Cluster took too long to stop (>{config.COMPOSE_DOWN_TIMEOUT}s)"
         except Exception as e:
             return False, f"Exception stopping cluster: {str(e)}"
     
-    def restart_cluster(self) -> tuple[bool, str]:
+    async def wait_until_ready(self, wait_ready: Optional[float], compose_seconds: Optional[float] = None,
+                               progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
+        """Wait for the master, every configured worker and Jupyter to be usable.
+
+        ``wait_ready`` is the timeout in seconds (default ``READY_TIMEOUT``);
+        0 skips the check. Returns whether the cluster became ready and a
+        detail for the caller's message.
+        """
+        timeout = config.READY_TIMEOUT if wait_ready is None else wait_ready
+        if timeout <= 0:
+            self.startup = None
+            return True, ""
+        self._report(progress, f"Waiting up to {timeout:g}s for the master, workers and Jupyter...")
+        reported = set()
+
+        def on_change(timeline: StartupTimeline):
+            self.startup = timeline
+            for component in timeline.components:
+                if component.ready and component.name not in reported:
+                    reported.add(component.name)
+                    self._report(progress, f"{component.name} ready after {component.ready_after:.1f}s")
+            if self.status_listener:
+                self.status_listener()
+
+        workers = (self.config or ClusterConfig()).get_worker_configs()
+        timeline = await self.readiness.wait(workers, timeout, compose_seconds, on_change)
+        if timeline.ready:
+            return True, f" and ready in {timeline.elapsed:.1f}s"
+        metrics.STARTUP_TIMEOUTS.inc()
+        waiting = [c.name for c in timeline.components if not c.ready]
+        return False, f"not ready after {timeout:g}s; still waiting for {', '.join(waiting)}"
+
+    async def restart_cluster(self, progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
         """Restart the cluster with new configuration"""
         print("Restarting cluster...")
         # Check if cluster is currently running
-        status = self.get_cluster_status()
+        status = await self.get_cluster_status()
         
         if status.running:
-            print("Stopping existing cluster...")
-            success, msg = self.stop_cluster()
+            self._report(progress, "Stopping existing cluster...")
+            success, msg = await self.stop_cluster(progress)
             if not success:
                 return False, f"Failed to stop cluster: {msg}"
         
-        print("Starting cluster with new configuration...")
-        return self.start_cluster()
+        self._report(progress, "Starting cluster with new configuration...")
+        return await self.start_cluster(progress)
     
-    def get_cluster_status(self) -> ClusterStatus:
+    async def get_cluster_status(self) -> ClusterStatus:
         """Get current cluster status"""
         try:
-            os.chdir(config.BASE_DIR)
-            
-            # Check if containers are running
-            result = subprocess.run(
-                ["docker-compose", "ps", "--services", "--filter", "status=running"],
-                capture_output=True,
-                text=True
-            )
-            
-            running_services = result.stdout.strip().split('\n') if result.stdout.strip() else []
+            running_services = await self.running_services()
             is_running = 'spark-master' in running_services
             
             # Count workers
@@ -162,33 +478,82 @@ class ClusterManager:
             for i in range(1, worker_count + 1):
                 workers.append({
                     "name": f"spark-worker-{i}",
-                    "ui_url": f"http://localhost:{8080 + i}"
+                    "ui_url": f"http://localhost:{self.layout.worker_ui_port(i)}"
                 })
             
             return ClusterStatus(
                 running=is_running,
-                master_url=config.SPARK_MASTER_URL if is_running else None,
-                master_ui_url=config.SPARK_MASTER_UI_URL if is_running else None,
+                master_url=self.layout.master_url if is_running else None,
+                master_ui_url=self.layout.master_ui_url if is_running else None,
+                history_ui_url=self.layout.history_url if 'spark-history' in running_services else None,
+                connect_url=self.layout.connect_url if 'spark-connect' in running_services else None,
                 worker_count=worker_count,
-                workers=workers
+                workers=workers,
+                startup=self.startup if is_running else None
             )
             
         except Exception as e:
             print(f"Error getting cluster status: {e}")
             return ClusterStatus(running=False, worker_count=0)
     
-    def update_cluster_config(self, cluster_config: ClusterConfig) -> tuple[bool, str]:
-        """Update cluster configuration and restart"""
+    async def _docker_api_available(self) -> bool:
+        return await asyncio.to_thread(self.docker.available)
+
+    async def running_services(self) -> List[str]:
+        """Names of the compose services with a running container"""
+        if await self._docker_api_available():
+            try:
+                containers = await asyncio.to_thread(
+                    self.docker.list_containers, self.layout.project, False
+                )
+                return [c.get("Labels", {}).get("com.docker.compose.service", "")
+                        for c in containers if c.get("State") == "running"]
+            except Exception as e:
+                print(f"Docker API request failed, falling back to docker-compose: {e}")
+
+        returncode, stdout, stderr = await self._run_compose(
+            ["ps", "--services", "--filter", "status=running"],
+            timeout=config.COMPOSE_PS_TIMEOUT
+        )
+        return stdout.strip().split('\n') if stdout.strip() else []
+
+    async def _remove_services(self, services: List[str]) -> tuple[bool, str]:
+        """Stop and remove the containers of the given services"""
+        if await self._docker_api_available():
+            try:
+                for service in services:
+                    # Services use a fixed container_name, so it doubles as the container reference
+                    container = self.layout.container_name(service)
+                    await asyncio.to_thread(self.docker.stop_container, container)
+                    await asyncio.to_thread(self.docker.remove_container, container)
+                return True, ""
+            except Exception as e:
+                print(f"Docker API request failed, falling back to docker-compose: {e}")
+
+        returncode, stdout, stderr = await self._run_compose(
+            ["rm", "--stop", "--force", *services],
+            timeout=config.COMPOSE_DOWN_TIMEOUT
+        )
+        return returncode == 0, stderr or "Unknown error"
+
+    async def update_cluster_config(self, cluster_config: ClusterConfig,
+                                    progress: Optional[ProgressCallback] = None,
+                                    wait_ready: Optional[float] = None) -> tuple[bool, str]:
+        """Update cluster configuration and restart; ``wait_ready`` is as for ``start_cluster``"""
         try:
             worker_configs = cluster_config.get_worker_configs()
-            print(f"Updating cluster config: {len(worker_configs)} workers")
+            self._report(progress, f"Updating cluster config: {len(worker_configs)} workers")
             for i, wcfg in enumerate(worker_configs, 1):
                 print(f"  Worker-{i}: {wcfg.memory} memory, {wcfg.cores} cores")
+
+            # Only workers differ: recreate just those and keep master/Jupyter running
+            if self.is_running and self.config and self._only_workers_changed(self.config, cluster_config):
+                return await self._apply_worker_changes(cluster_config, progress, wait_ready)
             
             # Stop existing cluster using current config BEFORE generating new one
             if self.is_running:
-                print("Stopping cluster before updating config...")
-                stop_success, stop_msg = self.stop_cluster()
+                self._report(progress, "Stopping cluster before updating config...")
+                stop_success, stop_msg = await self.stop_cluster(progress)
                 if not stop_success:
                     return False, f"Failed to stop cluster: {stop_msg}"
 
@@ -197,8 +562,8 @@ class ClusterManager:
                 return False, "Failed to generate docker-compose configuration"
             
             # Start cluster with new config
-            print("Regenerated docker-compose.yml, starting cluster...")
-            return self.start_cluster()
+            self._report(progress, "Regenerated docker-compose.yml, starting cluster...")
+            return await self.start_cluster(progress, wait_ready)
             
         except Exception as e:
             error_msg = f"Error updating cluster config: {str(e)}"
@@ -206,3 +571,90 @@ class ClusterManager:
             import traceback
             traceback.print_exc()
             return False, error_msg
+
+    def _only_workers_changed(self, old: ClusterConfig, new: ClusterConfig) -> bool:
+        """Whether the two configs differ in nothing but their worker list and Spark defaults.
+
+        Spark defaults and the kernel warm-up settings are read when a driver
+        or kernel starts, so they take effect for new sessions without
+        restarting the master or Jupyter.
+        """
+        live_fields = {"workers", "worker_memory", "worker_cores", "spark_profile", "spark_conf", "shuffle_service",
+                       "kernel_warmup"}
+        return old.model_dump(exclude=live_fields) == new.model_dump(exclude=live_fields)
+
+    async def _apply_worker_changes(self, cluster_config: ClusterConfig,
+                                    progress: Optional[ProgressCallback] = None,
+                                    wait_ready: Optional[float] = None) -> tuple[bool, str]:
+        """Recreate only the added, removed or changed worker services"""
+        old_workers, new_workers = self.config.get_worker_configs(), cluster_config.get_worker_configs()
+        added, removed, changed = diff_worker_configs(old_workers, new_workers)
+        # A resized worker shifts the CPUs pinned to every worker after it
+        old_cpusets = self.cpusets(old_workers)
+        new_cpusets = self.cpusets(new_workers)
+        changed = sorted(set(changed) | {i for i, (a, b) in enumerate(zip(old_cpusets, new_cpusets), 1) if a != b})
+        if self.config.shuffle_service != cluster_config.shuffle_service:
+            # Every worker daemon starts (or stops) its shuffle service
+            changed = sorted(set(changed) | set(range(1, min(len(old_workers), len(new_workers)) + 1)))
+        if not (added or removed or changed):
+            spark_changed = (self.config.spark_profile, self.config.spark_conf) != \
+                (cluster_config.spark_profile, cluster_config.spark_conf)
+            warmup_changed = self.config.kernel_warmup != cluster_config.kernel_warmup
+            self.generate_docker_compose(cluster_config)
+            if spark_changed or warmup_changed:
+                message = f"Spark defaults updated to the {cluster_config.spark_profile} profile"
+                if warmup_changed:
+                    message += f"; kernel warm-up {'on' if cluster_config.kernel_warmup else 'off'}"
+                message += "; new sessions use them"
+                self._report(progress, message)
+                return True, message
+            self._report(progress, "Worker configuration unchanged, nothing to restart")
+            return True, "Worker configuration unchanged"
+
+        self._report(progress, f"Applying worker changes: {len(added)} added, "
+                               f"{len(removed)} removed, {len(changed)} changed")
+        # Pool slots that shifted past the new pool range would be left behind as stale containers
+        pool_size = len(self.warm_pool_workers(0))
+        kept = set(range(1, len(new_workers) + pool_size + 1))
+        stale_pool = [i for i in range(len(old_workers) + 1, len(old_workers) + pool_size + 1) if i not in kept]
+        try:
+            if added or changed:
+                image_ok, image_error = await self._ensure_worker_image(progress)
+                if not image_ok:
+                    return False, image_error
+
+            # Removed services must go while they are still in the current compose file
+            if removed or stale_pool:
+                services = [worker_service_name(i) for i in sorted(set(removed + stale_pool))]
+                self._report(progress, f"Removing {', '.join(services)}...")
+                removed_ok, error = await self._remove_services(services)
+                if not removed_ok:
+                    return False, f"Error removing workers: {error}"
+
+            if not self.generate_docker_compose(cluster_config):
+                return False, "Failed to generate docker-compose configuration"
+
+            if added or changed:
+                # Added workers that match a pooled container just start it
+                services = [worker_service_name(i) for i in sorted(added + changed)]
+                self._report(progress, f"Recreating {', '.join(services)}...")
+                returncode, stdout, stderr = await self._run_compose(
+                    ["up", "-d", "--no-deps", *services],
+                    timeout=config.COMPOSE_UP_TIMEOUT
+                )
+                if returncode != 0:
+                    return False, f"Error starting workers: {stderr or 'Unknown error'}"
+
+            await self._refill_warm_pool(progress)
+
+        except asyncio.TimeoutError:
+            return False, "Timeout: Worker reconfiguration took too long"
+
+        message = f"Cluster reconfigured with {len(cluster_config.get_worker_configs())} worker(s)"
+        if added or changed:
+            ready, detail = await self.wait_until_ready(wait_ready, progress=progress)
+            if not ready:
+                return False, f"{message} but {detail}"
+            message += detail
+        self._report(progress, message)
+        return True, message
@@ -0,0 +1,197 @@
+import json
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+import config
+from models import ClusterConfig, ClusterInfo, ClusterPorts, WorkerConfig
+from cluster_layout import CLUSTER_ID_PATTERN, ClusterError, ClusterLayout, PortAllocator
+from cluster_manager import ClusterManager
+from job_manager import JobManager
+from status_cache import StatusCache
+from events import EventBroadcaster
+from autoscaler import Autoscaler
+from dataset_manager import DatasetManager
+from event_log_analyzer import EventLogAnalyzer
+from warm_kernels import WarmKernelMonitor
+from shared_tables import SharedTableManager
+from log_store import LogStore
+from log_tailer import ContainerLogTailer
+
+
+def default_cluster_config() -> ClusterConfig:
+    """The configuration a cluster gets before one is applied"""
+    return ClusterConfig(workers=[
+        WorkerConfig(memory=config.DEFAULT_WORKER_MEMORY, cores=config.DEFAULT_WORKER_CORES)
+        for _ in range(config.DEFAULT_WORKER_COUNT)
+    ])
+
+
+class Cluster:
+    """One named cluster and everything the backend runs for it.
+
+    Each cluster has its own manager, status cache, log and event stream,
+    container log tailer and autoscaler, plus the readers of its event logs,
+    kernel records and Spark Connect server.
+    """
+
+    def __init__(self, layout: ClusterLayout, job_manager: JobManager, dataset_manager: DatasetManager,
+                 created_at: Optional[str] = None):
+        self.layout = layout
+        self.created_at = created_at
+        layout.create_dirs()
+        self.broadcaster = EventBroadcaster()
+        self.manager = ClusterManager(layout)
+        self.status_cache = StatusCache(self.manager, self.broadcaster)
+        # Backend messages and container output for UI display
+        self.log_store = LogStore(self.broadcaster)
+        self.log_tailer = ContainerLogTailer(self.manager, self.log_store)
+        self.manager.output_sink = lambda line, level: self.log_store.append(line, level, source="docker-compose")
+        self.manager.status_listener = self.status_cache.invalidate
+        self.autoscaler = Autoscaler(self.manager, self.status_cache, job_manager, self.add_log)
+        self.event_log_analyzer = EventLogAnalyzer(layout.events_dir)
+        self.warm_kernels = WarmKernelMonitor(layout.kernel_stats_dir, layout.jupyter_url)
+        self.shared_tables = SharedTableManager(dataset_manager, layout.connect_url, layout.connect_ui_url,
+                                                layout.shared_tables_file)
+
+    @property
+    def id(self) -> str:
+        return self.layout.cluster_id
+
+    @property
+    def running(self) -> bool:
+        snapshot = self.status_cache.snapshot
+        return snapshot.running if snapshot else self.manager.is_running
+
+    def add_log(self, message: str, level: str = "info"):
+        """Append a backend entry to the cluster log; streaming clients get it in the next batch"""
+        self.log_store.append(message, level)
+
+    async def start(self, default_config: ClusterConfig):
+        """Reconcile the saved state with the running containers and start the background watchers"""
+        # Keep whatever topology was applied before the restart instead of resetting to defaults
+        success, message = await self.manager.reconcile(default_config)
+        if success:
+            self.add_log(message)
+        else:
+            self.add_log(f"Startup reconciliation failed: {message}", "error")
+        await self.status_cache.start()
+        self.log_tailer.start()
+        self.autoscaler.start()
+
+    async def stop(self):
+        await self.autoscaler.stop()
+        await self.log_tailer.stop()
+        await self.status_cache.stop()
+
+    def info(self) -> ClusterInfo:
+        snapshot = self.status_cache.snapshot
+        return ClusterInfo(
+            id=self.id,
+            project=self.layout.project,
+            compose_file=str(self.layout.compose_file.relative_to(config.BASE_DIR)),
+            ports=self.layout.ports,
+            max_workers=self.layout.max_workers,
+            running=self.running,
+            worker_count=snapshot.worker_count if snapshot else 0,
+            master_ui_url=self.layout.master_ui_url,
+            jupyter_url=self.layout.jupyter_url,
+            created_at=self.created_at
+        )
+
+
+class ClusterRegistry:
+    """The default cluster plus the named clusters created through the API.
+
+    Named clusters are saved to ``CLUSTERS_FILE`` with the ports they were
+    allocated, so they come back on the same ports after a restart. Their
+    configuration is kept in each cluster's own state file, like the
+    default cluster's.
+    """
+
+    def __init__(self, job_manager: JobManager, dataset_manager: DatasetManager):
+        self.job_manager = job_manager
+        self.dataset_manager = dataset_manager
+        self.allocator = PortAllocator()
+        self.clusters: Dict[str, Cluster] = {}
+        self._add(ClusterLayout())
+        for entry in self._load():
+            try:
+                self._add(ClusterLayout(entry["id"], ClusterPorts(**entry["ports"])), entry.get("created_at"))
+            except Exception as e:
+                print(f"Error loading cluster {entry.get('id')}, skipping it: {e}")
+
+    @property
+    def default(self) -> Cluster:
+        return self.clusters[config.DEFAULT_CLUSTER_ID]
+
+    def _load(self) -> List[dict]:
+        try:
+            with open(config.CLUSTERS_FILE, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"Error reading {config.CLUSTERS_FILE.name}, using only the default cluster: {e}")
+            return []
+
+    def _save(self):
+        entries = [{"id": c.id, "ports": c.layout.ports.model_dump(), "created_at": c.created_at}
+                   for c in self.clusters.values() if not c.layout.is_default]
+        tmp_path = config.CLUSTERS_FILE.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=2)
+        tmp_path.replace(config.CLUSTERS_FILE)
+
+    def _add(self, layout: ClusterLayout, created_at: Optional[str] = None) -> Cluster:
+        cluster = Cluster(layout, self.job_manager, self.dataset_manager, created_at)
+        cluster.manager.neighbour_workers = lambda: self.neighbour_workers(layout.cluster_id)
+        self.clusters[layout.cluster_id] = cluster
+        return cluster
+
+    def get(self, cluster_id: str) -> Optional[Cluster]:
+        return self.clusters.get(cluster_id)
+
+    def list(self) -> List[Cluster]:
+        return list(self.clusters.values())
+
+    def neighbour_workers(self, cluster_id: str) -> List[WorkerConfig]:
+        """Workers of the running clusters other than ``cluster_id``, which share the host with it"""
+        workers = []
+        for cluster in self.clusters.values():
+            if cluster.id != cluster_id and cluster.running and cluster.manager.config:
+                workers.extend(cluster.manager.config.get_worker_configs())
+        return workers
+
+    def create(self, cluster_id: str) -> Cluster:
+        """Register a named cluster with the next free block of ports; raises ClusterError"""
+        if not CLUSTER_ID_PATTERN.match(cluster_id):
+            raise ClusterError("Cluster IDs are up to 24 lower-case letters, digits and '-', starting with a letter")
+        if cluster_id in self.clusters:
+            raise ClusterError(f"Cluster {cluster_id} already exists")
+        if len(self.clusters) >= config.MAX_CLUSTERS:
+            raise ClusterError(f"At most {config.MAX_CLUSTERS} clusters, the default one included")
+        ports = self.allocator.allocate(c.layout.ports for c in self.clusters.values() if not c.layout.is_default)
+        cluster = self._add(ClusterLayout(cluster_id, ports), datetime.now().isoformat())
+        self._save()
+        print(f"Created cluster {cluster_id} (project {cluster.layout.project}, ports from {ports.master})")
+        return cluster
+
+    async def delete(self, cluster_id: str):
+        """Forget a stopped named cluster and remove its files; raises ClusterError"""
+        cluster = self.clusters[cluster_id]
+        if cluster.layout.is_default:
+            raise ClusterError("The default cluster can't be deleted")
+        if self.job_manager.is_busy(cluster_id) or set(await cluster.manager.running_services()) - {""}:
+            raise ClusterError(f"Cluster {cluster_id} is running or busy; stop it first")
+        await cluster.stop()
+        del self.clusters[cluster_id]
+        self._save()
+        shutil.rmtree(cluster.layout.state_dir, ignore_errors=True)
+
+    async def start_all(self, default_config: ClusterConfig):
+        for cluster in self.list():
+            await cluster.start(default_config)
+
+    async def stop_all(self):
+        for cluster in self.list():
+            await cluster.stop()
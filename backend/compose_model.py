@@ -0,0 +1,197 @@
+import hashlib
+from pathlib import Path
+from typing import List, Optional
+import yaml
+import config
+from models import WorkerConfig
+from capacity import format_memory, parse_memory_mb, worker_memory_limit_mb
+from cluster_layout import ClusterLayout
+
+
+# Container ports published in docker/docker-compose.template.yml, by the ClusterPorts field of their host port
+CONTAINER_PORTS = {7077: "master", 9090: "master_ui", 8888: "jupyter", 18080: "history",
+                   15002: "connect", 4040: "connect_ui"}
+
+
+def worker_service_name(index: int) -> str:
+    return f"spark-worker-{index}"
+
+
+def with_host_ports(service: dict, layout: ClusterLayout) -> dict:
+    """Publish the template's container ports on the cluster's host ports"""
+    ports = []
+    for mapping in service.get("ports", []):
+        container_port = int(str(mapping).rsplit(":", 1)[-1])
+        field = CONTAINER_PORTS.get(container_port)
+        ports.append(f"{getattr(layout.ports, field)}:{container_port}" if field else mapping)
+    return {**service, "ports": ports} if ports else service
+
+
+def with_spark_conf(service: dict, layout: ClusterLayout, container_dir: str) -> dict:
+    """Mount the generated spark-defaults.conf directory and point SPARK_CONF_DIR at it"""
+    host_dir = layout.host_path(layout.spark_conf_dir)
+    return {
+        **service,
+        "volumes": [*service.get("volumes", []), f"{host_dir}:{container_dir}:ro"],
+        "environment": [*service.get("environment", []), f"SPARK_CONF_DIR={container_dir}"],
+    }
+
+
+def with_event_logs(service: dict, layout: ClusterLayout) -> dict:
+    """Mount the shared Spark event log directory"""
+    host_dir = layout.host_path(layout.events_dir)
+    return {**service, "volumes": [*service.get("volumes", []), f"{host_dir}:{config.SPARK_EVENTS_CONTAINER_DIR}"]}
+
+
+def with_kernel_stats(service: dict, layout: ClusterLayout) -> dict:
+    """Mount the directory where the kernel warm-up hook records each kernel's session"""
+    host_dir = layout.host_path(layout.kernel_stats_dir)
+    return {
+        **service,
+        "volumes": [*service.get("volumes", []), f"{host_dir}:{config.KERNEL_STATS_CONTAINER_DIR}"],
+        "environment": [*service.get("environment", []), f"PLAYGROUND_KERNEL_DIR={config.KERNEL_STATS_CONTAINER_DIR}"],
+    }
+
+
+def connect_service(service: dict, layout: ClusterLayout) -> dict:
+    """The Spark Connect server, capped at ``SPARK_CONNECT_MAX_CORES`` when that is set"""
+    service = with_event_logs(with_spark_conf(service, layout, config.SPARK_CONF_CONTAINER_DIRS["spark"]), layout)
+    if config.SPARK_CONNECT_MAX_CORES:
+        # Leaves cores for notebooks that run their own driver
+        service["command"] = [*service["command"], "--conf", f"spark.cores.max={config.SPARK_CONNECT_MAX_CORES}"]
+    return service
+
+
+def local_dirs_volume(layout: ClusterLayout, name: str, worker_cfg: WorkerConfig):
+    """Mount for a worker's SPARK_LOCAL_DIRS, or None to use the container filesystem"""
+    local_dirs = worker_cfg.local_dirs
+    if not local_dirs or local_dirs.type == "container":
+        return None
+    if local_dirs.type == "host":
+        # One subdirectory per worker container so workers never share scratch files
+        return f"{local_dirs.path.rstrip('/')}/{layout.container_name(name)}:{config.WORKER_LOCAL_DIR}"
+    if local_dirs.type == "tmpfs":
+        return {"type": "tmpfs", "target": config.WORKER_LOCAL_DIR,
+                "tmpfs": {"size": parse_memory_mb(local_dirs.size) * 1024 * 1024}}
+    return {"type": "volume", "source": local_dirs.volume or f"{name}-local", "target": config.WORKER_LOCAL_DIR}
+
+
+def load_base(template_path: Path = config.DOCKER_COMPOSE_TEMPLATE) -> dict:
+    """The master, Jupyter and network definitions that every cluster shares"""
+    with open(template_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def worker_service(layout: ClusterLayout, index: int, worker_cfg: WorkerConfig, image: str,
+                   cpuset: Optional[str] = None, profile: Optional[str] = None,
+                   shuffle_service: bool = False) -> dict:
+    """Compose service definition of spark-worker-<index>"""
+    name = worker_service_name(index)
+    # Published on the same port: the master UI links to workers at localhost:<port>
+    port = layout.worker_ui_port(index)
+    service = {
+        "image": image,
+        "container_name": layout.container_name(name),
+        "hostname": name,
+    }
+    if profile:
+        # Services with a profile are only started when named explicitly
+        service["profiles"] = [profile]
+    # cgroup limits keep a worker's executors from starving its neighbours
+    service["cpus"] = worker_cfg.cores
+    service["mem_limit"] = format_memory(worker_memory_limit_mb(worker_cfg))
+    if cpuset:
+        service["cpuset"] = cpuset
+    service.update({
+        "ports": [f"{port}:{port}"],
+        "networks": ["spark-network"],
+        "volumes": ["./data:/home/jovyan/data"],
+        "environment": [
+            "SPARK_MODE=worker",
+            "SPARK_MASTER_URL=spark://spark-master:7077",
+            f"SPARK_WORKER_MEMORY={worker_cfg.memory}",
+            f"SPARK_WORKER_CORES={worker_cfg.cores}",
+            f"SPARK_DAEMON_MEMORY={config.WORKER_DAEMON_MEMORY}",
+            f"SPARK_WORKER_WEBUI_PORT={port}",
+            "SPARK_PUBLIC_DNS=localhost",
+        ],
+        "depends_on": ["spark-master"],
+    })
+    scratch = local_dirs_volume(layout, name, worker_cfg)
+    if scratch:
+        service["volumes"].append(scratch)
+        service["environment"].append(f"SPARK_LOCAL_DIRS={config.WORKER_LOCAL_DIR}")
+    # Lets the worker drain gracefully when the autoscaler decommissions it
+    worker_opts = ["-Dspark.decommission.enabled=true"]
+    if shuffle_service:
+        # Serves shuffle files after their executor is released by dynamic allocation
+        worker_opts += ["-Dspark.shuffle.service.enabled=true",
+                        f"-Dspark.shuffle.service.port={config.SHUFFLE_SERVICE_PORT}"]
+    service["environment"].append(f"SPARK_WORKER_OPTS={' '.join(worker_opts)}")
+    return with_spark_conf(service, layout, config.SPARK_CONF_CONTAINER_DIRS["spark"])
+
+
+def build_compose(base: dict, layout: ClusterLayout, workers: List[WorkerConfig], cpusets: List[Optional[str]],
+                  image: str,
+                  pool: List[WorkerConfig] = (), pool_cpusets: List[Optional[str]] = (),
+                  shuffle_service: bool = False, history_server: bool = False,
+                  connect_server: bool = False) -> dict:
+    """Insert worker (and warm pool) services after the master in a copy of ``base``.
+
+    Container names and host ports of every service are those of ``layout``.
+    """
+    worker_services = {}
+    for i, (worker_cfg, cpuset) in enumerate(zip(workers, cpusets), 1):
+        worker_services[worker_service_name(i)] = worker_service(
+            layout, i, worker_cfg, image, cpuset, shuffle_service=shuffle_service
+        )
+    for i, (worker_cfg, cpuset) in enumerate(zip(pool, pool_cpusets), len(workers) + 1):
+        worker_services[worker_service_name(i)] = worker_service(
+            layout, i, worker_cfg, image, cpuset, profile=config.WARM_POOL_PROFILE, shuffle_service=shuffle_service
+        )
+    # Named volumes used for local dirs must be declared at the top level
+    named_volumes = {
+        volume["source"]: {}
+        for service in worker_services.values() for volume in service["volumes"]
+        if isinstance(volume, dict) and volume["type"] == "volume"
+    }
+
+    services = {}
+    for name, service in base.get("services", {}).items():
+        service = with_host_ports(service, layout)
+        if "container_name" in service:
+            service = {**service, "container_name": layout.container_name(name)}
+        if name == "spark-master":
+            service = with_spark_conf(service, layout, config.SPARK_CONF_CONTAINER_DIRS["spark"])
+        elif name == "jupyter":
+            # Drivers run in Jupyter, so that is where event logs are written
+            service = with_spark_conf(service, layout, config.SPARK_CONF_CONTAINER_DIRS["jupyter"])
+            service = with_kernel_stats(with_event_logs(service, layout), layout)
+            if connect_server:
+                service = {**service, "environment": [*service.get("environment", []),
+                                                      f"SPARK_CONNECT_URL={config.SPARK_CONNECT_CONTAINER_URL}"]}
+        elif name == "spark-history":
+            if not history_server:
+                continue
+            service = with_event_logs(with_spark_conf(service, layout, config.SPARK_CONF_CONTAINER_DIRS["spark"]),
+                                      layout)
+        elif name == "spark-connect":
+            if not connect_server:
+                continue
+            service = connect_service(service, layout)
+        services[name] = service
+        if name == "spark-master":
+            services.update(worker_services)
+    doc = {**base, "services": services}
+    if named_volumes:
+        doc["volumes"] = {**base.get("volumes", {}), **named_volumes}
+    return doc
+
+
+def render(doc: dict) -> str:
+    return ("# Generated by the PySpark Playground backend; edit docker/docker-compose.template.yml instead\n"
+            + yaml.safe_dump(doc, sort_keys=False, default_flow_style=False))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
@@ -11,10 +11,78 @@ NOTEBOOKS_DIR = BASE_DIR / "notebooks"
 TEMPLATES_DIR = NOTEBOOKS_DIR / "templates"
 USER_NOTEBOOKS_DIR = NOTEBOOKS_DIR / "user"
 DATA_DIR = BASE_DIR / "data"
+STATE_DIR = BASE_DIR / ".playground"
+
+# Notebook index configuration
+NOTEBOOK_INDEX_DB = STATE_DIR / "notebooks.sqlite"
+NOTEBOOK_INDEX_RESCAN_INTERVAL = float(os.getenv("NOTEBOOK_INDEX_RESCAN_INTERVAL", "60"))
+NOTEBOOK_LIST_MAX_LIMIT = 1000
+
+# Headless notebook execution
+# Executed copies and summaries, kept out of notebooks/ so Jupyter and the notebook index never see them
+NOTEBOOK_RUNS_DIR = STATE_DIR / "notebook-runs"
+NOTEBOOK_CACHE_DIR = STATE_DIR / "cell-cache"
+NOTEBOOK_RUN_WORKERS = int(os.getenv("NOTEBOOK_RUN_WORKERS", "4"))
+NOTEBOOK_RUN_TIMEOUT = float(os.getenv("NOTEBOOK_RUN_TIMEOUT", "1800"))
+
+# Dataset ingestion (raw uploads converted to partitioned Parquet)
+DATASETS_DIR = DATA_DIR / "datasets"
+DATASET_UPLOADS_DIR = DATA_DIR / "raw"
+DATASET_CATALOG_FILE = STATE_DIR / "datasets.json"
+DATA_CONTAINER_DIR = "/home/jovyan/data"  # Where data/ is mounted in Jupyter and the workers
+DATASET_CONVERT_WORKERS = int(os.getenv("DATASET_CONVERT_WORKERS", "2"))
+DATASET_BLOCK_SIZE = int(os.getenv("DATASET_BLOCK_SIZE", str(16 * 1024 * 1024)))  # Bytes read per chunk
+DATASET_COMPRESSION = os.getenv("DATASET_COMPRESSION", "zstd")
+DATASET_MAX_ROWS_PER_FILE = int(os.getenv("DATASET_MAX_ROWS_PER_FILE", "5000000"))
+DATASET_ROWS_PER_GROUP = int(os.getenv("DATASET_ROWS_PER_GROUP", "1000000"))
+DATASET_MAX_PARTITIONS = int(os.getenv("DATASET_MAX_PARTITIONS", "1024"))
+DATASET_UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 # Docker configuration
 DOCKER_COMPOSE_TEMPLATE = DOCKER_DIR / "docker-compose.template.yml"
 DOCKER_COMPOSE_FILE = BASE_DIR / "docker-compose.yml"
+CLUSTER_STATE_FILE = STATE_DIR / "cluster-state.json"
+# spark-defaults.conf generated from the cluster config, mounted into every Spark container
+SPARK_CONF_DIR = STATE_DIR / "spark-conf"
+SPARK_CONF_CONTAINER_DIRS = {"spark": "/opt/spark/conf-playground", "jupyter": "/home/jovyan/.spark-conf"}
+# Jupyter kernel warm-up: the IPython startup hook (docker/jupyter/spark_warmup.py) reads warmup.json
+# from SPARK_CONF_DIR and records each kernel's session in KERNEL_STATS_DIR
+WARMUP_SETTINGS_FILE = "warmup.json"
+KERNEL_STATS_DIR = STATE_DIR / "kernels"
+KERNEL_STATS_CONTAINER_DIR = "/home/jovyan/.playground-kernels"
+KERNEL_WARMUP_IDLE_TIMEOUT = os.getenv("KERNEL_WARMUP_IDLE_TIMEOUT", "60s")  # Idle executors are released after this
+# Spark event logs, written by drivers in Jupyter and read by the History Server and the analyzer
+SPARK_EVENTS_DIR = STATE_DIR / "spark-events"
+SPARK_EVENTS_CONTAINER_DIR = "/opt/spark/spark-events"
+EVENT_LOG_ENABLED = os.getenv("EVENT_LOG_ENABLED", "1") == "1"
+HISTORY_SERVER_PORT = 18080
+HISTORY_SERVER_URL = f"http://localhost:{HISTORY_SERVER_PORT}"
+# Shared Spark Connect server: one long-lived driver whose cached tables every notebook reuses
+SPARK_CONNECT_PORT = 15002
+SPARK_CONNECT_UI_PORT = 4040
+SPARK_CONNECT_URL = os.getenv("SPARK_CONNECT_URL", f"sc://localhost:{SPARK_CONNECT_PORT}")  # Used by the backend
+SPARK_CONNECT_CONTAINER_URL = f"sc://spark-connect:{SPARK_CONNECT_PORT}"  # Used by notebooks
+SPARK_CONNECT_UI_URL = os.getenv("SPARK_CONNECT_UI_URL", f"http://localhost:{SPARK_CONNECT_UI_PORT}")
+SPARK_CONNECT_MAX_CORES = os.getenv("SPARK_CONNECT_MAX_CORES", "")  # Cap on the server's executors; empty for all
+SHARED_TABLES_FILE = STATE_DIR / "shared-tables.json"
+
+# Shared worker image, tagged with a hash of its Dockerfile
+WORKER_DOCKERFILE = DOCKER_DIR / "Dockerfile.spark-worker"
+WORKER_IMAGE_NAME = os.getenv("WORKER_IMAGE_NAME", "spark-playground/spark-worker")
+IMAGE_BUILD_TIMEOUT = int(os.getenv("IMAGE_BUILD_TIMEOUT", "1800"))
+# Stopped, pre-created workers kept ready for scale-up (0 disables the pool)
+WARM_POOL_SIZE = int(os.getenv("WARM_POOL_SIZE", "0"))
+WARM_POOL_PROFILE = "warm-pool"
+# Worker scratch space for shuffle and spill files (created in the worker image)
+WORKER_LOCAL_DIR = "/opt/spark/local"
+SHUFFLE_SERVICE_PORT = 7337
+
+# Docker Engine API configuration
+DOCKER_SOCKET = os.getenv("DOCKER_SOCKET", "/var/run/docker.sock")
+DOCKER_API_PREFIX = os.getenv("DOCKER_API_PREFIX", "")  # e.g. "/v1.43"; empty uses the daemon default
+DOCKER_API_TIMEOUT = float(os.getenv("DOCKER_API_TIMEOUT", "30"))
+DOCKER_API_POOL_SIZE = int(os.getenv("DOCKER_API_POOL_SIZE", "4"))
+DOCKER_API_RECHECK_INTERVAL = float(os.getenv("DOCKER_API_RECHECK_INTERVAL", "30"))
 
 # Backend configuration
 BACKEND_HOST = os.getenv("BACKEND_HOST", "localhost")
@@ -31,12 +99,102 @@ JUPYTER_URL = f"http://localhost:{JUPYTER_PORT}"
 
 # Spark configuration
 SPARK_MASTER_PORT = int(os.getenv("SPARK_MASTER_PORT", "7077"))
-SPARK_MASTER_WEBUI_PORT = int(os.getenv("SPARK_MASTER_WEBUI_PORT", "8080"))
+SPARK_MASTER_WEBUI_PORT = int(os.getenv("SPARK_MASTER_WEBUI_PORT", "9090"))
 SPARK_MASTER_URL = f"spark://localhost:{SPARK_MASTER_PORT}"
 SPARK_MASTER_UI_URL = f"http://localhost:{SPARK_MASTER_WEBUI_PORT}"
 
+# Spark master/worker metrics polling
+SPARK_METRICS_URL = os.getenv("SPARK_METRICS_URL", SPARK_MASTER_UI_URL)  # Master UI serving /json
+SPARK_METRICS_INTERVAL = float(os.getenv("SPARK_METRICS_INTERVAL", "10"))
+SPARK_METRICS_TIMEOUT = float(os.getenv("SPARK_METRICS_TIMEOUT", "3"))
+SPARK_SATURATION_THRESHOLD = float(os.getenv("SPARK_SATURATION_THRESHOLD", "0.9"))
+
+# Background job configuration
+COMPOSE_UP_TIMEOUT = int(os.getenv("COMPOSE_UP_TIMEOUT", "300"))
+COMPOSE_DOWN_TIMEOUT = int(os.getenv("COMPOSE_DOWN_TIMEOUT", "120"))
+COMPOSE_PS_TIMEOUT = int(os.getenv("COMPOSE_PS_TIMEOUT", "30"))
+# Seconds a start waits for the master, every worker and Jupyter to be usable (0 skips the wait)
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "120"))
+READY_POLL_INTERVAL = float(os.getenv("READY_POLL_INTERVAL", "0.5"))
+JOB_COALESCE_WINDOW = float(os.getenv("JOB_COALESCE_WINDOW", "1.0"))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "100"))
+
+# Named clusters. "default" keeps the original layout (docker-compose.yml at the root, the fixed
+# ports); every other cluster gets CLUSTERS_DIR/<id>/ and a block of host ports from the allocator.
+DEFAULT_CLUSTER_ID = "default"
+CLUSTERS_FILE = STATE_DIR / "clusters.json"
+CLUSTERS_DIR = STATE_DIR / "clusters"
+MAX_CLUSTERS = int(os.getenv("MAX_CLUSTERS", "8"))  # Including the default cluster
+CLUSTER_PORT_RANGE_START = int(os.getenv("CLUSTER_PORT_RANGE_START", "20000"))
+CLUSTER_PORT_BLOCK_SIZE = int(os.getenv("CLUSTER_PORT_BLOCK_SIZE", "100"))  # Host ports per named cluster
+WORKER_UI_BASE_PORT = 8080  # Default cluster: spark-worker-N's UI is on 8080 + N
+
+# Cluster status cache
+COMPOSE_PROJECT_NAME = os.getenv(
+    "COMPOSE_PROJECT_NAME",
+    "".join(c for c in BASE_DIR.name.lower() if c.isalnum() or c in "-_")
+)
+STATUS_REFRESH_INTERVAL = float(os.getenv("STATUS_REFRESH_INTERVAL", "15"))
+STATUS_EVENT_DEBOUNCE = float(os.getenv("STATUS_EVENT_DEBOUNCE", "0.5"))
+EVENT_STREAM_KEEPALIVE = float(os.getenv("EVENT_STREAM_KEEPALIVE", "15"))
+STATUS_WATCHED_EVENTS = {"create", "start", "restart", "die", "stop", "kill", "pause", "unpause", "destroy"}
+
+# Cluster log store and container log tailing
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "1000"))  # Entries kept per source
+LOG_PAGE_SIZE = int(os.getenv("LOG_PAGE_SIZE", "200"))
+LOG_PUBLISH_INTERVAL = float(os.getenv("LOG_PUBLISH_INTERVAL", "0.25"))
+LOG_PUBLISH_BATCH = int(os.getenv("LOG_PUBLISH_BATCH", "200"))
+LOG_TAIL_ENABLED = os.getenv("LOG_TAIL_ENABLED", "1") == "1"
+LOG_TAIL_LINES = int(os.getenv("LOG_TAIL_LINES", "50"))  # Lines of history read when a tail attaches
+LOG_TAIL_SYNC_INTERVAL = float(os.getenv("LOG_TAIL_SYNC_INTERVAL", "10"))
+LOG_SOURCE_RATE = float(os.getenv("LOG_SOURCE_RATE", "50"))  # Lines/s kept per container
+LOG_SOURCE_BURST = int(os.getenv("LOG_SOURCE_BURST", "200"))
+LOG_MAX_LINE_LENGTH = int(os.getenv("LOG_MAX_LINE_LENGTH", "2000"))
+
+# Host capacity and container limits
+# PLACEMENT_MODE: "reject" refuses configs that don't fit the host, "scale" shrinks them, "off" skips the check
+PLACEMENT_MODE = os.getenv("PLACEMENT_MODE", "reject")
+HOST_CPUS = os.getenv("HOST_CPUS")  # Override detected capacity, e.g. when sharing the host
+HOST_MEMORY = os.getenv("HOST_MEMORY")
+RESERVED_CPUS = float(os.getenv("RESERVED_CPUS", "1"))  # Spark master, Jupyter and the OS
+RESERVED_MEMORY = os.getenv("RESERVED_MEMORY", "2g")
+WORKER_DAEMON_MEMORY = os.getenv("WORKER_DAEMON_MEMORY", "512m")  # Heap of the worker JVM itself
+WORKER_MEMORY_OVERHEAD_MIN = os.getenv("WORKER_MEMORY_OVERHEAD_MIN", "384m")  # Executor off-heap overhead
+WORKER_MEMORY_OVERHEAD_FRACTION = float(os.getenv("WORKER_MEMORY_OVERHEAD_FRACTION", "0.1"))
+PIN_WORKER_CPUS = os.getenv("PIN_WORKER_CPUS", "1") == "1"
+
+# Autoscaling (defaults for the policy; PUT /api/cluster/autoscale overrides and persists them)
+AUTOSCALE_POLICY_FILE = STATE_DIR / "autoscale.json"
+AUTOSCALE_ENABLED = os.getenv("AUTOSCALE_ENABLED", "0") == "1"
+AUTOSCALE_MIN_WORKERS = int(os.getenv("AUTOSCALE_MIN_WORKERS", "1"))
+AUTOSCALE_MAX_WORKERS = int(os.getenv("AUTOSCALE_MAX_WORKERS", "4"))
+AUTOSCALE_INTERVAL = float(os.getenv("AUTOSCALE_INTERVAL", "15"))
+
+# Event log analyzer
+EVENT_LOG_TOP_STAGES = int(os.getenv("EVENT_LOG_TOP_STAGES", "5"))  # Stages listed per ranking
+EVENT_LOG_SKEW_RATIO = float(os.getenv("EVENT_LOG_SKEW_RATIO", "3"))  # Max/median task time flagged as skew
+EVENT_LOG_CACHE_SIZE = int(os.getenv("EVENT_LOG_CACHE_SIZE", "64"))  # Analyzed log files kept in memory
+
+# Metrics and profiling
+# With PROFILING_ENABLED=1, add ?profile=1 to any API request to sample it with pyinstrument
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.001"))
+PROFILES_DIR = STATE_DIR / "profiles"
+
+# HTTP caching and compression
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # Smaller responses are sent as is
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))  # Brotli is used when installed (pip install brotli)
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", str(365 * 24 * 3600)))  # For fingerprinted asset URLs
+
 # Ensure directories exist
 NOTEBOOKS_DIR.mkdir(exist_ok=True)
 TEMPLATES_DIR.mkdir(exist_ok=True)
 USER_NOTEBOOKS_DIR.mkdir(exist_ok=True)
 DATA_DIR.mkdir(exist_ok=True)
+DATASETS_DIR.mkdir(exist_ok=True)
+DATASET_UPLOADS_DIR.mkdir(exist_ok=True)
+STATE_DIR.mkdir(exist_ok=True)
+SPARK_CONF_DIR.mkdir(exist_ok=True)
+SPARK_EVENTS_DIR.mkdir(exist_ok=True)
+KERNEL_STATS_DIR.mkdir(exist_ok=True)
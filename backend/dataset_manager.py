@@ -0,0 +1,267 @@
+import asyncio
+import json
+import multiprocessing
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+from fastapi import UploadFile
+import config
+import metrics
+from models import DatasetField, DatasetInfo, DatasetRegister
+
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+FORMATS = {".csv": "csv", ".tsv": "csv", ".json": "json", ".jsonl": "json", ".ndjson": "json",
+           ".parquet": "parquet"}
+
+
+class DatasetError(ValueError):
+    """Raised for invalid dataset names, paths or formats"""
+
+
+def detect_format(path: Path) -> Optional[str]:
+    return FORMATS.get(path.suffix.lower())
+
+
+def open_batches(source: str, fmt: str):
+    """Stream a CSV, JSON Lines or Parquet file as a RecordBatchReader, one block at a time.
+
+    Column types are inferred from the first block of CSV and JSON input.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+
+    if fmt == "csv":
+        delimiter = "\t" if source.lower().endswith(".tsv") else ","
+        return pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=config.DATASET_BLOCK_SIZE),
+                               parse_options=pa_csv.ParseOptions(delimiter=delimiter))
+    if fmt == "json":
+        return pa_json.open_json(source, read_options=pa_json.ReadOptions(block_size=config.DATASET_BLOCK_SIZE))
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(source)
+        return pa.RecordBatchReader.from_batches(parquet_file.schema_arrow, parquet_file.iter_batches())
+    raise DatasetError(f"Unsupported format: {fmt}")
+
+
+def convert_to_parquet(source: str, output_dir: str, fmt: str, partition_by: List[str]) -> dict:
+    """Convert one file into a hive-partitioned Parquet directory (runs in a pool process).
+
+    Batches are streamed from the reader straight into the writer, so memory
+    stays around one block per open partition whatever the file size. The
+    result is written next to ``output_dir`` and swapped in once complete.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    reader = open_batches(source, fmt)
+    schema = reader.schema
+    missing = [c for c in partition_by if c not in schema.names]
+    if missing:
+        raise DatasetError(f"Partition column(s) not in the data: {', '.join(missing)}")
+
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for batch in reader:
+            rows += batch.num_rows
+            yield batch
+
+    output = Path(output_dir)
+    staging = output.with_name(f".{output.name}.converting")
+    shutil.rmtree(staging, ignore_errors=True)
+    ds.write_dataset(
+        pa.RecordBatchReader.from_batches(schema, counted()),
+        str(staging),
+        format="parquet",
+        partitioning=partition_by or None,
+        partitioning_flavor="hive" if partition_by else None,
+        file_options=ds.ParquetFileFormat().make_write_options(compression=config.DATASET_COMPRESSION),
+        basename_template="part-{i}.parquet",
+        max_partitions=config.DATASET_MAX_PARTITIONS,
+        max_rows_per_file=config.DATASET_MAX_ROWS_PER_FILE,
+        max_rows_per_group=config.DATASET_ROWS_PER_GROUP,
+        existing_data_behavior="overwrite_or_ignore"
+    )
+    files = list(staging.rglob("*.parquet"))
+    result = {
+        "rows": rows,
+        "files": len(files),
+        "partitions": len({f.parent for f in files}) if partition_by else 0,
+        "size_bytes": sum(f.stat().st_size for f in files),
+        "schema_fields": [{"name": f.name, "type": str(f.type), "nullable": f.nullable} for f in schema]
+    }
+
+    previous = output.with_name(f".{output.name}.previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    if output.exists():
+        output.rename(previous)
+    staging.rename(output)
+    shutil.rmtree(previous, ignore_errors=True)
+    return result
+
+
+class DatasetManager:
+    """Converts raw files under data/ to partitioned Parquet and keeps a catalog of them.
+
+    Notebooks then read columnar, prunable Parquet instead of re-parsing
+    CSV with schema inference on every run. Conversions run on a small
+    process pool; the catalog, including each dataset's schema, is saved
+    to ``DATASET_CATALOG_FILE``.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or config.DATASET_CONVERT_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Names with an upload or conversion under way, including conversions still queued
+        self._claimed: Set[str] = set()
+        self.datasets: Dict[str, DatasetInfo] = self._load_catalog()
+
+    def _load_catalog(self) -> Dict[str, DatasetInfo]:
+        try:
+            with open(config.DATASET_CATALOG_FILE, 'r') as f:
+                entries = [DatasetInfo(**d) for d in json.load(f)]
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error reading dataset catalog, starting empty: {e}")
+            return {}
+        for entry in entries:
+            if entry.status == "converting":
+                # The backend stopped mid-conversion; the staging directory is discarded on retry
+                entry.status, entry.error = "failed", "Interrupted by a backend restart"
+        return {entry.name: entry for entry in entries}
+
+    def _save_catalog(self):
+        tmp_path = config.DATASET_CATALOG_FILE.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump([d.model_dump() for d in self.datasets.values()], f, indent=2)
+        tmp_path.replace(config.DATASET_CATALOG_FILE)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def list_datasets(self) -> List[DatasetInfo]:
+        return sorted(self.datasets.values(), key=lambda d: d.name)
+
+    def get(self, name: str) -> Optional[DatasetInfo]:
+        return self.datasets.get(name)
+
+    def is_converting(self, name: str) -> bool:
+        dataset = self.datasets.get(name)
+        return name in self._claimed or (dataset is not None and dataset.status == "converting")
+
+    def claim(self, name: str) -> bool:
+        """Reserve ``name`` for one upload and conversion; False if another is already under way"""
+        if self.is_converting(name):
+            return False
+        self._claimed.add(name)
+        return True
+
+    def release(self, name: str):
+        self._claimed.discard(name)
+
+    def delete(self, name: str) -> bool:
+        """Remove a dataset's Parquet files and catalog entry; the raw source is kept"""
+        if name not in self.datasets:
+            return False
+        shutil.rmtree(config.DATASETS_DIR / name, ignore_errors=True)
+        del self.datasets[name]
+        self._save_catalog()
+        return True
+
+    def validate_name(self, name: str):
+        if not NAME_PATTERN.match(name):
+            raise DatasetError("Dataset names may only contain letters, digits, '-' and '_'")
+
+    def resolve_source(self, request: DatasetRegister) -> tuple[Path, str]:
+        """Check a register request and return the source file and its format"""
+        self.validate_name(request.name)
+        source = (config.DATA_DIR / request.path).resolve()
+        if not source.is_relative_to(config.DATA_DIR.resolve()) or not source.is_file():
+            raise DatasetError(f"No such file under data/: {request.path}")
+        if source.is_relative_to(config.DATASETS_DIR.resolve()):
+            raise DatasetError("Files under data/datasets/ are already converted")
+        fmt = request.format or detect_format(source)
+        if not fmt:
+            raise DatasetError(f"Cannot tell the format of {request.path}; pass format explicitly")
+        return source, fmt
+
+    async def save_upload(self, name: str, upload: UploadFile) -> Path:
+        """Stream an upload into data/raw/ without holding it in memory"""
+        self.validate_name(name)
+        suffix = Path(upload.filename or "").suffix.lower()
+        if suffix not in FORMATS:
+            raise DatasetError(f"Unsupported file type {suffix or '(none)'}; "
+                               f"expected one of {', '.join(sorted(FORMATS))}")
+        path = config.DATASET_UPLOADS_DIR / f"{name}{suffix}"
+        tmp_path = path.with_name(f".{path.name}.uploading")
+        with open(tmp_path, 'wb') as f:
+            while chunk := await upload.read(config.DATASET_UPLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+        tmp_path.replace(path)
+        return path
+
+    async def convert(self, name: str, source: Path, fmt: str, partition_by: List[str],
+                      progress: Optional[Callable[[str], None]] = None) -> tuple[bool, str]:
+        """Convert ``source`` into data/datasets/<name>/ and record the result in the catalog"""
+        dataset = DatasetInfo(
+            name=name,
+            status="converting",
+            source=str(source.relative_to(config.DATA_DIR.resolve())),
+            format=fmt,
+            path=f"{config.DATA_CONTAINER_DIR}/{config.DATASETS_DIR.name}/{name}",
+            partition_by=partition_by,
+            source_size_bytes=source.stat().st_size,
+            created_at=datetime.now().isoformat()
+        )
+        self.datasets[name] = dataset
+        self._save_catalog()
+        if progress:
+            progress(f"Converting {dataset.source} ({fmt}) to Parquet")
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._get_pool(), convert_to_parquet,
+                str(source), str(config.DATASETS_DIR / name), fmt, partition_by
+            )
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._pool = None
+            dataset.status, dataset.error = "failed", str(e).splitlines()[0] if str(e) else type(e).__name__
+            dataset.duration = round(time.perf_counter() - started, 3)
+            self._save_catalog()
+            metrics.DATASET_CONVERSIONS.labels(fmt, "failed").inc()
+            return False, f"Converting {name} failed: {dataset.error}"
+
+        dataset.rows = result["rows"]
+        dataset.files = result["files"]
+        dataset.partitions = result["partitions"]
+        dataset.size_bytes = result["size_bytes"]
+        dataset.schema_fields = [DatasetField(**f) for f in result["schema_fields"]]
+        dataset.status = "ready"
+        dataset.converted_at = datetime.now().isoformat()
+        dataset.duration = round(time.perf_counter() - started, 3)
+        self._save_catalog()
+        metrics.DATASET_CONVERSIONS.labels(fmt, "succeeded").inc()
+        return True, (f"Converted {name}: {dataset.rows} rows into {dataset.files} Parquet file(s) "
+                      f"in {dataset.duration}s")
@@ -0,0 +1,207 @@
+import http.client
+import json
+import queue
+import select
+import socket
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, urlencode
+import config
+
+# Methods the Engine API can safely receive twice; others (e.g. POST .../kill) are never re-sent
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+
+class DockerAPIError(Exception):
+    """Raised when the Docker Engine API returns an error response"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a UNIX domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DockerClient:
+    """Minimal Docker Engine API client with a pool of keep-alive connections.
+
+    Talks HTTP directly to the daemon socket instead of starting a
+    docker-compose process per call. All methods are blocking and
+    thread-safe; call them through ``asyncio.to_thread`` from async code.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, pool_size: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.socket_path = socket_path or config.DOCKER_SOCKET
+        self.timeout = timeout or config.DOCKER_API_TIMEOUT
+        self._pool: "queue.LifoQueue[UnixHTTPConnection]" = queue.LifoQueue(
+            maxsize=pool_size or config.DOCKER_API_POOL_SIZE
+        )
+        self._available: Optional[bool] = None
+        self._checked_at = 0.0
+
+    def available(self) -> bool:
+        """Whether the daemon answers on the socket; cached for a short while"""
+        now = time.monotonic()
+        if self._available is None or now - self._checked_at > config.DOCKER_API_RECHECK_INTERVAL:
+            try:
+                self._available = self.ping()
+            except Exception:
+                self._available = False
+            self._checked_at = now
+        return self._available
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def info(self) -> dict:
+        """System-wide information, including NCPU and MemTotal of the daemon's host"""
+        _, data = self._request("GET", "/info")
+        return data
+
+    # Containers
+
+    def ping(self) -> bool:
+        status, _ = self._request("GET", "/_ping", raw=True)
+        return status == 200
+
+    def list_containers(self, project: Optional[str] = None, all: bool = True) -> List[dict]:
+        """List containers, optionally only those of a compose project"""
+        params: Dict[str, Any] = {"all": "1" if all else "0"}
+        if project:
+            params["filters"] = json.dumps({"label": [f"com.docker.compose.project={project}"]})
+        _, data = self._request("GET", "/containers/json", params=params)
+        return data
+
+    def inspect_container(self, name: str) -> Optional[dict]:
+        """Return the container's inspect document, or None if it does not exist"""
+        try:
+            _, data = self._request("GET", f"/containers/{quote(name)}/json")
+            return data
+        except DockerAPIError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def inspect_image(self, name: str) -> Optional[dict]:
+        """Return the image's inspect document, or None if it is not present locally"""
+        try:
+            _, data = self._request("GET", f"/images/{quote(name)}/json")
+            return data
+        except DockerAPIError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def create_container(self, name: str, spec: dict) -> str:
+        """Create a container from an Engine API create spec and return its ID"""
+        _, data = self._request("POST", "/containers/create", params={"name": name}, body=spec)
+        return data["Id"]
+
+    def start_container(self, name: str):
+        # 304 means the container is already running
+        self._request("POST", f"/containers/{quote(name)}/start", ok=(204, 304))
+
+    def stop_container(self, name: str, timeout: int = 10):
+        # 304 means the container is already stopped
+        try:
+            self._request("POST", f"/containers/{quote(name)}/stop", params={"t": timeout},
+                          ok=(204, 304), request_timeout=self.timeout + timeout)
+        except DockerAPIError as e:
+            if e.status != 404:
+                raise
+
+    def remove_container(self, name: str, force: bool = True):
+        try:
+            self._request("DELETE", f"/containers/{quote(name)}",
+                          params={"force": "1" if force else "0"}, ok=(204,))
+        except DockerAPIError as e:
+            if e.status != 404:
+                raise
+
+    # Transport
+
+    def _acquire(self) -> UnixHTTPConnection:
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return UnixHTTPConnection(self.socket_path, self.timeout)
+            # An idle keep-alive socket only turns readable when the daemon has closed it
+            if conn.sock and select.select([conn.sock], [], [], 0)[0]:
+                conn.close()
+                continue
+            return conn
+
+    def _release(self, conn: UnixHTTPConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _set_timeout(self, conn: UnixHTTPConnection, timeout: float):
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+
+    def _request(self, method: str, path: str, params: Optional[dict] = None,
+                 body: Optional[dict] = None, ok: tuple = (200, 201),
+                 raw: bool = False, request_timeout: Optional[float] = None) -> tuple[int, Any]:
+        url = f"{config.DOCKER_API_PREFIX}{path}"
+        if params:
+            url += "?" + urlencode(params)
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+
+        # A pooled connection may have been closed by the daemon; retry once on a fresh one,
+        # unless the daemon may already have acted on a request that isn't safe to repeat
+        for attempt in range(2):
+            conn = self._acquire() if attempt == 0 else UnixHTTPConnection(self.socket_path, self.timeout)
+            sent = False
+            try:
+                self._set_timeout(conn, request_timeout or self.timeout)
+                conn.request(method, url, body=payload, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                content = response.read()
+                self._set_timeout(conn, self.timeout)
+            except (http.client.HTTPException, ConnectionError, socket.timeout) as e:
+                conn.close()
+                retry = not sent or method in IDEMPOTENT_METHODS
+                if attempt == 0 and retry and not isinstance(e, socket.timeout):
+                    continue
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            break
+
+        if response.status not in ok:
+            try:
+                message = json.loads(content).get("message", "")
+            except ValueError:
+                message = content.decode(errors="replace")
+            raise DockerAPIError(response.status, message)
+
+        if raw or not content:
+            return response.status, content
+        return response.status, json.loads(content)
@@ -0,0 +1,285 @@
+import json
+import re
+import statistics
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import config
+from models import SparkApplicationAnalysis, SparkApplicationInfo, StageSummary
+
+
+IN_PROGRESS_SUFFIX = ".inprogress"
+# Events the analyzer reads; every other line is skipped without being parsed
+EVENTS = {"SparkListenerApplicationStart", "SparkListenerApplicationEnd", "SparkListenerStageSubmitted",
+          "SparkListenerStageCompleted", "SparkListenerTaskEnd"}
+EVENT_PATTERN = re.compile(rb'\{"Event":\s?"(\w+)"')
+# ApplicationStart comes after a handful of setup events; stop looking for it after this many lines
+HEADER_LINES = 64
+
+
+def event_name(line: bytes) -> Optional[str]:
+    """The "Event" of a log line, read without parsing the JSON"""
+    match = EVENT_PATTERN.match(line)
+    return match.group(1).decode() if match else None
+
+
+def format_timestamp(ms: Optional[int]) -> Optional[str]:
+    return datetime.fromtimestamp(ms / 1000).isoformat() if ms else None
+
+
+class StageStats:
+    """Running totals of one stage attempt"""
+
+    def __init__(self, stage_id: int, attempt: int):
+        self.stage_id = stage_id
+        self.attempt = attempt
+        self.name = ""
+        self.status = "running"
+        self.submitted: Optional[int] = None
+        self.completed: Optional[int] = None
+        self.task_times: List[int] = []
+        self.failed_tasks = 0
+        self.gc_time = 0
+        self.run_time = 0
+        self.memory_spilled = 0
+        self.disk_spilled = 0
+        self.shuffle_read = 0
+        self.shuffle_write = 0
+        self.input_bytes = 0
+
+    def summary(self) -> StageSummary:
+        median = int(statistics.median(self.task_times)) if self.task_times else 0
+        longest = max(self.task_times, default=0)
+        return StageSummary(
+            stage_id=self.stage_id,
+            attempt=self.attempt,
+            name=self.name,
+            status=self.status,
+            duration_ms=self.completed - self.submitted if self.submitted and self.completed else None,
+            tasks=len(self.task_times),
+            failed_tasks=self.failed_tasks,
+            task_time_median_ms=median,
+            task_time_max_ms=longest,
+            skew=round(longest / median, 2) if median else None,
+            gc_time_ms=self.gc_time,
+            memory_spilled_bytes=self.memory_spilled,
+            disk_spilled_bytes=self.disk_spilled,
+            shuffle_read_bytes=self.shuffle_read,
+            shuffle_write_bytes=self.shuffle_write,
+            input_bytes=self.input_bytes
+        )
+
+
+class ApplicationParser:
+    """Accumulates one application's statistics from its event log, line by line.
+
+    The parser only keeps per-stage totals and task durations, so it can
+    be fed a log of any size, and resumed where it stopped when an
+    in-progress log grows.
+    """
+
+    def __init__(self, app_id: str):
+        self.app_id = app_id
+        self.name: Optional[str] = None
+        self.started: Optional[int] = None
+        self.ended: Optional[int] = None
+        self.stages: Dict[tuple, StageStats] = {}
+        self.parse_errors = 0
+
+    def _stage(self, stage_id: int, attempt: int) -> StageStats:
+        key = (stage_id, attempt)
+        if key not in self.stages:
+            self.stages[key] = StageStats(stage_id, attempt)
+        return self.stages[key]
+
+    def feed(self, line: bytes):
+        name = event_name(line)
+        if name not in EVENTS:
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            self.parse_errors += 1
+            return
+
+        if name == "SparkListenerTaskEnd":
+            self._task_end(event)
+        elif name in ("SparkListenerStageSubmitted", "SparkListenerStageCompleted"):
+            info = event.get("Stage Info", {})
+            stage = self._stage(info.get("Stage ID", -1), info.get("Stage Attempt ID", 0))
+            stage.name = info.get("Stage Name", stage.name)
+            stage.submitted = info.get("Submission Time") or stage.submitted
+            if name == "SparkListenerStageCompleted":
+                stage.completed = info.get("Completion Time")
+                stage.status = "failed" if info.get("Failure Reason") else "succeeded"
+        elif name == "SparkListenerApplicationStart":
+            self.name = event.get("App Name")
+            self.started = event.get("Timestamp")
+        elif name == "SparkListenerApplicationEnd":
+            self.ended = event.get("Timestamp")
+
+    def _task_end(self, event: dict):
+        stage = self._stage(event.get("Stage ID", -1), event.get("Stage Attempt ID", 0))
+        info = event.get("Task Info", {})
+        if info.get("Failed") or info.get("Killed"):
+            stage.failed_tasks += 1
+            return
+        if info.get("Launch Time") is not None and info.get("Finish Time") is not None:
+            stage.task_times.append(info["Finish Time"] - info["Launch Time"])
+        task_metrics = event.get("Task Metrics") or {}
+        shuffle_read = task_metrics.get("Shuffle Read Metrics", {})
+        stage.run_time += task_metrics.get("Executor Run Time", 0)
+        stage.gc_time += task_metrics.get("JVM GC Time", 0)
+        stage.memory_spilled += task_metrics.get("Memory Bytes Spilled", 0)
+        stage.disk_spilled += task_metrics.get("Disk Bytes Spilled", 0)
+        stage.shuffle_read += shuffle_read.get("Remote Bytes Read", 0) + shuffle_read.get("Local Bytes Read", 0)
+        stage.shuffle_write += task_metrics.get("Shuffle Write Metrics", {}).get("Shuffle Bytes Written", 0)
+        stage.input_bytes += task_metrics.get("Input Metrics", {}).get("Bytes Read", 0)
+
+    def analysis(self, in_progress: bool, log_size: int) -> SparkApplicationAnalysis:
+        stages = [s.summary() for s in self.stages.values()]
+        run_time = sum(s.run_time for s in self.stages.values())
+        gc_time = sum(s.gc_time_ms for s in stages)
+        top = config.EVENT_LOG_TOP_STAGES
+        return SparkApplicationAnalysis(
+            app_id=self.app_id,
+            name=self.name,
+            in_progress=in_progress,
+            started_at=format_timestamp(self.started),
+            duration_ms=self.ended - self.started if self.started and self.ended else None,
+            stages=len(stages),
+            tasks=sum(s.tasks for s in stages),
+            failed_tasks=sum(s.failed_tasks for s in stages),
+            executor_run_time_ms=run_time,
+            gc_time_ms=gc_time,
+            gc_fraction=round(gc_time / run_time, 3) if run_time else 0.0,
+            memory_spilled_bytes=sum(s.memory_spilled_bytes for s in stages),
+            disk_spilled_bytes=sum(s.disk_spilled_bytes for s in stages),
+            shuffle_read_bytes=sum(s.shuffle_read_bytes for s in stages),
+            shuffle_write_bytes=sum(s.shuffle_write_bytes for s in stages),
+            slowest_stages=sorted(
+                (s for s in stages if s.duration_ms is not None), key=lambda s: s.duration_ms, reverse=True
+            )[:top],
+            skewed_stages=sorted(
+                (s for s in stages if s.skew and s.skew >= config.EVENT_LOG_SKEW_RATIO),
+                key=lambda s: s.skew, reverse=True
+            )[:top],
+            spilling_stages=sorted(
+                (s for s in stages if s.disk_spilled_bytes), key=lambda s: s.disk_spilled_bytes, reverse=True
+            )[:top],
+            log_size_bytes=log_size,
+            parse_errors=self.parse_errors
+        )
+
+
+class CachedLog:
+    """A parser and its latest analysis, with the size and mtime of the log they reflect"""
+
+    def __init__(self, parser: ApplicationParser):
+        self.parser = parser
+        self.size = 0
+        self.mtime = 0.0
+        self.offset = 0  # Bytes fed to the parser; a partial last line is not consumed
+        self.analysis: Optional[SparkApplicationAnalysis] = None
+
+
+class EventLogAnalyzer:
+    """Summarizes the event logs in ``SPARK_EVENTS_DIR`` for slow-job post-mortems.
+
+    Logs are streamed line by line and only the events the summary needs
+    are parsed. Results are cached per file by size and mtime; when an
+    in-progress log grows, or is renamed once its application ends,
+    parsing resumes from the last complete line instead of starting over.
+    """
+
+    def __init__(self, events_dir: Path = config.SPARK_EVENTS_DIR):
+        self.events_dir = events_dir
+        self._cache: "OrderedDict[str, CachedLog]" = OrderedDict()
+        self._names: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _log_files(self) -> Dict[str, Path]:
+        """Event log of each application, keyed by app ID"""
+        logs = {}
+        for path in self.events_dir.iterdir():
+            # Compressed and rolling (directory) logs are not written with the generated defaults
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            logs[path.name.removesuffix(IN_PROGRESS_SUFFIX)] = path
+        return logs
+
+    def _app_name(self, path: Path) -> Optional[str]:
+        """Read an application's name from the start of its log"""
+        app_id = path.name.removesuffix(IN_PROGRESS_SUFFIX)
+        if self._names.get(app_id):
+            return self._names[app_id]
+        name = None
+        try:
+            with open(path, 'rb') as f:
+                for _, line in zip(range(HEADER_LINES), f):
+                    if event_name(line) == "SparkListenerApplicationStart":
+                        name = json.loads(line).get("App Name")
+                        break
+        except (OSError, ValueError):
+            pass
+        self._names[app_id] = name
+        return name
+
+    def list_applications(self) -> List[SparkApplicationInfo]:
+        applications = []
+        for app_id, path in self._log_files().items():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            applications.append(SparkApplicationInfo(
+                app_id=app_id,
+                name=self._app_name(path),
+                in_progress=path.name.endswith(IN_PROGRESS_SUFFIX),
+                size_bytes=stat.st_size,
+                modified_at=datetime.fromtimestamp(stat.st_mtime).isoformat()
+            ))
+        return sorted(applications, key=lambda a: a.modified_at, reverse=True)
+
+    def analyze(self, app_id: str) -> Optional[SparkApplicationAnalysis]:
+        """Analyze one application's log, or None if it has none (blocking; run in a thread)"""
+        path = self._log_files().get(app_id)
+        if path is None:
+            return None
+        with self._lock:
+            return self._analyze(app_id, path)
+
+    def _analyze(self, app_id: str, path: Path) -> SparkApplicationAnalysis:
+        stat = path.stat()
+        key = str(path)
+        cached = self._cache.get(key)
+        if cached is None:
+            # The application ended since its in-progress log was read: same bytes, new name
+            previous = self._cache.pop(f"{key}{IN_PROGRESS_SUFFIX}", None)
+            if previous and previous.offset <= stat.st_size:
+                cached = previous
+        if cached and cached.size == stat.st_size and cached.mtime == stat.st_mtime and cached.analysis:
+            self._cache[key] = cached
+            self._cache.move_to_end(key)
+            cached.analysis.in_progress = path.name.endswith(IN_PROGRESS_SUFFIX)
+            return cached.analysis
+        if cached is None or cached.offset > stat.st_size:
+            cached = CachedLog(ApplicationParser(app_id))
+
+        with open(path, 'rb') as f:
+            f.seek(cached.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Still being written; read it next time
+                cached.offset += len(line)
+                cached.parser.feed(line)
+
+        cached.size, cached.mtime = stat.st_size, stat.st_mtime
+        cached.analysis = cached.parser.analysis(path.name.endswith(IN_PROGRESS_SUFFIX), stat.st_size)
+        self._cache[key] = cached
+        self._cache.move_to_end(key)
+        while len(self._cache) > config.EVENT_LOG_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return cached.analysis
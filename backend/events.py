@@ -0,0 +1,36 @@
+import asyncio
+import json
+from typing import Set
+
+
+class EventBroadcaster:
+    """Fans out change notifications to connected streaming clients"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: dict):
+        """Send an event to every subscriber without waiting on slow ones"""
+        for queue in list(self._subscribers):
+            if queue.full():
+                # A stalled client only misses older events, it never blocks others
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,232 @@
+import gzip
+import hashlib
+import mimetypes
+import re
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import config
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli; responses fall back to gzip
+    brotli = None
+
+
+# Version counters restart with the backend, so ETags also carry a per-process ID
+BOOT_ID = uuid.uuid4().hex[:8]
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml", "image/svg+xml"}
+# app.js is also served as app.<first 12 hex digits of its SHA-256>.js
+FINGERPRINT_PATTERN = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<suffix>\.[^./]+)$")
+STATIC_LINK_PATTERN = re.compile(r'(?P<attr>href|src)="static/(?P<name>[^"?#]+)"')
+
+
+def version_etag(request: Request, *versions) -> str:
+    """Weak ETag of a response fully determined by ``versions`` and the request's path and query"""
+    key = "|".join([request.url.path, request.url.query, *map(str, versions)])
+    return f'W/"{BOOT_ID}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names ``etag``, compared weakly as for GET requests"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def revalidate(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """A 304 if the client's copy is current; otherwise tag ``response`` and return None.
+
+    Responses are marked ``no-cache``: clients may keep them but must check
+    back each time, which costs a 304 with no body when nothing changed.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The best of brotli and gzip that the client accepts, or None"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in (["br", "gzip"] if brotli else ["gzip"]):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """Encode ``body``; ``best`` spends more CPU for bodies that are compressed once and reused"""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else config.GZIP_LEVEL)
+
+
+def compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """Compresses responses with brotli or gzip, whichever the client prefers and the backend has.
+
+    Only complete bodies of at least ``COMPRESSION_MIN_SIZE`` bytes with a
+    text-like content type are compressed. Streams, such as the
+    Server-Sent Events endpoint, pass through untouched so events are not
+    held back, as do responses that are already encoded, like the
+    pre-compressed static assets.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = config.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", "")) \
+            if scope["type"] == "http" else None
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            passthrough = True
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (message.get("more_body") or "content-encoding" in headers
+                    or len(body) < self.minimum_size or not compressible(headers.get("content-type", ""))):
+                await send(start)
+                await send(message)
+                return
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class StaticAsset:
+    """One frontend file, held in memory with its compressed variants"""
+
+    def __init__(self, path: Path, name: str):
+        self.name = name
+        self.mtime = path.stat().st_mtime
+        self.body = path.read_bytes()
+        self.digest = hashlib.sha256(self.body).hexdigest()[:12]
+        self.media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self._encoded: Dict[str, bytes] = {}
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.digest}"'
+
+    @property
+    def fingerprinted_name(self) -> str:
+        path = Path(self.name)
+        return path.with_name(f"{path.stem}.{self.digest}{path.suffix}").as_posix()
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if not encoding:
+            return self.body
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding, best=True)
+        return self._encoded[encoding]
+
+
+class StaticAssets:
+    """Serves the frontend from memory under content-hash fingerprinted URLs.
+
+    index.html links ``static/app.<hash>.js`` instead of ``static/app.js``,
+    so a fingerprinted URL always names the same bytes and browsers may
+    cache it for ``STATIC_MAX_AGE`` without asking again; an edited file
+    gets a new URL. Plain names and index.html are revalidated with their
+    ETag. Each file is compressed once per encoding, at the highest level,
+    and re-read when its mtime changes.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory.resolve()
+        self._assets: Dict[str, StaticAsset] = {}
+
+    def get(self, name: str) -> Optional[StaticAsset]:
+        path = (self.directory / name).resolve()
+        if not path.is_relative_to(self.directory) or not path.is_file():
+            return None
+        asset = self._assets.get(name)
+        if not asset or asset.mtime != path.stat().st_mtime:
+            asset = self._assets[name] = StaticAsset(path, name)
+        return asset
+
+    def render_index(self) -> Optional[str]:
+        """index.html with its static links fingerprinted"""
+        index = self.get("index.html")
+        if not index:
+            return None
+
+        def fingerprint(match: re.Match) -> str:
+            asset = self.get(match["name"])
+            name = asset.fingerprinted_name if asset else match["name"]
+            return f'{match["attr"]}="static/{name}"'
+
+        return STATIC_LINK_PATTERN.sub(fingerprint, index.body.decode())
+
+    def index_response(self, request: Request) -> Optional[Response]:
+        html = self.render_index()
+        if html is None:
+            return None
+        response = HTMLResponse(html)
+        etag = f'W/"{hashlib.sha256(html.encode()).hexdigest()[:12]}"'
+        return revalidate(request, response, etag) or response
+
+    def response(self, request: Request, name: str) -> Optional[Response]:
+        """The asset at ``name`` (plain or fingerprinted), or None if there is none"""
+        asset = self.get(name)
+        match = FINGERPRINT_PATTERN.match(name)
+        if not asset and match:
+            asset = self.get(match["stem"] + match["suffix"])
+        if not asset:
+            return None
+
+        # An outdated fingerprint still gets the current file, but must not be cached for long
+        immutable = asset.name != name and match["digest"] == asset.digest
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": f"public, max-age={config.STATIC_MAX_AGE}, immutable" if immutable else "no-cache",
+            "Vary": "Accept-Encoding"
+        }
+        if etag_matches(request, asset.etag):
+            return Response(status_code=304, headers=headers)
+        encoding = None
+        if compressible(asset.media_type) and len(asset.body) >= config.COMPRESSION_MIN_SIZE:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(asset.encoded(encoding), media_type=asset.media_type, headers=headers)
@@ -0,0 +1,165 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+import config
+from models import JobInfo
+
+
+JobRunner = Callable[["Job"], Awaitable[tuple[bool, str]]]
+
+
+class Job:
+    """A single background operation tracked by the JobManager"""
+
+    def __init__(self, kind: str, run: JobRunner, cluster_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.cluster_id = cluster_id
+        self.run = run
+        self.status = "queued"
+        self.message = ""
+        self.progress: List[str] = []
+        self.coalesced = 0
+        self.result: Optional[dict] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.done = asyncio.Event()
+
+    def report(self, message: str):
+        """Record a progress message for this job"""
+        self.progress.append(message)
+        self.message = message
+
+    def to_info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            kind=self.kind,
+            cluster_id=self.cluster_id,
+            status=self.status,
+            message=self.message,
+            progress=list(self.progress),
+            coalesced=self.coalesced,
+            result=self.result,
+            created_at=self.created_at.isoformat(),
+            started_at=self.started_at.isoformat() if self.started_at else None,
+            finished_at=self.finished_at.isoformat() if self.finished_at else None
+        )
+
+
+class JobManager:
+    """Runs long cluster operations in the background and tracks their progress"""
+
+    def __init__(self):
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, kind: str, run: JobRunner, cluster_id: Optional[str] = None,
+               coalesce: bool = False, debounce: float = 0.0) -> Job:
+        """Queue a job and return it immediately.
+
+        Jobs for the same cluster are serialized by a per-cluster lock. With
+        ``coalesce`` set, a request that arrives while a job of the same kind
+        is still queued for that cluster replaces the queued job's work
+        instead of adding another one, so only the latest request is applied.
+        ``debounce`` keeps a new job queued for that many seconds first, giving
+        bursts of requests time to merge into it.
+        """
+        if coalesce:
+            pending = self._find_queued(kind, cluster_id)
+            if pending:
+                pending.run = run
+                pending.coalesced += 1
+                pending.report(f"Merged with a newer {kind} request")
+                return pending
+
+        job = Job(kind, run, cluster_id)
+        self.jobs[job.id] = job
+        self._prune()
+        self._tasks[job.id] = asyncio.create_task(self._execute(job, debounce))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, cluster_id: Optional[str] = None) -> List[Job]:
+        """List tracked jobs, newest first"""
+        jobs = [j for j in self.jobs.values() if cluster_id is None or j.cluster_id == cluster_id]
+        return list(reversed(jobs))
+
+    def is_busy(self, cluster_id: str) -> bool:
+        """Whether any job for the cluster is queued or running"""
+        return any(j.cluster_id == cluster_id and j.status in ("queued", "running")
+                   for j in self.jobs.values())
+
+    async def wait(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Wait for a job to finish; returns False on timeout"""
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def shutdown(self):
+        """Cancel outstanding jobs"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def _find_queued(self, kind: str, cluster_id: Optional[str]) -> Optional[Job]:
+        for job in reversed(self.jobs.values()):
+            if job.kind == kind and job.cluster_id == cluster_id and job.status == "queued":
+                return job
+        return None
+
+    def _lock_for(self, cluster_id: Optional[str]) -> Optional[asyncio.Lock]:
+        if cluster_id is None:
+            return None
+        if cluster_id not in self._locks:
+            self._locks[cluster_id] = asyncio.Lock()
+        return self._locks[cluster_id]
+
+    async def _execute(self, job: Job, debounce: float):
+        try:
+            if debounce > 0:
+                await asyncio.sleep(debounce)
+
+            lock = self._lock_for(job.cluster_id)
+            if lock:
+                await lock.acquire()
+            try:
+                job.status = "running"
+                job.started_at = datetime.now()
+                success, message = await job.run(job)
+                job.status = "succeeded" if success else "failed"
+                if message != job.message:
+                    job.report(message)
+            finally:
+                if lock:
+                    lock.release()
+
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            job.report("Job cancelled")
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.report(f"Job failed: {str(e)}")
+            print(f"Error running job {job.id} ({job.kind}): {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            job.finished_at = datetime.now()
+            job.done.set()
+            self._tasks.pop(job.id, None)
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the history limit"""
+        finished = [j.id for j in self.jobs.values() if j.done.is_set()]
+        excess = len(self.jobs) - config.JOB_HISTORY_LIMIT
+        for job_id in finished[:max(excess, 0)]:
+            del self.jobs[job_id]
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional
+import config
+from models import LogEntry, LogPage
+from events import EventBroadcaster
+
+
+LEVELS = ("debug", "info", "warn", "error")
+BACKEND_SOURCE = "backend"
+
+
+class LogStore:
+    """Bounded, leveled log of backend messages and container output.
+
+    Each source (``backend``, ``spark-master``, ``spark-worker-N``, ...)
+    gets its own ring buffer of ``LOG_BUFFER_SIZE`` entries, so a chatty
+    container only evicts its own lines. Entries carry a store-wide ``seq``
+    that clients pass back as ``since`` to fetch only what is new.
+
+    Appends are published as ``logs`` events in batches, at most every
+    ``LOG_PUBLISH_INTERVAL`` seconds.
+    """
+
+    def __init__(self, broadcaster: Optional[EventBroadcaster] = None,
+                 buffer_size: Optional[int] = None):
+        self.broadcaster = broadcaster
+        self.buffer_size = buffer_size or config.LOG_BUFFER_SIZE
+        self.last_seq = 0
+        self._clears = 0
+        self._buffers: Dict[str, Deque[LogEntry]] = {}
+        self._evicted_through: Dict[str, int] = {}  # Highest seq pushed out of each buffer
+        self.dropped: Dict[str, int] = {}  # Lines rejected upstream, e.g. by rate limiting
+        self._published_seq = 0
+        self._publish_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def version(self) -> str:
+        """Changes whenever any page could: on appends, clears and dropped lines"""
+        return f"{self.last_seq}.{self._clears}.{sum(self.dropped.values())}"
+
+    @property
+    def sources(self) -> List[str]:
+        return sorted(self._buffers)
+
+    def append(self, message: str, level: str = "info", source: str = BACKEND_SOURCE,
+               timestamp: Optional[str] = None) -> LogEntry:
+        self.last_seq += 1
+        entry = LogEntry(
+            seq=self.last_seq,
+            timestamp=timestamp or datetime.now().isoformat(timespec="milliseconds"),
+            level=level,
+            source=source,
+            message=message
+        )
+        buffer = self._buffers.setdefault(source, deque())
+        if len(buffer) == self.buffer_size:
+            self._evicted_through[source] = buffer.popleft().seq
+        buffer.append(entry)
+        self._schedule_publish()
+        return entry
+
+    def record_dropped(self, source: str, count: int):
+        self.dropped[source] = self.dropped.get(source, 0) + count
+
+    def clear(self):
+        """Drop every entry; ``seq`` keeps counting so old cursors stay valid"""
+        self._clears += 1
+        self._buffers.clear()
+        self._evicted_through.clear()
+        self.dropped.clear()
+        self._published_seq = self.last_seq
+        if self.broadcaster:
+            self.broadcaster.publish("logs", self.page(reset=True).model_dump())
+
+    def page(self, since: Optional[int] = None, limit: Optional[int] = None,
+             sources: Optional[Iterable[str]] = None, level: Optional[str] = None,
+             reset: bool = False) -> LogPage:
+        """Entries after ``since`` (oldest first), or the latest ``limit`` entries without a cursor"""
+        limit = limit or config.LOG_PAGE_SIZE
+        selected = [s for s in (sources or self._buffers) if s in self._buffers]
+        min_level = LEVELS.index(level) if level else 0
+        after = since or 0
+
+        newer = []
+        for source in selected:
+            entries = []
+            for entry in reversed(self._buffers[source]):
+                if entry.seq <= after:
+                    break
+                if LEVELS.index(entry.level) >= min_level:
+                    entries.append(entry)
+            entries.reverse()
+            newer.append(entries)
+        merged = list(heapq.merge(*newer, key=lambda e: e.seq))
+
+        if since is None:
+            entries = merged[-limit:]
+            cursor = self.last_seq
+        else:
+            entries = merged[:limit]
+            # Stop at the last returned entry if the page was cut short
+            cursor = entries[-1].seq if len(merged) > limit else max(after, self.last_seq)
+
+        return LogPage(
+            entries=entries,
+            cursor=cursor,
+            # The client's cursor points at entries that have since been evicted
+            gap=since is not None and any(self._evicted_through.get(s, 0) > since for s in selected),
+            sources=self.sources,
+            dropped=dict(self.dropped),
+            reset=reset
+        )
+
+    def _schedule_publish(self):
+        if not self.broadcaster or self._publish_handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._publish()
+            return
+        self._publish_handle = loop.call_later(config.LOG_PUBLISH_INTERVAL, self._publish)
+
+    def _publish(self):
+        """Send everything appended since the last publish as one ``logs`` event"""
+        self._publish_handle = None
+        if self.last_seq == self._published_seq:
+            return
+        page = self.page(since=self._published_seq, limit=config.LOG_PUBLISH_BATCH)
+        self._published_seq = page.cursor
+        self.broadcaster.publish("logs", page.model_dump())
+        if self._published_seq < self.last_seq:
+            self._schedule_publish()
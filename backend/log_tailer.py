@@ -0,0 +1,151 @@
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+import config
+import metrics
+from cluster_manager import ClusterManager
+from log_store import LogStore
+
+
+# Spark's log4j lines look like "24/05/01 10:00:00 WARN Worker: ..."
+LEVEL_PATTERN = re.compile(r"\b(TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL)\b")
+LEVEL_NAMES = {"TRACE": "debug", "DEBUG": "debug", "INFO": "info", "WARN": "warn",
+               "WARNING": "warn", "ERROR": "error", "FATAL": "error"}
+# Seconds between "lines dropped" summaries of one source
+DROP_REPORT_INTERVAL = 5
+
+
+def parse_level(line: str) -> str:
+    match = LEVEL_PATTERN.search(line, 0, 60)
+    return LEVEL_NAMES[match.group(1)] if match else "info"
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` lines per second with bursts of up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class ContainerLogTailer:
+    """Follows the output of the cluster's containers into the log store.
+
+    One ``docker logs -f`` process runs per running compose service; the
+    set is re-synced every ``LOG_TAIL_SYNC_INTERVAL`` seconds and whenever
+    the cluster status changes. Lines are always read promptly so a
+    container never blocks on a full pipe; instead each source is rate
+    limited, and lines over the limit are counted and summarized rather
+    than stored.
+    """
+
+    def __init__(self, cluster_manager: ClusterManager, log_store: LogStore):
+        self.cluster_manager = cluster_manager
+        self.log_store = log_store
+        self._tails: Dict[str, asyncio.Task] = {}
+        self._processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._sync_now = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if config.LOG_TAIL_ENABLED:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        tasks = [t for t in [self._task, *self._tails.values()] if t]
+        for task in tasks:
+            task.cancel()
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.kill()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._tails = {}
+
+    def invalidate(self):
+        """Re-check which containers to follow soon, e.g. after a lifecycle operation"""
+        self._sync_now.set()
+
+    async def sync(self):
+        """Start tails for newly running services and drop finished ones"""
+        running = set(await self.cluster_manager.running_services()) - {""}
+        for name, task in list(self._tails.items()):
+            if task.done():
+                del self._tails[name]
+        for name in running - set(self._tails):
+            self._tails[name] = asyncio.create_task(self._tail(name))
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Error syncing container log tails: {e}")
+            try:
+                await asyncio.wait_for(self._sync_now.wait(), config.LOG_TAIL_SYNC_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._sync_now.clear()
+
+    async def _tail(self, name: str):
+        """Follow one container until it stops"""
+        limiter = RateLimiter(config.LOG_SOURCE_RATE, config.LOG_SOURCE_BURST)
+        dropped = 0
+        reported_at = time.monotonic()
+        try:
+            # Services have a fixed container_name; named clusters prefix it with the cluster ID
+            process = await asyncio.create_subprocess_exec(
+                "docker", "logs", "--follow", "--tail", str(config.LOG_TAIL_LINES),
+                self.cluster_manager.layout.container_name(name),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,  # Spark logs to stderr
+                limit=config.LOG_MAX_LINE_LENGTH * 4
+            )
+            self._processes[name] = process
+            while True:
+                try:
+                    raw = await process.stdout.readline()
+                except ValueError:
+                    # Line longer than the stream limit; skip what was buffered
+                    raw = b"[line too long, skipped]"
+                if not raw:
+                    break
+                if not limiter.allow():
+                    dropped += 1
+                    continue
+                if dropped and time.monotonic() - reported_at >= DROP_REPORT_INTERVAL:
+                    self._report_dropped(name, dropped)
+                    dropped = 0
+                    reported_at = time.monotonic()
+                line = raw.decode(errors="replace").rstrip()
+                if len(line) > config.LOG_MAX_LINE_LENGTH:
+                    line = line[:config.LOG_MAX_LINE_LENGTH] + "..."
+                if line:
+                    self.log_store.append(line, parse_level(line), source=name)
+            await process.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error following logs of {name}: {e}")
+        finally:
+            self._processes.pop(name, None)
+            if dropped:
+                self._report_dropped(name, dropped)
+
+    def _report_dropped(self, name: str, count: int):
+        self.log_store.record_dropped(name, count)
+        metrics.LOG_LINES_DROPPED.labels(name).inc(count)
+        self.log_store.append(f"{count} line(s) dropped: more than {config.LOG_SOURCE_RATE:g} lines/s",
+                              "warn", source=name)
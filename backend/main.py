@@ -1,15 +1,33 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import time
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pathlib import Path
 import config
+from typing import List, Literal, Optional
 from models import (
     ClusterConfig, ClusterStatus, NotebookCreate, 
-    NotebookInfo, NotebookListResponse, ApiResponse
+    NotebookInfo, NotebookListResponse, ApiResponse, JobInfo, NotebookRunRequest,
+    AutoscalePolicy, AutoscaleStatus, CapacityReport, LogPage,
+    DatasetInfo, DatasetListResponse, DatasetRegister, SparkDefaults,
+    SparkApplicationAnalysis, SparkApplicationListResponse, WarmKernelStats,
+    SharedTableCreate, SharedTableListResponse, SparkConnectStats,
+    ClusterCreate, ClusterListResponse
 )
-from cluster_manager import ClusterManager
+from clusters import Cluster, ClusterRegistry, default_cluster_config
+from cluster_layout import ClusterError
 from notebook_manager import NotebookManager
+from job_manager import Job, JobManager
+from events import format_sse
+from notebook_runner import NotebookRunner, resolve_notebook
+from spark_tuning import PROFILES, spark_defaults
+from dataset_manager import DatasetError, DatasetManager, detect_format
+from shared_tables import SharedTableError
+from http_cache import CompressionMiddleware, StaticAssets, revalidate, version_etag
+from capacity import PlacementError, available_resources, parse_memory_mb, required_resources
+import metrics
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -26,116 +44,454 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip, or brotli when installed, for API responses; static assets are compressed ahead of time
+app.add_middleware(CompressionMiddleware)
 
-# Mount frontend static files
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request by route template and optionally profile it"""
+    profiler = None
+    if config.PROFILING_ENABLED and request.query_params.get("profile") == "1":
+        profiler = metrics.start_request_profiler()
+
+    started = time.perf_counter()
+    if profiler:
+        with profiler:
+            response = await call_next(request)
+    else:
+        response = await call_next(request)
+    duration = time.perf_counter() - started
+
+    # Label by template (/api/jobs/{job_id}) so IDs don't explode the label set
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", None) or "unmatched"
+    metrics.HTTP_REQUEST_DURATION.labels(request.method, route_path, str(response.status_code)).observe(duration)
+
+    if profiler:
+        profile_path = profiler.save(route_path)
+        print(f"Profile for {request.method} {request.url.path} written to {profile_path}")
+        response.headers["X-Profile-Path"] = str(profile_path.relative_to(config.BASE_DIR))
+    return response
+
+
+# Frontend files, served under fingerprinted URLs (see the frontend routes)
 frontend_dir = Path(config.BASE_DIR / "frontend")
-if frontend_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_dir)), name="static")
+static_assets = StaticAssets(frontend_dir)
 
 # Initialize managers
-cluster_manager = ClusterManager()
 notebook_manager = NotebookManager()
+notebook_runner = NotebookRunner()
+dataset_manager = DatasetManager()
+job_manager = JobManager()
+# The default cluster and any named ones, each with its own manager, status cache, logs and autoscaler
+clusters = ClusterRegistry(job_manager, dataset_manager)
 
-# Store logs for UI display
-cluster_logs = []
+
+def add_log(message: str, level: str = "info"):
+    """Append a backend entry to the default cluster's log"""
+    clusters.default.add_log(message, level)
+
+
+def get_cluster(cluster_id: str = Query(config.DEFAULT_CLUSTER_ID, description="Cluster to act on")) -> Cluster:
+    cluster = clusters.get(cluster_id)
+    if not cluster:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return cluster
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize cluster with default configuration on startup"""
-    from models import WorkerConfig
-    
-    # Create default workers
-    default_workers = [
-        WorkerConfig(
-            memory=config.DEFAULT_WORKER_MEMORY,
-            cores=config.DEFAULT_WORKER_CORES
-        ) for _ in range(config.DEFAULT_WORKER_COUNT)
-    ]
-    
-    default_config = ClusterConfig(workers=default_workers)
-    cluster_manager.generate_docker_compose(default_config)
+    """Reconcile every cluster's saved state with the running containers on startup"""
+    await clusters.start_all(default_cluster_config())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cancel background jobs and watchers on shutdown"""
+    await job_manager.shutdown()
+    await clusters.stop_all()
+    notebook_runner.shutdown()
+    dataset_manager.shutdown()
+
+
+def job_response(job: Job, message: str) -> ApiResponse:
+    """Build the response returned when a background job is accepted"""
+    return ApiResponse(
+        success=True,
+        message=message,
+        data={'job_id': job.id, 'status': job.status}
+    )
+
+
+async def job_result_response(cluster: Cluster, job: Job, message: str, wait_ready: Optional[float],
+                              response: Response) -> ApiResponse:
+    """With ``wait_ready``, hold the response until the start job finishes and report its outcome"""
+    if wait_ready is None or not await job_manager.wait(job, config.COMPOSE_UP_TIMEOUT + wait_ready):
+        return job_response(job, message)
+    response.status_code = 200
+    startup = cluster.manager.startup
+    return ApiResponse(
+        success=job.status == "succeeded",
+        message=job.message,
+        data={'job_id': job.id, 'status': job.status, 'startup': startup.model_dump() if startup else None}
+    )
+
+
+# Named Cluster Endpoints
+
+@app.get("/api/clusters", response_model=ClusterListResponse)
+async def list_clusters():
+    """List the default and named clusters with their ports and whether they run"""
+    infos = [cluster.info() for cluster in clusters.list()]
+    return ClusterListResponse(clusters=infos, total=len(infos))
+
+
+@app.post("/api/clusters", response_model=ApiResponse, status_code=201)
+async def create_cluster(request: ClusterCreate):
+    """Create a named cluster with its own compose project, state and ports, optionally starting it"""
+    try:
+        cluster = clusters.create(request.id)
+    except ClusterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        cluster_config, notes = cluster.manager.check_placement(request.config or default_cluster_config())
+    except (PlacementError, ValueError) as e:
+        await clusters.delete(cluster.id)
+        raise HTTPException(status_code=400, detail=str(e))
+    for note in notes:
+        cluster.add_log(note)
+    if not cluster.manager.generate_docker_compose(cluster_config):
+        await clusters.delete(cluster.id)
+        raise HTTPException(status_code=500, detail="Failed to generate docker-compose configuration")
+    await cluster.start(cluster_config)
+    add_log(f"Created cluster {cluster.id} on ports {cluster.layout.ports.master}-"
+            f"{cluster.layout.worker_ui_port(cluster.layout.max_workers)}")
+
+    result = ApiResponse(success=True, message=f"Cluster {cluster.id} created", data={})
+    if request.start:
+        async def run(job: Job) -> tuple[bool, str]:
+            success, message = await cluster.manager.start_cluster(job.report)
+            cluster.add_log(message, "info" if success else "error")
+            cluster.status_cache.invalidate()
+            cluster.log_tailer.invalidate()
+            return success, message
+
+        job = job_manager.submit("start", run, cluster_id=cluster.id, coalesce=True)
+        result = job_response(job, f"Cluster {cluster.id} created, starting it")
+    result.data['cluster'] = cluster.info().model_dump()
+    return result
+
+
+@app.delete("/api/clusters/{cluster_id}", response_model=ApiResponse)
+async def delete_cluster(cluster_id: str):
+    """Delete a stopped named cluster and its compose file, state and event logs"""
+    if not clusters.get(cluster_id):
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    try:
+        await clusters.delete(cluster_id)
+    except ClusterError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    add_log(f"Deleted cluster {cluster_id}")
+    return ApiResponse(success=True, message=f"Cluster {cluster_id} deleted")
 
 
 # Cluster Management Endpoints
 
-@app.post("/api/cluster/config", response_model=ApiResponse)
-async def update_cluster_config(cluster_config: ClusterConfig):
-    """Update cluster configuration and restart"""
-    global cluster_logs
+@app.post("/api/cluster/config", response_model=ApiResponse, status_code=202)
+async def update_cluster_config(
+    cluster_config: ClusterConfig,
+    response: Response,
+    wait_ready: Optional[float] = Query(None, ge=0),
+    cluster: Cluster = Depends(get_cluster)
+):
+    """Update cluster configuration and restart in the background.
+
+    ``wait_ready`` (seconds) bounds the wait for the cluster to become ready
+    and makes the request return only once the change has been applied.
+    """
+    try:
+        cluster_config, notes = cluster.manager.check_placement(cluster_config)
+    except (PlacementError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for note in notes:
+        cluster.add_log(note)
     worker_configs = cluster_config.get_worker_configs()
-    cluster_logs.append(f"Updating cluster config to {len(worker_configs)} worker(s)...")
-    
-    success, message = cluster_manager.update_cluster_config(cluster_config)
-    cluster_logs.append(message)
-    
-    if success:
-        return ApiResponse(
-            success=True,
-            message=f"Cluster configured with {len(worker_configs)} worker(s)",
-            data={'workers': [{'memory': w.memory, 'cores': w.cores} for w in worker_configs]}
-        )
-    else:
-        raise HTTPException(status_code=500, detail=message)
+    cluster.add_log(f"Updating cluster config to {len(worker_configs)} worker(s)...")
 
+    async def run(job: Job) -> tuple[bool, str]:
+        success, message = await cluster.manager.update_cluster_config(cluster_config, job.report, wait_ready)
+        cluster.add_log(message, "info" if success else "error")
+        cluster.status_cache.invalidate()
+        cluster.log_tailer.invalidate()
+        return success, message
 
-@app.get("/api/cluster/status", response_model=ClusterStatus)
-async def get_cluster_status():
-    """Get current cluster status"""
-    return cluster_manager.get_cluster_status()
-
-
-@app.post("/api/cluster/start", response_model=ApiResponse)
-async def start_cluster():
-    """Start the Spark cluster"""
-    global cluster_logs
-    cluster_logs.append("Starting Spark cluster...")
-    
-    success, message = cluster_manager.start_cluster()
-    cluster_logs.append(message)
-    
-    if success:
-        return ApiResponse(
-            success=True,
-            message="Cluster started successfully"
-        )
-    else:
-        raise HTTPException(status_code=500, detail=message)
+    # Rapid repeated updates collapse into a single restart with the latest config
+    job = job_manager.submit("config", run, cluster_id=cluster.id,
+                             coalesce=True, debounce=config.JOB_COALESCE_WINDOW)
+    result = await job_result_response(cluster, job, f"Configuring cluster with {len(worker_configs)} worker(s)",
+                                       wait_ready, response)
+    result.data['workers'] = [w.model_dump(exclude_none=True) for w in worker_configs]
+    return result
 
 
-@app.post("/api/cluster/stop", response_model=ApiResponse)
-async def stop_cluster():
-    """Stop the Spark cluster"""
-    global cluster_logs
-    cluster_logs.append("Stopping Spark cluster...")
-    
-    success, message = cluster_manager.stop_cluster()
-    cluster_logs.append(message)
-    
-    if success:
-        return ApiResponse(
-            success=True,
-            message="Cluster stopped successfully"
-        )
-    else:
-        raise HTTPException(status_code=500, detail=message)
+@app.get("/api/cluster/config", response_model=ClusterConfig)
+async def get_cluster_config(cluster: Cluster = Depends(get_cluster)):
+    """Get the cluster configuration last applied"""
+    return cluster.manager.config or ClusterConfig()
 
 
-@app.get("/api/cluster/logs")
-async def get_cluster_logs():
-    """Get cluster operation logs"""
-    global cluster_logs
-    return {"logs": cluster_logs[-20:]}  # Return last 20 log entries
+@app.get("/api/cluster/status", response_model=ClusterStatus)
+async def get_cluster_status(request: Request, response: Response, cluster: Cluster = Depends(get_cluster)):
+    """Get the cached cluster status and how old it is; 304 until the snapshot is refreshed"""
+    status = await cluster.status_cache.get()
+    # A refresh that changed nothing still moves updated_at, which the client shows as freshness
+    etag = version_etag(request, cluster.status_cache.version, status.updated_at)
+    return revalidate(request, response, etag) or status
+
+
+@app.get("/api/cluster/capacity", response_model=CapacityReport)
+async def get_cluster_capacity(cluster: Cluster = Depends(get_cluster)):
+    """Compare host capacity with what the current configuration needs"""
+    host = await asyncio.to_thread(cluster.manager.host_capacity)
+    available_cpus, available_memory = available_resources(host)
+    workers = cluster.manager.config.get_worker_configs() if cluster.manager.config else []
+    required_cpus, required_memory = required_resources(workers)
+    return CapacityReport(
+        host=host,
+        reserved_cpus=config.RESERVED_CPUS,
+        reserved_memory_mb=parse_memory_mb(config.RESERVED_MEMORY),
+        available_cpus=available_cpus,
+        available_memory_mb=available_memory,
+        required_cpus=required_cpus,
+        required_memory_mb=required_memory,
+        fits=required_cpus <= available_cpus and required_memory <= available_memory,
+        placement_mode=config.PLACEMENT_MODE
+    )
+
+
+@app.get("/api/cluster/spark-defaults", response_model=SparkDefaults)
+async def get_spark_defaults(cluster: Cluster = Depends(get_cluster)):
+    """Get the Spark tuning profile and the spark-defaults.conf derived from the current config"""
+    cluster_config = cluster.manager.config or ClusterConfig()
+    return SparkDefaults(
+        profile=cluster_config.spark_profile,
+        profiles=list(PROFILES),
+        overrides=cluster_config.spark_conf,
+        properties=spark_defaults(cluster_config)
+    )
+
+
+@app.get("/api/cluster/applications", response_model=SparkApplicationListResponse)
+async def list_spark_applications(cluster: Cluster = Depends(get_cluster)):
+    """List Spark applications with an event log, newest first"""
+    applications = await asyncio.to_thread(cluster.event_log_analyzer.list_applications)
+    return SparkApplicationListResponse(applications=applications, total=len(applications))
+
+
+@app.get("/api/cluster/applications/{app_id}/analysis", response_model=SparkApplicationAnalysis)
+async def analyze_spark_application(app_id: str, cluster: Cluster = Depends(get_cluster)):
+    """Summarize an application's event log: slowest stages, task skew, spill, shuffle and GC"""
+    analysis = await asyncio.to_thread(cluster.event_log_analyzer.analyze, app_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="No event log for this application")
+    return analysis
+
+
+def require_connect_server(cluster: Cluster):
+    if not (cluster.manager.config and cluster.manager.config.connect_server):
+        raise HTTPException(status_code=409, detail="The Spark Connect server is off; "
+                                                    "set connect_server in the cluster config")
+
+
+def submit_shared_table_job(cluster: Cluster, message: str, table_name: str, work) -> ApiResponse:
+    """Queue a blocking shared table operation that may scan a whole table"""
+    async def run(job: Job) -> tuple[bool, str]:
+        success, result = await asyncio.to_thread(work, job.report)
+        cluster.add_log(result, "info" if success else "error")
+        return success, result
+
+    job = job_manager.submit("shared-table", run)
+    response = job_response(job, message)
+    response.data['table'] = table_name
+    return response
+
+
+@app.get("/api/cluster/connect", response_model=SparkConnectStats)
+async def get_spark_connect_stats(cluster: Cluster = Depends(get_cluster)):
+    """Get the shared Spark Connect server's session counts and cache memory use"""
+    return await asyncio.to_thread(cluster.shared_tables.stats, cluster.manager.config or ClusterConfig())
+
+
+@app.get("/api/cluster/connect/tables", response_model=SharedTableListResponse)
+async def list_shared_tables(cluster: Cluster = Depends(get_cluster)):
+    """List shared tables with their registration and cache state on the Spark Connect server"""
+    tables = await asyncio.to_thread(cluster.shared_tables.list_tables)
+    return SharedTableListResponse(tables=tables, total=len(tables))
+
+
+@app.post("/api/cluster/connect/tables", response_model=ApiResponse, status_code=202)
+async def create_shared_table(request: SharedTableCreate, cluster: Cluster = Depends(get_cluster)):
+    """Register a dataset, file or query as global_temp.<name> and cache it in the background"""
+    require_connect_server(cluster)
+    try:
+        table = cluster.shared_tables.define(request)
+    except SharedTableError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return submit_shared_table_job(cluster, f"Sharing {table.qualified_name}", table.name,
+                                   lambda progress: cluster.shared_tables.register(table, progress))
+
+
+@app.post("/api/cluster/connect/tables/{name}/cache", response_model=ApiResponse, status_code=202)
+async def cache_shared_table(name: str, cluster: Cluster = Depends(get_cluster)):
+    """Scan a shared table into the server's cache in the background"""
+    require_connect_server(cluster)
+    table = cluster.shared_tables.get(name)
+    if not table:
+        raise HTTPException(status_code=404, detail="Shared table not found")
+    return submit_shared_table_job(cluster, f"Caching {table.qualified_name}", table.name,
+                                   lambda progress: cluster.shared_tables.cache(table.name, progress))
+
+
+@app.post("/api/cluster/connect/tables/{name}/uncache", response_model=ApiResponse)
+async def uncache_shared_table(name: str, cluster: Cluster = Depends(get_cluster)):
+    """Free a shared table's cached data; the table stays readable"""
+    table = cluster.shared_tables.get(name)
+    if not table:
+        raise HTTPException(status_code=404, detail="Shared table not found")
+    try:
+        message = await asyncio.to_thread(cluster.shared_tables.uncache, table.name)
+    except SharedTableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    cluster.add_log(message)
+    return ApiResponse(success=True, message=message)
+
+
+@app.delete("/api/cluster/connect/tables/{name}", response_model=ApiResponse)
+async def delete_shared_table(name: str, cluster: Cluster = Depends(get_cluster)):
+    """Drop a shared table and its cached data"""
+    table = cluster.shared_tables.get(name)
+    if not table:
+        raise HTTPException(status_code=404, detail="Shared table not found")
+    message = await asyncio.to_thread(cluster.shared_tables.drop, table.name)
+    cluster.add_log(message)
+    return ApiResponse(success=True, message=message)
+
+
+@app.post("/api/cluster/start", response_model=ApiResponse, status_code=202)
+async def start_cluster(response: Response, wait_ready: Optional[float] = Query(None, ge=0),
+                        cluster: Cluster = Depends(get_cluster)):
+    """Start the Spark cluster in the background; ``wait_ready`` as for the config endpoint"""
+    cluster.add_log("Starting Spark cluster...")
+
+    async def run(job: Job) -> tuple[bool, str]:
+        success, message = await cluster.manager.start_cluster(job.report, wait_ready)
+        cluster.add_log(message, "info" if success else "error")
+        cluster.status_cache.invalidate()
+        cluster.log_tailer.invalidate()
+        return success, message
+
+    job = job_manager.submit("start", run, cluster_id=cluster.id, coalesce=True)
+    return await job_result_response(cluster, job, "Cluster start initiated", wait_ready, response)
+
+
+@app.post("/api/cluster/stop", response_model=ApiResponse, status_code=202)
+async def stop_cluster(cluster: Cluster = Depends(get_cluster)):
+    """Stop the Spark cluster in the background"""
+    cluster.add_log("Stopping Spark cluster...")
+
+    async def run(job: Job) -> tuple[bool, str]:
+        success, message = await cluster.manager.stop_cluster(job.report)
+        cluster.add_log(message, "info" if success else "error")
+        cluster.status_cache.invalidate()
+        cluster.log_tailer.invalidate()
+        return success, message
+
+    job = job_manager.submit("stop", run, cluster_id=cluster.id, coalesce=True)
+    return job_response(job, "Cluster stop initiated")
+
+
+@app.get("/api/cluster/autoscale", response_model=AutoscaleStatus)
+async def get_autoscale(cluster: Cluster = Depends(get_cluster)):
+    """Get the autoscaling policy and the autoscaler's latest decision"""
+    return cluster.autoscaler.status()
+
+
+@app.put("/api/cluster/autoscale", response_model=AutoscaleStatus)
+async def update_autoscale(policy: AutoscalePolicy, cluster: Cluster = Depends(get_cluster)):
+    """Replace the autoscaling policy"""
+    cluster.autoscaler.set_policy(policy)
+    return cluster.autoscaler.status()
+
+
+@app.get("/api/cluster/logs", response_model=LogPage)
+async def get_cluster_logs(
+    request: Request,
+    response: Response,
+    since: Optional[int] = Query(None, ge=0, description="Cursor from a previous page; omit for the latest entries"),
+    limit: int = Query(config.LOG_PAGE_SIZE, ge=1),
+    source: Optional[List[str]] = Query(None, description="Only these sources, e.g. backend, spark-worker-1"),
+    level: Optional[Literal["debug", "info", "warn", "error"]] = Query(None, description="Minimum level"),
+    cluster: Cluster = Depends(get_cluster)
+):
+    """Get cluster log entries after a cursor, optionally filtered by source and level; 304 if none changed"""
+    etag = version_etag(request, cluster.log_store.version)
+    return revalidate(request, response, etag) or \
+        cluster.log_store.page(since=since, limit=limit, sources=source, level=level)
 
 
 @app.post("/api/cluster/logs/clear")
-async def clear_cluster_logs():
+async def clear_cluster_logs(cluster: Cluster = Depends(get_cluster)):
     """Clear cluster logs"""
-    global cluster_logs
-    cluster_logs = []
+    cluster.log_store.clear()
     return {"message": "Logs cleared"}
 
 
+@app.get("/api/cluster/events")
+async def stream_cluster_events(request: Request, cluster: Cluster = Depends(get_cluster)):
+    """Stream status and log changes as Server-Sent Events"""
+    queue = cluster.broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            # Send the current state first so clients need no initial poll
+            status = await cluster.status_cache.get()
+            yield format_sse("status", status.model_dump())
+            yield format_sse("logs", cluster.log_store.page(reset=True).model_dump())
+
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), config.EVENT_STREAM_KEEPALIVE)
+                    yield format_sse(event, data)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            cluster.broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Job Endpoints
+
+@app.get("/api/jobs", response_model=List[JobInfo])
+async def list_jobs(cluster_id: Optional[str] = Query(None, description="Only this cluster's jobs")):
+    """List recent background jobs, newest first"""
+    return [job.to_info() for job in job_manager.list_jobs(cluster_id)]
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """Get status and progress of a background job"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_info()
+
+
 # Notebook Management Endpoints
 
 @app.post("/api/notebooks/create", response_model=NotebookInfo)
@@ -150,10 +506,58 @@ async def create_notebook(notebook_create: NotebookCreate):
 
 
 @app.get("/api/notebooks/list", response_model=NotebookListResponse)
-async def list_notebooks():
-    """List all notebooks"""
-    notebooks = notebook_manager.list_notebooks()
-    return NotebookListResponse(notebooks=notebooks)
+async def list_notebooks(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=config.NOTEBOOK_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "modified_at", "name", "size"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    template: Optional[str] = None,
+    q: Optional[str] = None
+):
+    """List notebooks with cursor pagination, sorting and filtering; 304 while the index is unchanged"""
+    etag = version_etag(request, await asyncio.to_thread(notebook_manager.index_generation))
+    not_modified = revalidate(request, response, etag)
+    if not_modified:
+        return not_modified
+    try:
+        notebooks, next_cursor, total = await asyncio.to_thread(
+            notebook_manager.list_notebooks,
+            limit=limit, cursor=cursor, sort=sort, order=order, template=template, search=q
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return NotebookListResponse(notebooks=notebooks, next_cursor=next_cursor, total=total)
+
+
+@app.get("/api/notebooks/kernels", response_model=WarmKernelStats)
+async def get_warm_kernels(cluster: Cluster = Depends(get_cluster)):
+    """Get the running Jupyter kernels' pre-warmed SparkSessions and how long they took to build"""
+    return await cluster.warm_kernels.stats(cluster.manager.config or ClusterConfig())
+
+
+@app.post("/api/notebooks/run", response_model=ApiResponse, status_code=202)
+async def run_notebooks(run_request: NotebookRunRequest):
+    """Execute notebooks headlessly in the background"""
+    paths = []
+    for ref in run_request.notebooks:
+        path = resolve_notebook(ref)
+        if not path:
+            raise HTTPException(status_code=404, detail=f"Notebook not found: {ref}")
+        paths.append(path)
+
+    async def run(job: Job) -> tuple[bool, str]:
+        summary = await notebook_runner.run_batch(
+            paths, job.id, timeout=run_request.timeout,
+            use_cache=run_request.use_cache, progress=job.report
+        )
+        job.result = summary
+        message = f"{summary['succeeded']} succeeded, {summary['failed']} failed in {summary['duration']}s"
+        return summary['failed'] == 0, message
+
+    job = job_manager.submit("notebook_run", run)
+    return job_response(job, f"Running {len(paths)} notebook(s)")
 
 
 @app.delete("/api/notebooks/{notebook_id}", response_model=ApiResponse)
@@ -171,9 +575,9 @@ async def delete_notebook(notebook_id: str):
 
 
 @app.get("/api/notebooks/{notebook_id}/url")
-async def get_notebook_url(notebook_id: str):
-    """Get Jupyter URL for a notebook"""
-    url = notebook_manager.get_notebook_url(notebook_id)
+async def get_notebook_url(notebook_id: str, cluster: Cluster = Depends(get_cluster)):
+    """Get the notebook's URL in the cluster's Jupyter"""
+    url = notebook_manager.get_notebook_url(notebook_id, cluster.layout.jupyter_url)
     
     if url:
         return {"url": url}
@@ -181,13 +585,115 @@ async def get_notebook_url(notebook_id: str):
         raise HTTPException(status_code=404, detail="Notebook not found")
 
 
-# Frontend route
+# Dataset Endpoints
+
+def claim_dataset(name: str):
+    """Reserve ``name`` before anything is written, so a second request for it gets a 409"""
+    if not dataset_manager.claim(name):
+        raise HTTPException(status_code=409, detail=f"Dataset {name} is already being converted")
+
+
+def submit_conversion(name: str, source: Path, fmt: str, partition_by: List[str]) -> ApiResponse:
+    """Queue a background conversion of ``source`` into the ``name`` dataset, which the caller claimed"""
+
+    async def run(job: Job) -> tuple[bool, str]:
+        try:
+            success, message = await dataset_manager.convert(name, source, fmt, partition_by, job.report)
+        finally:
+            dataset_manager.release(name)
+        add_log(message, "info" if success else "error")
+        return success, message
+
+    try:
+        job = job_manager.submit("dataset", run)
+    except Exception:
+        dataset_manager.release(name)
+        raise
+    response = job_response(job, f"Converting {source.name} into dataset {name}")
+    response.data['dataset'] = name
+    return response
+
+
+@app.post("/api/datasets/upload", response_model=ApiResponse, status_code=202)
+async def upload_dataset(
+    file: UploadFile = File(...),
+    name: str = Form(...),
+    partition_by: str = Form("", description="Comma-separated partition columns")
+):
+    """Upload a CSV, JSON Lines or Parquet file and convert it to Parquet in the background"""
+    claim_dataset(name)
+    try:
+        path = await dataset_manager.save_upload(name, file)
+    except DatasetError as e:
+        dataset_manager.release(name)
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        dataset_manager.release(name)
+        raise
+    add_log(f"Uploaded {file.filename} to data/{path.relative_to(config.DATA_DIR)}")
+    columns = [c.strip() for c in partition_by.split(",") if c.strip()]
+    return submit_conversion(name, path.resolve(), detect_format(path), columns)
+
+
+@app.post("/api/datasets/register", response_model=ApiResponse, status_code=202)
+async def register_dataset(request: DatasetRegister):
+    """Convert a file already under data/ to Parquet in the background"""
+    try:
+        source, fmt = dataset_manager.resolve_source(request)
+    except DatasetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    claim_dataset(request.name)
+    return submit_conversion(request.name, source, fmt, request.partition_by)
+
+
+@app.get("/api/datasets", response_model=DatasetListResponse)
+async def list_datasets():
+    """List datasets with their row counts, sizes, schema and partition layout"""
+    datasets = dataset_manager.list_datasets()
+    return DatasetListResponse(datasets=datasets, total=len(datasets))
+
+
+@app.get("/api/datasets/{name}", response_model=DatasetInfo)
+async def get_dataset(name: str):
+    """Get one dataset's catalog entry"""
+    dataset = dataset_manager.get(name)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return dataset
+
+
+@app.delete("/api/datasets/{name}", response_model=ApiResponse)
+async def delete_dataset(name: str):
+    """Delete a dataset's Parquet files; its raw source file is kept"""
+    if dataset_manager.is_converting(name):
+        raise HTTPException(status_code=409, detail=f"Dataset {name} is being converted")
+    if not dataset_manager.delete(name):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return ApiResponse(success=True, message=f"Dataset {name} deleted")
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Expose Prometheus metrics"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# Frontend routes
+@app.get("/static/{path:path}")
+async def get_static_asset(path: str, request: Request):
+    """Serve a frontend file; fingerprinted names (app.<hash>.js) are cacheable for a year"""
+    response = static_assets.response(request, path)
+    if not response:
+        raise HTTPException(status_code=404, detail="Not found")
+    return response
+
+
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     """Serve the frontend application"""
-    frontend_file = frontend_dir / "index.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file))
+    response = static_assets.index_response(request)
+    if response:
+        return response
     else:
         return {"message": "PySpark Playground API", "docs": "/docs"}
 
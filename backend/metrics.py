@@ -0,0 +1,138 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from prometheus_client import Counter, Histogram
+import config
+
+
+# Buckets cover fast API reads up to multi-minute docker-compose runs
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "playground_http_request_duration_seconds",
+    "Time to produce an API response (time to first byte for streams)",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+COMPOSE_COMMAND_DURATION = Histogram(
+    "playground_compose_command_duration_seconds",
+    "Duration of docker-compose invocations",
+    ["subcommand"],
+    buckets=LATENCY_BUCKETS
+)
+COMPOSE_COMMANDS = Counter(
+    "playground_compose_commands_total",
+    "docker-compose invocations by exit code",
+    ["subcommand", "exit_code"]
+)
+COMPOSE_TIMEOUTS = Counter(
+    "playground_compose_timeouts_total",
+    "docker-compose invocations killed after their timeout",
+    ["subcommand"]
+)
+COMPOSE_REGENERATIONS = Counter(
+    "playground_compose_regenerations_total",
+    "docker-compose.yml regenerations",
+    ["outcome"]
+)
+
+COMPONENT_READY_SECONDS = Histogram(
+    "playground_component_ready_seconds",
+    "Time from docker-compose up returning until a component is usable",
+    ["component"],
+    buckets=LATENCY_BUCKETS
+)
+STARTUP_TIMEOUTS = Counter(
+    "playground_startup_timeouts_total",
+    "Starts whose components were not all ready within the wait_ready timeout"
+)
+
+NOTEBOOK_OPERATIONS = Counter(
+    "playground_notebook_operations_total",
+    "Notebook operations",
+    ["operation", "outcome"]
+)
+
+DATASET_CONVERSIONS = Counter(
+    "playground_dataset_conversions_total",
+    "Dataset conversions to Parquet",
+    ["format", "outcome"]
+)
+
+SHARED_TABLE_OPERATIONS = Counter(
+    "playground_shared_table_operations_total",
+    "Shared table operations on the Spark Connect server",
+    ["operation", "outcome"]
+)
+
+CLUSTER_STATE_CHANGES = Counter(
+    "playground_cluster_state_changes_total",
+    "Observed cluster transitions between running and stopped",
+    ["state"]
+)
+
+LOG_LINES_DROPPED = Counter(
+    "playground_log_lines_dropped_total",
+    "Container log lines dropped by per-source rate limiting",
+    ["source"]
+)
+
+
+@contextmanager
+def track_compose(subcommand: str):
+    """Time a docker-compose call; the caller sets ``exit_code`` on the yielded dict"""
+    outcome = {"exit_code": None}
+    started = time.perf_counter()
+    try:
+        yield outcome
+    except asyncio.TimeoutError:
+        COMPOSE_TIMEOUTS.labels(subcommand).inc()
+        outcome["exit_code"] = "timeout"
+        raise
+    except Exception:
+        outcome["exit_code"] = "error"
+        raise
+    finally:
+        COMPOSE_COMMAND_DURATION.labels(subcommand).observe(time.perf_counter() - started)
+        COMPOSE_COMMANDS.labels(subcommand, str(outcome["exit_code"])).inc()
+
+
+class RequestProfiler:
+    """Samples a single request with pyinstrument and writes HTML and speedscope output"""
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.profiler = Profiler(interval=config.PROFILING_INTERVAL, async_mode="enabled")
+
+    def __enter__(self):
+        self.profiler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.stop()
+
+    def save(self, route: str) -> Path:
+        """Write the profile and return the HTML path"""
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        config.PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        base = config.PROFILES_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{slug}"
+        html_path = base.with_suffix(".html")
+        html_path.write_text(self.profiler.output_html())
+        # Load the .speedscope.json file at https://www.speedscope.app for a flamegraph
+        base.with_suffix(".speedscope.json").write_text(self.profiler.output(SpeedscopeRenderer()))
+        return html_path
+
+
+def start_request_profiler() -> Optional[RequestProfiler]:
+    """Create a profiler if pyinstrument is installed"""
+    try:
+        return RequestProfiler()
+    except ImportError:
+        print("Profiling requested but pyinstrument is not installed (pip install pyinstrument)")
+        return None
@@ -1,19 +1,49 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Literal, Optional, List
+
+
+class LocalDirsConfig(BaseModel):
+    """Where a worker keeps shuffle and spill files (SPARK_LOCAL_DIRS)"""
+    # "container": the container's own filesystem; "host": a bind-mounted host directory;
+    # "tmpfs": memory-backed, counted against the worker's memory limit; "volume": a named volume
+    type: Literal["container", "host", "tmpfs", "volume"] = "container"
+    path: Optional[str] = None  # Host directory for "host"; each worker gets a subdirectory
+    size: Optional[str] = Field(None, pattern=r"^\d+[kmgtKMGT]?$")  # Size cap for "tmpfs", e.g. "2g"
+    volume: Optional[str] = None  # Volume name for "volume"; defaults to one per worker
+
+    @model_validator(mode="after")
+    def check_type_fields(self):
+        if self.type == "host" and not self.path:
+            raise ValueError("local_dirs of type 'host' need a path")
+        if self.type == "tmpfs" and not self.size:
+            raise ValueError("local_dirs of type 'tmpfs' need a size")
+        return self
 
 
 class WorkerConfig(BaseModel):
     """Configuration for a single worker"""
-    memory: str = "1g"
-    cores: int = 1
+    memory: str = Field("1g", pattern=r"^\d+[kmgtKMGT]?$")  # e.g. "512m", "2g"
+    cores: int = Field(1, ge=1)
+    local_dirs: Optional[LocalDirsConfig] = None
 
 
 class ClusterConfig(BaseModel):
     """Configuration for Spark cluster"""
     workers: Optional[List[WorkerConfig]] = None  # Per-worker config
     # Deprecated fields for backward compatibility
-    worker_memory: Optional[str] = None
-    worker_cores: Optional[int] = None
+    worker_memory: Optional[str] = Field(None, pattern=r"^\d+[kmgtKMGT]?$")
+    worker_cores: Optional[int] = Field(None, ge=1)
+    # Tuning written to spark-defaults.conf; see backend/spark_tuning.py
+    spark_profile: Literal["default", "etl", "ml", "low-latency"] = "default"
+    spark_conf: Dict[str, str] = {}  # Extra properties, applied last
+    # Run the external shuffle service on every worker and let drivers use dynamic allocation
+    shuffle_service: bool = False
+    # Run the Spark History Server on the event logs (port 18080)
+    history_server: bool = False
+    # Build a SparkSession in every Jupyter kernel as it starts; idle executors are released
+    kernel_warmup: bool = False
+    # Run a Spark Connect server that notebooks share through SparkSession.builder.remote()
+    connect_server: bool = False
     
     def get_worker_configs(self) -> List[WorkerConfig]:
         """Get list of worker configurations"""
@@ -27,13 +57,203 @@ class ClusterConfig(BaseModel):
         ) for _ in range(count)]
 
 
+class SparkDefaults(BaseModel):
+    """The spark-defaults.conf generated for the current cluster"""
+    profile: str
+    profiles: List[str]
+    overrides: Dict[str, str]  # The cluster's spark_conf
+    properties: Dict[str, str]  # Everything written to the file, overrides included
+
+
+class ClusterPorts(BaseModel):
+    """Host ports of one cluster's services; spark-worker-N's UI is on worker_ui_base + N"""
+    master: int
+    master_ui: int
+    jupyter: int
+    history: int
+    connect: int
+    connect_ui: int
+    worker_ui_base: int
+
+
+class ClusterCreate(BaseModel):
+    """Request model for a new named cluster"""
+    id: str  # Lower-case letters, digits and '-', e.g. "bench"
+    config: Optional[ClusterConfig] = None  # Default workers if omitted
+    start: bool = False
+
+
+class ClusterInfo(BaseModel):
+    """A named cluster, where it lives and whether it runs"""
+    id: str
+    project: str  # docker-compose project name
+    compose_file: str
+    ports: ClusterPorts
+    max_workers: int  # Worker UI ports available in the cluster's port block
+    running: bool = False
+    worker_count: int = 0
+    master_ui_url: str
+    jupyter_url: str
+    created_at: Optional[str] = None
+
+
+class ClusterListResponse(BaseModel):
+    """All named clusters"""
+    clusters: List[ClusterInfo]
+    total: int
+
+
+class ClusterState(BaseModel):
+    """The config last rendered to docker-compose.yml, persisted across backend restarts"""
+    config: ClusterConfig
+    compose_hash: str
+    updated_at: str
+
+
+class AutoscalePolicy(BaseModel):
+    """Rules for adding and removing workers automatically"""
+    enabled: bool = False
+    min_workers: int = Field(1, ge=1)  # An empty worker list means "default workers" to ClusterConfig
+    max_workers: int = Field(4, ge=1)
+    worker: WorkerConfig = WorkerConfig()  # Shape of workers the autoscaler adds
+    scale_up_utilization: float = Field(0.8, gt=0, le=1)  # Core utilization that triggers a scale-up
+    scale_down_utilization: float = Field(0.2, ge=0, lt=1)
+    scale_up_step: int = Field(1, ge=1)
+    scale_up_cooldown: float = Field(60, ge=0)  # Seconds after any scaling before scaling up again
+    scale_down_cooldown: float = Field(300, ge=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.min_workers > self.max_workers:
+            raise ValueError("min_workers must not exceed max_workers")
+        if self.scale_down_utilization >= self.scale_up_utilization:
+            raise ValueError("scale_down_utilization must be below scale_up_utilization")
+        return self
+
+
+class AutoscaleStatus(BaseModel):
+    """Autoscaler policy and its most recent decision"""
+    policy: AutoscalePolicy
+    draining: Optional[str] = None  # Worker service being drained before removal
+    last_decision: Optional[str] = None
+    last_decision_at: Optional[str] = None
+    last_scaled_at: Optional[str] = None
+
+
+class HostCapacity(BaseModel):
+    """CPU and memory available to containers on the Docker host"""
+    cpus: int
+    memory_mb: int
+    source: str  # docker, host or env
+
+
+class CapacityReport(BaseModel):
+    """Host capacity compared with what a cluster configuration needs"""
+    host: HostCapacity
+    reserved_cpus: float
+    reserved_memory_mb: int
+    available_cpus: int
+    available_memory_mb: int
+    required_cpus: int
+    required_memory_mb: int
+    fits: bool
+    placement_mode: str
+
+
+class SparkWorkerMetrics(BaseModel):
+    """A worker as registered with the Spark master"""
+    id: str
+    host: str
+    state: str
+    ui_url: Optional[str] = None
+    cores: int = 0
+    cores_used: int = 0
+    memory_mb: int = 0
+    memory_used_mb: int = 0
+    executors: int = 0
+    last_heartbeat: Optional[int] = None  # Epoch milliseconds
+
+
+class SparkApplicationMetrics(BaseModel):
+    """An application running on the Spark master"""
+    id: str
+    name: str
+    state: str
+    cores: int = 0
+    memory_per_executor_mb: int = 0
+    executors: int = 0
+    duration_ms: int = 0
+
+
+class ClusterUtilization(BaseModel):
+    """Aggregated resource usage reported by the Spark master and workers"""
+    state: str = "unknown"  # idle, busy, saturated or unreachable
+    alive_workers: int = 0
+    cores_total: int = 0
+    cores_used: int = 0
+    memory_total_mb: int = 0
+    memory_used_mb: int = 0
+    core_utilization: float = 0.0
+    memory_utilization: float = 0.0
+    running_applications: int = 0
+    waiting_applications: int = 0
+    active_executors: int = 0
+    workers: List[SparkWorkerMetrics] = []
+    applications: List[SparkApplicationMetrics] = []
+    error: Optional[str] = None
+    collected_at: Optional[str] = None
+
+
+class ReadinessComponent(BaseModel):
+    """Readiness of one service after docker-compose up"""
+    name: str  # "spark-master", "spark-worker-N" or "jupyter"
+    ready: bool = False
+    ready_after: Optional[float] = None  # Seconds after docker-compose up returned
+    detail: str = ""
+
+
+class StartupTimeline(BaseModel):
+    """How long the last start took until each component was usable"""
+    started_at: str
+    compose_seconds: Optional[float] = None  # Duration of docker-compose up itself
+    ready: bool = False
+    timed_out: bool = False
+    elapsed: float = 0.0
+    components: List[ReadinessComponent] = []
+
+
 class ClusterStatus(BaseModel):
     """Status information for Spark cluster"""
     running: bool
     master_url: Optional[str] = None
     master_ui_url: Optional[str] = None
+    history_ui_url: Optional[str] = None
+    connect_url: Optional[str] = None  # Spark Connect endpoint on the host, when the server runs
     worker_count: int = 0
     workers: List[dict] = []
+    utilization: Optional[ClusterUtilization] = None
+    startup: Optional[StartupTimeline] = None  # Readiness of the last start or reconfiguration
+    snapshot_age: Optional[float] = None  # Seconds since the status was collected
+    updated_at: Optional[str] = None
+
+
+class LogEntry(BaseModel):
+    """One backend message or line of container output"""
+    seq: int
+    timestamp: str
+    level: Literal["debug", "info", "warn", "error"] = "info"
+    source: str = "backend"  # "backend" or a compose service name
+    message: str
+
+
+class LogPage(BaseModel):
+    """Log entries plus the cursor to pass as ``since`` on the next request"""
+    entries: List[LogEntry]
+    cursor: int
+    gap: bool = False  # Entries after ``since`` were evicted before they were fetched
+    sources: List[str] = []
+    dropped: Dict[str, int] = {}  # Lines dropped by rate limiting, per source
+    reset: bool = False  # Replace, rather than extend, what the client shows
 
 
 class NotebookCreate(BaseModel):
@@ -42,6 +262,146 @@ class NotebookCreate(BaseModel):
     template: Optional[str] = "blank"
 
 
+class SparkApplicationInfo(BaseModel):
+    """An application with an event log under .playground/spark-events/"""
+    app_id: str
+    name: Optional[str] = None
+    in_progress: bool = False
+    size_bytes: int = 0
+    modified_at: str
+
+
+class SparkApplicationListResponse(BaseModel):
+    """Applications with event logs, newest first"""
+    applications: List[SparkApplicationInfo]
+    total: int
+
+
+class StageSummary(BaseModel):
+    """Task statistics of one stage attempt, from its event log"""
+    stage_id: int
+    attempt: int = 0
+    name: str = ""
+    status: Literal["running", "succeeded", "failed"] = "running"
+    duration_ms: Optional[int] = None  # Submission to completion
+    tasks: int = 0
+    failed_tasks: int = 0
+    task_time_median_ms: int = 0
+    task_time_max_ms: int = 0
+    skew: Optional[float] = None  # Max/median task time
+    gc_time_ms: int = 0
+    memory_spilled_bytes: int = 0
+    disk_spilled_bytes: int = 0
+    shuffle_read_bytes: int = 0
+    shuffle_write_bytes: int = 0
+    input_bytes: int = 0
+
+
+class SparkApplicationAnalysis(BaseModel):
+    """Performance summary of one application's event log"""
+    app_id: str
+    name: Optional[str] = None
+    in_progress: bool = False
+    started_at: Optional[str] = None
+    duration_ms: Optional[int] = None
+    stages: int = 0
+    tasks: int = 0
+    failed_tasks: int = 0
+    executor_run_time_ms: int = 0
+    gc_time_ms: int = 0
+    gc_fraction: float = 0.0  # GC time / executor run time
+    memory_spilled_bytes: int = 0
+    disk_spilled_bytes: int = 0
+    shuffle_read_bytes: int = 0
+    shuffle_write_bytes: int = 0
+    slowest_stages: List[StageSummary] = []
+    skewed_stages: List[StageSummary] = []  # Skew of at least EVENT_LOG_SKEW_RATIO
+    spilling_stages: List[StageSummary] = []
+    log_size_bytes: int = 0
+    parse_errors: int = 0  # Lines that were not valid JSON
+
+
+class WarmKernel(BaseModel):
+    """The pre-warmed SparkSession of one Jupyter kernel"""
+    kernel_id: str
+    status: Literal["warming", "ready", "failed"]
+    started_at: str
+    warm_seconds: Optional[float] = None  # Kernel start until the session was built
+    app_id: Optional[str] = None
+    error: Optional[str] = None
+    execution_state: Optional[str] = None  # From Jupyter, e.g. "idle" or "busy"
+    last_activity: Optional[str] = None
+
+
+class WarmKernelStats(BaseModel):
+    """Warm-up state of the running Jupyter kernels"""
+    enabled: bool
+    idle_timeout: str
+    pool_size: int = 0  # Kernels holding a ready session
+    warming: int = 0
+    failed: int = 0
+    mean_warm_seconds: Optional[float] = None
+    max_warm_seconds: Optional[float] = None
+    jupyter_reachable: bool = True  # False: kernels are listed from their stats files alone
+    kernels: List[WarmKernel] = []
+
+
+class SharedTableCreate(BaseModel):
+    """Request model for sharing a table through the Spark Connect server; give exactly one source"""
+    name: str  # Notebooks read it as global_temp.<name>
+    dataset: Optional[str] = None  # A dataset from the catalog
+    path: Optional[str] = None  # Or a file or directory relative to data/
+    format: Optional[Literal["csv", "json", "parquet"]] = None  # Inferred from the extension if omitted
+    query: Optional[str] = None  # Or a SQL query, e.g. over other shared tables
+    cache: bool = True  # Cache it in the server's executors as soon as it is registered
+
+
+class SharedTable(BaseModel):
+    """A shared table's definition, and its state on the Spark Connect server"""
+    name: str
+    qualified_name: str  # global_temp.<name>
+    dataset: Optional[str] = None
+    path: Optional[str] = None  # As seen from the server, for dataset and path sources
+    format: Optional[str] = None
+    query: Optional[str] = None
+    cache: bool = True
+    registered: Optional[bool] = None  # The view exists on the server; None if it can't be asked
+    cached: bool = False
+    cached_partitions: int = 0
+    partitions: int = 0
+    memory_bytes: int = 0
+    disk_bytes: int = 0
+    storage_level: Optional[str] = None
+    created_at: str
+    cached_at: Optional[str] = None
+    cache_seconds: Optional[float] = None  # Time CACHE TABLE took to scan and store it
+    error: Optional[str] = None
+
+
+class SharedTableListResponse(BaseModel):
+    """Shared tables on the Spark Connect server"""
+    tables: List[SharedTable]
+    total: int
+
+
+class SparkConnectStats(BaseModel):
+    """Sessions and cache memory of the shared Spark Connect server"""
+    enabled: bool
+    url: str  # Endpoint for notebooks
+    ui_url: str
+    reachable: bool = False
+    app_id: Optional[str] = None
+    sessions_online: Optional[int] = None  # None if the server's UI page could not be read
+    sessions_total: Optional[int] = None
+    running_requests: Optional[int] = None
+    executors: int = 0
+    storage_memory_bytes: int = 0  # Storage memory of all executors
+    storage_memory_used_bytes: int = 0
+    cached_tables: int = 0
+    cached_memory_bytes: int = 0  # Of the shared tables; storage_memory_used_bytes covers all caching
+    cached_disk_bytes: int = 0
+
+
 class NotebookInfo(BaseModel):
     """Information about a notebook"""
     id: str
@@ -49,11 +409,63 @@ class NotebookInfo(BaseModel):
     path: str
     created_at: str
     template: str
+    modified_at: Optional[str] = None
+    size: Optional[int] = None
 
 
 class NotebookListResponse(BaseModel):
     """Response model for listing notebooks"""
     notebooks: List[NotebookInfo]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
+    total: int = 0
+
+
+class NotebookRunRequest(BaseModel):
+    """Request model for executing notebooks headlessly"""
+    notebooks: List[str]  # "user/<id>", "templates/<name>" or a bare user notebook ID
+    timeout: Optional[float] = None  # Per-notebook limit in seconds
+    use_cache: bool = True
+
+
+class DatasetRegister(BaseModel):
+    """Request model for converting a file already under data/ into a dataset"""
+    name: str
+    path: str  # Relative to data/, e.g. "raw/trips.csv"
+    format: Optional[Literal["csv", "json", "parquet"]] = None  # Inferred from the extension if omitted
+    partition_by: List[str] = []
+
+
+class DatasetField(BaseModel):
+    """One column of a dataset's schema"""
+    name: str
+    type: str  # Arrow type, e.g. "int64", "timestamp[s]"
+    nullable: bool = True
+
+
+class DatasetInfo(BaseModel):
+    """Catalog entry for a dataset converted to Parquet"""
+    name: str
+    status: Literal["converting", "ready", "failed"]
+    source: str  # Original file, relative to data/
+    format: str
+    path: str  # Parquet directory as seen from Jupyter and the workers
+    partition_by: List[str] = []
+    partitions: int = 0
+    files: int = 0
+    rows: int = 0
+    size_bytes: int = 0
+    source_size_bytes: int = 0
+    schema_fields: List[DatasetField] = []
+    error: Optional[str] = None
+    created_at: str
+    converted_at: Optional[str] = None
+    duration: Optional[float] = None
+
+
+class DatasetListResponse(BaseModel):
+    """Dataset catalog"""
+    datasets: List[DatasetInfo]
+    total: int
 
 
 class ApiResponse(BaseModel):
@@ -61,3 +473,18 @@ class ApiResponse(BaseModel):
     success: bool
     message: str
     data: Optional[dict] = None
+
+
+class JobInfo(BaseModel):
+    """Status and progress of a background cluster operation"""
+    id: str
+    kind: str
+    cluster_id: Optional[str] = None
+    status: str
+    message: str = ""
+    progress: List[str] = []
+    coalesced: int = 0
+    result: Optional[dict] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -0,0 +1,219 @@
+import base64
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import config
+from models import NotebookInfo
+
+
+SORT_COLUMNS = {"created_at", "modified_at", "name", "size"}
+
+# Notebook IDs are "<name>_<YYYYmmdd>_<HHMMSS>"
+ID_TIMESTAMP = re.compile(r"_\d{8}_\d{6}$")
+
+
+class NotebookIndex:
+    """Persistent SQLite index of user notebooks.
+
+    ``NotebookManager`` writes to the index when it creates or deletes a
+    notebook. Files added, changed or removed behind its back (Jupyter,
+    the shared volume) are picked up by ``sync``, which only rescans when
+    the directory's mtime moved or the rescan interval elapsed, and only
+    re-reads notebooks whose size or mtime changed.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, notebooks_dir: Optional[Path] = None):
+        self.db_path = db_path or config.NOTEBOOK_INDEX_DB
+        self.notebooks_dir = notebooks_dir or config.USER_NOTEBOOKS_DIR
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._last_dir_mtime: Optional[float] = None
+        self._last_scan = 0.0
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS notebooks (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    template TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    created_at TEXT NOT NULL,
+                    modified_at TEXT NOT NULL
+                )
+            """)
+            for column in SORT_COLUMNS:
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_notebooks_{column} ON notebooks ({column}, id)"
+                )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("INSERT OR IGNORE INTO meta VALUES ('generation', '0')")
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every change to the index"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row["value"])
+
+    def upsert(self, notebook_path: Path, name: str, template: str, created_at: Optional[str] = None):
+        """Record a notebook the backend has just written"""
+        stat = notebook_path.stat()
+        with self._lock, self._db:
+            self._upsert_row(notebook_path, name, template, stat, created_at)
+            self._bump_generation()
+
+    def remove(self, notebook_id: str):
+        with self._lock, self._db:
+            if self._db.execute("DELETE FROM notebooks WHERE id = ?", (notebook_id,)).rowcount:
+                self._bump_generation()
+
+    def sync(self, force: bool = False) -> int:
+        """Bring the index in step with the directory; returns the number of changes"""
+        try:
+            dir_mtime = self.notebooks_dir.stat().st_mtime
+        except FileNotFoundError:
+            return 0
+
+        now = time.monotonic()
+        if (not force and dir_mtime == self._last_dir_mtime
+                and now - self._last_scan < config.NOTEBOOK_INDEX_RESCAN_INTERVAL):
+            return 0
+
+        with self._lock:
+            known = {row["id"]: (row["size"], row["mtime"]) for row in
+                     self._db.execute("SELECT id, size, mtime FROM notebooks")}
+            changes = 0
+            with self._db:
+                seen = set()
+                with os.scandir(self.notebooks_dir) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith(".ipynb") or not entry.is_file():
+                            continue
+                        notebook_id = entry.name[:-len(".ipynb")]
+                        seen.add(notebook_id)
+                        stat = entry.stat()
+                        if known.get(notebook_id) == (stat.st_size, stat.st_mtime):
+                            continue
+                        name, template = self._read_metadata(Path(entry.path), notebook_id)
+                        self._upsert_row(Path(entry.path), name, template, stat)
+                        changes += 1
+
+                for notebook_id in set(known) - seen:
+                    self._db.execute("DELETE FROM notebooks WHERE id = ?", (notebook_id,))
+                    changes += 1
+
+                if changes:
+                    self._bump_generation()
+
+            self._last_dir_mtime = dir_mtime
+            self._last_scan = now
+        return changes
+
+    def query(self, limit: int = 100, cursor: Optional[str] = None, sort: str = "created_at",
+              order: str = "desc", template: Optional[str] = None,
+              search: Optional[str] = None) -> tuple[List[NotebookInfo], Optional[str], int]:
+        """Return one page of notebooks, the cursor for the next page and the total match count"""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort}")
+        descending = order == "desc"
+
+        filters, params = [], []
+        if template:
+            filters.append("template = ?")
+            params.append(template)
+        if search:
+            filters.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+
+        with self._lock:
+            where = f"WHERE {' AND '.join(filters)}" if filters else ""
+            total = self._db.execute(f"SELECT COUNT(*) FROM notebooks {where}", params).fetchone()[0]
+
+            # Keyset pagination on (sort column, id) stays fast on deep pages
+            page_filters, page_params = list(filters), list(params)
+            if cursor:
+                value, last_id = decode_cursor(cursor)
+                op = "<" if descending else ">"
+                page_filters.append(f"({sort}, id) {op} (?, ?)")
+                page_params.extend([value, last_id])
+            where = f"WHERE {' AND '.join(page_filters)}" if page_filters else ""
+            direction = "DESC" if descending else "ASC"
+            rows = self._db.execute(
+                f"SELECT * FROM notebooks {where} ORDER BY {sort} {direction}, id {direction} LIMIT ?",
+                page_params + [limit + 1]
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][sort], rows[-1]["id"])
+        return [self._to_info(row) for row in rows], next_cursor, total
+
+    def _upsert_row(self, notebook_path: Path, name: str, template: str, stat: os.stat_result,
+                    created_at: Optional[str] = None):
+        self._db.execute(
+            """INSERT INTO notebooks (id, name, template, path, size, mtime, created_at, modified_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   name = excluded.name, template = excluded.template, path = excluded.path,
+                   size = excluded.size, mtime = excluded.mtime, modified_at = excluded.modified_at""",
+            (
+                notebook_path.stem,
+                name,
+                template,
+                str(notebook_path.relative_to(config.BASE_DIR)),
+                stat.st_size,
+                stat.st_mtime,
+                created_at or datetime.fromtimestamp(stat.st_ctime).isoformat(),
+                datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            )
+        )
+
+    def _bump_generation(self):
+        self._db.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+
+    def _read_metadata(self, path: Path, notebook_id: str) -> tuple[str, str]:
+        """Recover name and template from the notebook, falling back to its ID"""
+        try:
+            with open(path, 'r') as f:
+                metadata = json.load(f).get("metadata", {}).get("playground", {})
+        except (OSError, ValueError):
+            metadata = {}
+        name = metadata.get("name") or ID_TIMESTAMP.sub("", notebook_id).replace("_", " ")
+        return name, metadata.get("template") or "unknown"
+
+    def _to_info(self, row: sqlite3.Row) -> NotebookInfo:
+        return NotebookInfo(
+            id=row["id"],
+            name=row["name"],
+            path=row["path"],
+            created_at=row["created_at"],
+            modified_at=row["modified_at"],
+            size=row["size"],
+            template=row["template"]
+        )
+
+
+def encode_cursor(value, notebook_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, notebook_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        value, notebook_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, notebook_id
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
@@ -1,11 +1,12 @@
 import os
 import json
-import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
 import config
+import metrics
 from models import NotebookCreate, NotebookInfo
+from notebook_index import NotebookIndex
 
 
 class NotebookManager:
@@ -14,6 +15,7 @@ class NotebookManager:
     def __init__(self):
         self.notebooks_dir = config.USER_NOTEBOOKS_DIR
         self.templates_dir = config.TEMPLATES_DIR
+        self.index = NotebookIndex(notebooks_dir=self.notebooks_dir)
         
     def create_notebook(self, notebook_create: NotebookCreate) -> Optional[NotebookInfo]:
         """Create a new notebook from template or blank"""
@@ -25,32 +27,51 @@ class NotebookManager:
             notebook_path = self.notebooks_dir / notebook_filename
             
             # Check if template exists
-            template_name = notebook_create.template
-            if template_name and template_name != "blank":
+            template_name = notebook_create.template or "blank"
+            # Recorded in the notebook so the index can recover it on a rescan
+            playground_metadata = {"name": notebook_create.name, "template": template_name}
+            if template_name != "blank":
                 template_path = self.templates_dir / f"{template_name}.ipynb"
                 if template_path.exists():
                     # Copy template
-                    shutil.copy(template_path, notebook_path)
+                    self._copy_template(template_path, notebook_path, playground_metadata)
                 else:
                     # Create blank if template not found
-                    self._create_blank_notebook(notebook_path)
+                    self._create_blank_notebook(notebook_path, playground_metadata)
             else:
                 # Create blank notebook
-                self._create_blank_notebook(notebook_path)
+                self._create_blank_notebook(notebook_path, playground_metadata)
+
+            created_at = datetime.now().isoformat()
+            self.index.upsert(notebook_path, notebook_create.name, template_name, created_at)
+            metrics.NOTEBOOK_OPERATIONS.labels("create", "success").inc()
+            stat = notebook_path.stat()
             
             return NotebookInfo(
                 id=notebook_id,
                 name=notebook_create.name,
                 path=str(notebook_path.relative_to(config.BASE_DIR)),
-                created_at=datetime.now().isoformat(),
-                template=template_name or "blank"
+                created_at=created_at,
+                modified_at=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                size=stat.st_size,
+                template=template_name
             )
             
         except Exception as e:
+            metrics.NOTEBOOK_OPERATIONS.labels("create", "error").inc()
             print(f"Error creating notebook: {e}")
             return None
     
-    def _create_blank_notebook(self, path: Path):
+    def _copy_template(self, template_path: Path, path: Path, playground_metadata: dict):
+        """Copy a template notebook, tagging it with playground metadata"""
+        with open(template_path, 'r') as f:
+            notebook_content = json.load(f)
+        notebook_content.setdefault("metadata", {})["playground"] = playground_metadata
+
+        with open(path, 'w') as f:
+            json.dump(notebook_content, f, indent=1)
+
+    def _create_blank_notebook(self, path: Path, playground_metadata: Optional[dict] = None):
         """Create a blank Jupyter notebook with Spark initialization"""
         notebook_content = {
             "cells": [
@@ -69,6 +90,9 @@ class NotebookManager:
                     "metadata": {},
                     "source": [
                         "# Initialize Spark Session\n",
+                        "# Executor sizing, shuffle partitions, AQE, Kryo and Arrow come from\n",
+                        "# the cluster's spark-defaults.conf\n",
+                        "# With kernel warm-up on, this returns the session the kernel built when it started\n",
                         "from pyspark.sql import SparkSession\n",
                         "\n",
                         "spark = SparkSession.builder \\\n",
@@ -98,7 +122,8 @@ class NotebookManager:
                 "language_info": {
                     "name": "python",
                     "version": "3"
-                }
+                },
+                "playground": playground_metadata or {}
             },
             "nbformat": 4,
             "nbformat_minor": 4
@@ -107,52 +132,57 @@ class NotebookManager:
         with open(path, 'w') as f:
             json.dump(notebook_content, f, indent=2)
     
-    def list_notebooks(self) -> List[NotebookInfo]:
-        """List all user notebooks"""
-        notebooks = []
-        
+    def list_notebooks(self, limit: int = 100, cursor: Optional[str] = None,
+                       sort: str = "created_at", order: str = "desc",
+                       template: Optional[str] = None,
+                       search: Optional[str] = None) -> tuple[List[NotebookInfo], Optional[str], int]:
+        """List user notebooks from the index, one page at a time"""
         try:
-            for notebook_file in self.notebooks_dir.glob("*.ipynb"):
-                stat = notebook_file.stat()
-                created_at = datetime.fromtimestamp(stat.st_ctime)
-                
-                notebooks.append(NotebookInfo(
-                    id=notebook_file.stem,
-                    name=notebook_file.stem.split('_')[0].replace('_', ' '),
-                    path=str(notebook_file.relative_to(config.BASE_DIR)),
-                    created_at=created_at.isoformat(),
-                    template="unknown"
-                ))
-            
-            # Sort by creation time (newest first)
-            notebooks.sort(key=lambda x: x.created_at, reverse=True)
-            
+            self.index.sync()
         except Exception as e:
-            print(f"Error listing notebooks: {e}")
-        
-        return notebooks
+            print(f"Error syncing notebook index: {e}")
+        try:
+            result = self.index.query(limit=limit, cursor=cursor, sort=sort, order=order,
+                                      template=template, search=search)
+        except Exception:
+            metrics.NOTEBOOK_OPERATIONS.labels("list", "error").inc()
+            raise
+        metrics.NOTEBOOK_OPERATIONS.labels("list", "success").inc()
+        return result
     
+    def index_generation(self) -> int:
+        """Sync the index and return its generation, which changes whenever any listing could"""
+        try:
+            self.index.sync()
+        except Exception as e:
+            print(f"Error syncing notebook index: {e}")
+        return self.index.generation
+
     def delete_notebook(self, notebook_id: str) -> bool:
         """Delete a notebook by ID"""
         try:
             notebook_path = self.notebooks_dir / f"{notebook_id}.ipynb"
             if notebook_path.exists():
                 notebook_path.unlink()
+                self.index.remove(notebook_id)
+                metrics.NOTEBOOK_OPERATIONS.labels("delete", "success").inc()
                 return True
+            metrics.NOTEBOOK_OPERATIONS.labels("delete", "not_found").inc()
             return False
             
         except Exception as e:
+            metrics.NOTEBOOK_OPERATIONS.labels("delete", "error").inc()
             print(f"Error deleting notebook: {e}")
             return False
     
-    def get_notebook_url(self, notebook_id: str) -> Optional[str]:
-        """Get Jupyter URL for a specific notebook"""
+    def get_notebook_url(self, notebook_id: str, jupyter_url: Optional[str] = None) -> Optional[str]:
+        """Get the URL of a notebook in Jupyter, the default cluster's unless ``jupyter_url`` is given"""
         try:
             notebook_path = self.notebooks_dir / f"{notebook_id}.ipynb"
             if notebook_path.exists():
                 # Relative path from notebooks directory
                 relative_path = f"user/{notebook_id}.ipynb"
-                return f"{config.JUPYTER_URL}/notebooks/{relative_path}"
+                return f"{jupyter_url or config.JUPYTER_URL}/notebooks/{relative_path}"
             return None
             
         except Exception as e:
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+import config
+import metrics
+
+
+def resolve_notebook(ref: str) -> Optional[Path]:
+    """Resolve "user/<id>", "templates/<name>" or a bare user notebook ID to a file"""
+    ref = ref[:-len(".ipynb")] if ref.endswith(".ipynb") else ref
+    if "/" in ref:
+        folder, name = ref.split("/", 1)
+        base = {"user": config.USER_NOTEBOOKS_DIR, "templates": config.TEMPLATES_DIR}.get(folder)
+    else:
+        base, name = config.USER_NOTEBOOKS_DIR, ref
+    if base is None or "/" in name or name.startswith("."):
+        return None
+    path = base / f"{name}.ipynb"
+    return path if path.exists() else None
+
+
+def cell_cache_keys(cells: list, kernel_name: str) -> List[Optional[str]]:
+    """Chain-hash code cells so each key covers the cell and every code cell above it"""
+    keys = []
+    chain = hashlib.sha256(kernel_name.encode()).hexdigest()
+    for cell in cells:
+        if cell.get("cell_type") != "code":
+            keys.append(None)
+            continue
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+        chain = hashlib.sha256((chain + source).encode()).hexdigest()
+        keys.append(chain)
+    return keys
+
+
+class CellCache:
+    """On-disk store of executed cell outputs keyed by chained source hash"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, entry: dict):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        tmp_path.replace(path)
+
+
+def execute_notebook(notebook_path: str, output_path: str, timeout: float,
+                     use_cache: bool = True) -> dict:
+    """Execute one notebook headlessly in a fresh kernel (runs in a pool process).
+
+    A kernel's state cannot be restored from cached outputs, so cached
+    results are only reused when every code cell hits the cache; the
+    notebook is then written without starting a kernel at all. Otherwise
+    all cells run and refresh the cache.
+    """
+    import nbformat
+    from nbclient import NotebookClient
+    from nbclient.exceptions import CellExecutionError, CellTimeoutError
+
+    started = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    nb = nbformat.read(notebook_path, as_version=4)
+    kernel_name = nb.metadata.get("kernelspec", {}).get("name", "python3")
+    keys = cell_cache_keys(nb.cells, kernel_name)
+    cache = CellCache(config.NOTEBOOK_CACHE_DIR)
+    cell_timings = []
+
+    status, error = "succeeded", None
+    cached = [cache.get(key) if use_cache and key else None for key in keys]
+    code_cells = [i for i, key in enumerate(keys) if key]
+
+    if use_cache and all(cached[i] is not None for i in code_cells):
+        for i in code_cells:
+            nb.cells[i].outputs = [nbformat.from_dict(o) for o in cached[i]["outputs"]]
+            nb.cells[i].execution_count = cached[i].get("execution_count")
+            nb.cells[i].metadata["execution_time"] = 0.0
+            nb.cells[i].metadata["cached"] = True
+            cell_timings.append({"index": i, "seconds": 0.0, "cached": True})
+    else:
+        client = NotebookClient(
+            nb,
+            kernel_name=kernel_name,
+            timeout=max(1, int(timeout)),
+            resources={"metadata": {"path": str(Path(notebook_path).parent)}}
+        )
+        try:
+            with client.setup_kernel():
+                for i in code_cells:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Run exceeded {timeout}s")
+                    # The per-cell limit shrinks so the whole run honours the timeout
+                    client.timeout = max(1, int(remaining))
+                    cell_started = time.perf_counter()
+                    try:
+                        client.execute_cell(nb.cells[i], i)
+                    finally:
+                        seconds = round(time.perf_counter() - cell_started, 3)
+                        nb.cells[i].metadata["execution_time"] = seconds
+                        nb.cells[i].metadata["cached"] = False
+                        cell_timings.append({"index": i, "seconds": seconds, "cached": False})
+                    if use_cache:
+                        cache.put(keys[i], {
+                            "outputs": nb.cells[i].outputs,
+                            "execution_count": nb.cells[i].execution_count
+                        })
+        except (CellTimeoutError, TimeoutError) as e:
+            status, error = "timeout", str(e).splitlines()[0]
+        except CellExecutionError as e:
+            status, error = "failed", f"{e.ename}: {e.evalue}"
+        except Exception as e:
+            status, error = "failed", str(e)
+
+    duration = round(time.perf_counter() - started, 3)
+    nb.metadata["playground_run"] = {
+        "status": status,
+        "error": error,
+        "duration": duration,
+        "executed_at": datetime.now().isoformat(),
+        "cells": cell_timings
+    }
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    nbformat.write(nb, output_path)
+
+    return {
+        "notebook": notebook_path,
+        "output": output_path,
+        "status": status,
+        "error": error,
+        "duration": duration,
+        "cached_cells": sum(1 for t in cell_timings if t["cached"]),
+        "executed_cells": sum(1 for t in cell_timings if not t["cached"]),
+        "cells": cell_timings
+    }
+
+
+class NotebookRunner:
+    """Runs batches of notebooks headlessly on a bounded pool of kernel processes"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or config.NOTEBOOK_RUN_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers avoid inheriting the server's event loop and threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run_batch(self, notebooks: List[Path], run_id: str, timeout: Optional[float] = None,
+                        use_cache: bool = True,
+                        progress: Optional[Callable[[str], None]] = None) -> dict:
+        """Execute notebooks in parallel and write them plus a summary under the run directory"""
+        timeout = timeout or config.NOTEBOOK_RUN_TIMEOUT
+        run_dir = config.NOTEBOOK_RUNS_DIR / run_id
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        async def run_one(path: Path) -> dict:
+            output_path = run_dir / f"{path.parent.name}_{path.name}"
+            try:
+                result = await loop.run_in_executor(
+                    pool, execute_notebook, str(path), str(output_path), timeout, use_cache
+                )
+            except BrokenProcessPool as e:
+                # A crashed kernel process poisons the pool; start a fresh one next time
+                self._pool = None
+                result = {"notebook": str(path), "status": "failed", "error": str(e)}
+            except Exception as e:
+                result = {"notebook": str(path), "status": "failed", "error": str(e)}
+            metrics.NOTEBOOK_OPERATIONS.labels("run", result["status"]).inc()
+            if progress:
+                progress(f"{path.name}: {result['status']} ({result.get('duration', 0)}s)")
+            return result
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run_one(path) for path in notebooks))
+        summary = {
+            "run_id": run_id,
+            "duration": round(time.perf_counter() - started, 3),
+            "succeeded": sum(1 for r in results if r["status"] == "succeeded"),
+            "failed": sum(1 for r in results if r["status"] != "succeeded"),
+            "notebooks": results
+        }
+
+        run_dir.mkdir(parents=True, exist_ok=True)
+        with open(run_dir / "summary.json", 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
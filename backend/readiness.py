@@ -0,0 +1,132 @@
+import asyncio
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import config
+import metrics
+from models import ReadinessComponent, StartupTimeline, WorkerConfig
+from capacity import parse_memory_mb
+from compose_model import worker_service_name
+from spark_metrics import fetch_json
+
+
+def http_responds(url: str, timeout: float) -> bool:
+    """Whether a server answers at ``url``; error statuses count, refused connections don't"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout):
+            return True
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (OSError, ValueError):
+        return False
+
+
+class ReadinessProbe:
+    """Waits until a freshly started cluster can actually run jobs.
+
+    ``docker-compose up`` returns once the containers exist, well before
+    Spark is usable. The probe then checks, every ``READY_POLL_INTERVAL``
+    seconds, that the master accepts connections, that every configured
+    worker has registered with the master with its configured cores and
+    memory, and that Jupyter answers HTTP. Each component's readiness
+    latency is recorded in a ``StartupTimeline``.
+    """
+
+    def __init__(self, master_url: Optional[str] = None, metrics_url: Optional[str] = None,
+                 jupyter_url: Optional[str] = None, worker_ui_base: Optional[int] = None):
+        master = urllib.parse.urlparse(master_url or config.SPARK_MASTER_URL)
+        self.master_host, self.master_port = master.hostname, master.port
+        self.metrics_url = (metrics_url or config.SPARK_METRICS_URL).rstrip("/")
+        self.jupyter_url = (jupyter_url or config.JUPYTER_URL).rstrip("/")
+        # spark-worker-N publishes its UI on worker_ui_base + N
+        self.worker_ui_base = worker_ui_base or config.WORKER_UI_BASE_PORT
+        self.timeout = config.SPARK_METRICS_TIMEOUT
+
+    async def master_accepting(self) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.master_host, self.master_port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def registered_workers(self) -> Dict[int, List[dict]]:
+        """ALIVE workers known to the master, keyed by the worker's index.
+
+        Workers advertise their UI as localhost:<port> (SPARK_PUBLIC_DNS),
+        and each spark-worker-N has its own UI port, which identifies it.
+        """
+        try:
+            master = await asyncio.to_thread(fetch_json, f"{self.metrics_url}/json", self.timeout)
+        except (OSError, ValueError):
+            return {}
+        registered: Dict[int, List[dict]] = {}
+        for worker in master.get("workers", []):
+            port = urllib.parse.urlparse(worker.get("webuiaddress", "")).port
+            if worker.get("state") == "ALIVE" and port:
+                registered.setdefault(port - self.worker_ui_base, []).append(worker)
+        return registered
+
+    async def jupyter_responding(self) -> bool:
+        return await asyncio.to_thread(http_responds, f"{self.jupyter_url}/api", self.timeout)
+
+    async def wait(self, workers: List[WorkerConfig], timeout: float, compose_seconds: Optional[float] = None,
+                   on_change: Optional[Callable[[StartupTimeline], None]] = None) -> StartupTimeline:
+        """Poll until every component is ready or ``timeout`` seconds pass"""
+        started = time.monotonic()
+        components = {
+            name: ReadinessComponent(name=name)
+            for name in ["spark-master", *(worker_service_name(i) for i in range(1, len(workers) + 1)), "jupyter"]
+        }
+        timeline = StartupTimeline(
+            started_at=datetime.now().isoformat(),
+            compose_seconds=compose_seconds,
+            components=list(components.values())
+        )
+
+        def mark(name: str, kind: str, detail: str = ""):
+            component = components[name]
+            component.ready, component.detail = True, detail
+            component.ready_after = round(time.monotonic() - started, 3)
+            metrics.COMPONENT_READY_SECONDS.labels(kind).observe(component.ready_after)
+
+        while True:
+            changed = False
+            jupyter_check = None
+            if not components["jupyter"].ready:
+                jupyter_check = asyncio.create_task(self.jupyter_responding())
+
+            if not components["spark-master"].ready and await self.master_accepting():
+                mark("spark-master", "master")
+                changed = True
+            pending = [i for i in range(1, len(workers) + 1) if not components[worker_service_name(i)].ready]
+            if components["spark-master"].ready and pending:
+                registered = await self.registered_workers()
+                for i in pending:
+                    worker_cfg, name = workers[i - 1], worker_service_name(i)
+                    expected = (worker_cfg.cores, parse_memory_mb(worker_cfg.memory))
+                    shapes = [(w.get("cores"), w.get("memory")) for w in registered.get(i, [])]
+                    if expected in shapes:
+                        mark(name, "worker", f"{expected[0]} cores, {expected[1]} MB")
+                        changed = True
+                    elif shapes:
+                        # A worker from the previous configuration has not been replaced yet
+                        components[name].detail = f"registered as {shapes[0][0]} cores, {shapes[0][1]} MB"
+            if jupyter_check and await jupyter_check:
+                mark("jupyter", "jupyter")
+                changed = True
+
+            timeline.elapsed = round(time.monotonic() - started, 3)
+            timeline.ready = all(c.ready for c in components.values())
+            if not timeline.ready and timeline.elapsed >= timeout:
+                timeline.timed_out = True
+            if on_change and (changed or timeline.ready or timeline.timed_out):
+                on_change(timeline)
+            if timeline.ready or timeline.timed_out:
+                return timeline
+            await asyncio.sleep(min(config.READY_POLL_INTERVAL, max(timeout - timeline.elapsed, 0)))
@@ -0,0 +1,314 @@
+import json
+import re
+import socket
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import config
+import metrics
+from models import ClusterConfig, SharedTable, SharedTableCreate, SparkConnectStats
+from dataset_manager import DatasetManager, detect_format
+from spark_metrics import fetch_json
+
+
+NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+GLOBAL_TEMP = "global_temp"
+# Headings of the Spark Connect tab of the server's UI
+SESSIONS_ONLINE_PATTERN = re.compile(r"(\d+)\s+session\(s\) are online,\s+running\s+(\d+)\s+Request", re.S)
+SESSIONS_TOTAL_PATTERN = re.compile(r"Session Statistics \((\d+)\)")
+
+
+class SharedTableError(ValueError):
+    """Raised for invalid shared table definitions, or when the Spark Connect server can't be used"""
+
+
+def fetch_text(url: str, timeout: float) -> str:
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return resp.read().decode("utf-8", errors="replace")
+
+
+def first_line(e: Exception) -> str:
+    return str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+
+
+class SharedTableManager:
+    """Tables that every notebook shares through the Spark Connect server.
+
+    Each table is a global temporary view on the server, which all of its
+    sessions see as ``global_temp.<name>``. Cached tables are stored once in
+    the server's executors, so a hot dataset is scanned once for everybody
+    instead of once per notebook. Definitions are saved to
+    ``SHARED_TABLES_FILE``; the server forgets its views when it restarts,
+    and they are registered again the next time a table is cached.
+
+    The backend drives the server with the optional Spark Connect client
+    (``pip install "pyspark[connect]==3.5.0"``). Session counts and cache
+    memory come from the server's UI and REST API, which need no client.
+    """
+
+    def __init__(self, datasets: DatasetManager, connect_url: Optional[str] = None,
+                 ui_url: Optional[str] = None, tables_file: Path = config.SHARED_TABLES_FILE):
+        self.datasets = datasets
+        self.tables_file = tables_file
+        self.connect_url = connect_url or config.SPARK_CONNECT_URL
+        self.ui_url = (ui_url or config.SPARK_CONNECT_UI_URL).rstrip("/")
+        self.tables: Dict[str, SharedTable] = self._load()
+        self._spark = None
+        # One client session, used by one operation at a time
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, SharedTable]:
+        try:
+            with open(self.tables_file, 'r') as f:
+                return {t["name"]: SharedTable(**t) for t in json.load(f)}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error reading shared tables, starting empty: {e}")
+            return {}
+
+    def _save(self):
+        definition = {"name", "qualified_name", "dataset", "path", "format", "query", "cache", "created_at"}
+        tmp_path = self.tables_file.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump([t.model_dump(include=definition) for t in self.tables.values()], f, indent=2)
+        tmp_path.replace(self.tables_file)
+
+    def define(self, request: SharedTableCreate) -> SharedTable:
+        """Check a request and resolve its source to a path or query the server can read"""
+        if not NAME_PATTERN.match(request.name):
+            raise SharedTableError("Shared table names may only contain letters, digits and '_', "
+                                   "and may not start with a digit")
+        sources = [s for s in (request.dataset, request.path, request.query) if s]
+        if len(sources) != 1:
+            raise SharedTableError("Give exactly one of dataset, path or query")
+
+        table = SharedTable(
+            name=request.name.lower(),  # Spark stores view names in lower case
+            qualified_name=f"{GLOBAL_TEMP}.{request.name.lower()}",
+            query=request.query,
+            cache=request.cache,
+            created_at=datetime.now().isoformat()
+        )
+        if request.dataset:
+            dataset = self.datasets.get(request.dataset)
+            if dataset is None or dataset.status != "ready":
+                raise SharedTableError(f"No converted dataset named {request.dataset}")
+            table.dataset, table.path, table.format = dataset.name, dataset.path, "parquet"
+        elif request.path:
+            source = (config.DATA_DIR / request.path).resolve()
+            if not source.is_relative_to(config.DATA_DIR.resolve()) or not source.exists():
+                raise SharedTableError(f"No such file or directory under data/: {request.path}")
+            # Directories are assumed to hold Parquet, like the converted datasets
+            fmt = request.format or (detect_format(source) if source.is_file() else "parquet")
+            if not fmt:
+                raise SharedTableError(f"Cannot tell the format of {request.path}; pass format explicitly")
+            table.path = f"{config.DATA_CONTAINER_DIR}/{source.relative_to(config.DATA_DIR.resolve()).as_posix()}"
+            table.format = fmt
+        return table
+
+    def get(self, name: str) -> Optional[SharedTable]:
+        return self.tables.get(name.lower())
+
+    def _session(self):
+        """The backend's Spark Connect session, created on first use"""
+        if self._spark is None:
+            try:
+                from pyspark.sql import SparkSession
+                self._spark = SparkSession.builder.remote(self.connect_url).getOrCreate()
+            except ImportError:
+                raise SharedTableError('Managing shared tables needs the Spark Connect client in the backend: '
+                                       'pip install "pyspark[connect]==3.5.0"')
+        return self._spark
+
+    def _server_listening(self) -> bool:
+        """Checked first, as the client retries a refused connection for minutes before it fails"""
+        address = urllib.parse.urlparse(self.connect_url)
+        try:
+            socket.create_connection((address.hostname, address.port), config.SPARK_METRICS_TIMEOUT).close()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _run(self, operation: str, fn: Callable):
+        """Run ``fn(spark)`` with the client session (blocking; run in a thread)"""
+        with self._lock:
+            try:
+                if not self._server_listening():
+                    raise SharedTableError(f"The Spark Connect server at {self.connect_url} is not running")
+                result = fn(self._session())
+            except SharedTableError:
+                metrics.SHARED_TABLE_OPERATIONS.labels(operation, "error").inc()
+                raise
+            except Exception as e:
+                # Reconnect next time; the server may have restarted
+                self._spark = None
+                metrics.SHARED_TABLE_OPERATIONS.labels(operation, "error").inc()
+                raise SharedTableError(f"Spark Connect server at {self.connect_url}: {first_line(e)}")
+        metrics.SHARED_TABLE_OPERATIONS.labels(operation, "success").inc()
+        return result
+
+    def _register(self, spark, table: SharedTable):
+        if table.query:
+            df = spark.sql(table.query)
+        else:
+            reader = spark.read.format(table.format)
+            if table.format == "csv":
+                reader = reader.option("header", "true").option("inferSchema", "true")
+            df = reader.load(table.path)
+        df.createOrReplaceGlobalTempView(table.name)
+
+    def _registered_names(self, spark) -> List[str]:
+        return [t.name.lower() for t in spark.catalog.listTables(GLOBAL_TEMP) if t.isTemporary]
+
+    def register(self, table: SharedTable, progress: Optional[Callable[[str], None]] = None) -> tuple[bool, str]:
+        """Save a table's definition, register its view and cache it if asked (blocking; run in a thread)"""
+        self.tables[table.name] = table
+        self._save()
+        if progress:
+            progress(f"Registering {table.qualified_name}")
+        try:
+            self._run("register", lambda spark: self._register(spark, table))
+        except SharedTableError as e:
+            table.error = str(e)
+            return False, f"Registering {table.qualified_name} failed: {e}"
+        table.error = None
+        if table.cache:
+            return self.cache(table.name, progress)
+        return True, f"Registered {table.qualified_name}"
+
+    def cache(self, name: str, progress: Optional[Callable[[str], None]] = None) -> tuple[bool, str]:
+        """Scan a table into the server's cache now, registering it again if the server lost it"""
+        table = self.tables[name]
+        if not table.cache:
+            table.cache = True
+            self._save()
+
+        def run(spark):
+            if table.name not in self._registered_names(spark):
+                if progress:
+                    progress(f"Registering {table.qualified_name} again on the restarted server")
+                self._register(spark, table)
+            if progress:
+                progress(f"Caching {table.qualified_name}")
+            started = time.perf_counter()
+            # Eager, unlike catalog.cacheTable: the first notebook to read it doesn't pay for the scan
+            spark.sql(f"CACHE TABLE {table.qualified_name}")
+            return round(time.perf_counter() - started, 3)
+
+        try:
+            table.cache_seconds = self._run("cache", run)
+        except SharedTableError as e:
+            table.error = str(e)
+            return False, f"Caching {table.qualified_name} failed: {e}"
+        table.error = None
+        table.cached_at = datetime.now().isoformat()
+        return True, f"Cached {table.qualified_name} in {table.cache_seconds}s"
+
+    def uncache(self, name: str) -> str:
+        """Drop a table from the server's cache; its view stays registered"""
+        table = self.tables[name]
+        table.cache, table.cached_at, table.cache_seconds = False, None, None
+        self._save()
+        self._run("uncache", lambda spark: spark.sql(f"UNCACHE TABLE IF EXISTS {table.qualified_name}"))
+        return f"Uncached {table.qualified_name}"
+
+    def drop(self, name: str) -> str:
+        """Forget a table's definition, then drop its view and cache from the server"""
+        table = self.tables.pop(name)
+        self._save()
+
+        def run(spark):
+            spark.sql(f"UNCACHE TABLE IF EXISTS {table.qualified_name}")
+            spark.catalog.dropGlobalTempView(table.name)
+
+        try:
+            self._run("drop", run)
+        except SharedTableError as e:
+            return f"Removed {table.qualified_name}; the server could not drop it: {e}"
+        return f"Dropped {table.qualified_name}"
+
+    def _rest(self, path: str):
+        return fetch_json(f"{self.ui_url}/api/v1{path}", config.SPARK_METRICS_TIMEOUT)
+
+    def _storage(self) -> tuple[Optional[str], List[dict], List[dict]]:
+        """The server's app ID, cached RDDs and executors, from its REST API"""
+        try:
+            applications = self._rest("/applications")
+            if not applications:
+                return None, [], []
+            app_id = applications[0]["id"]
+            return app_id, self._rest(f"/applications/{app_id}/storage/rdd"), \
+                self._rest(f"/applications/{app_id}/executors")
+        except (OSError, ValueError, KeyError):
+            return None, [], []
+
+    @staticmethod
+    def _cached_rdds(rdds: List[dict]) -> Dict[str, dict]:
+        """Cached RDDs keyed by table name; CACHE TABLE names them "In-memory table global_temp.<name>" """
+        cached = {}
+        for rdd in rdds:
+            name = rdd.get("name", "").replace("`", "").lower()
+            if name.startswith("in-memory table ") and f"{GLOBAL_TEMP}." in name:
+                cached[name.rsplit(".", 1)[1]] = rdd
+        return cached
+
+    def list_tables(self) -> List[SharedTable]:
+        """Definitions with their state on the server (blocking; run in a thread)"""
+        try:
+            registered = set(self._run("list", self._registered_names))
+        except SharedTableError:
+            registered = None
+        _, rdds, _ = self._storage()
+        cached = self._cached_rdds(rdds)
+
+        tables = []
+        for table in sorted(self.tables.values(), key=lambda t: t.name):
+            rdd = cached.get(table.name, {})
+            tables.append(table.model_copy(update={
+                "registered": table.name in registered if registered is not None else None,
+                "cached": rdd.get("numCachedPartitions", 0) > 0,
+                "cached_partitions": rdd.get("numCachedPartitions", 0),
+                "partitions": rdd.get("numPartitions", 0),
+                "memory_bytes": rdd.get("memoryUsed", 0),
+                "disk_bytes": rdd.get("diskUsed", 0),
+                "storage_level": rdd.get("storageLevel"),
+            }))
+        return tables
+
+    def _sessions(self) -> tuple[Optional[int], Optional[int], Optional[int]]:
+        """Online sessions, all sessions and running requests, read from the Spark Connect UI tab"""
+        try:
+            page = fetch_text(f"{self.ui_url}/connect/", config.SPARK_METRICS_TIMEOUT)
+        except (OSError, ValueError):
+            return None, None, None
+        online = SESSIONS_ONLINE_PATTERN.search(page)
+        total = SESSIONS_TOTAL_PATTERN.search(page)
+        return (int(online.group(1)) if online else None, int(total.group(1)) if total else None,
+                int(online.group(2)) if online else None)
+
+    def stats(self, cluster_config: ClusterConfig) -> SparkConnectStats:
+        """Session counts and cache memory of the server (blocking; run in a thread)"""
+        stats = SparkConnectStats(
+            enabled=cluster_config.connect_server,
+            url=config.SPARK_CONNECT_CONTAINER_URL,
+            ui_url=self.ui_url
+        )
+        app_id, rdds, executors = self._storage()
+        if app_id is None:
+            return stats
+        executors = [e for e in executors if e.get("id") != "driver" and e.get("isActive", True)]
+        cached = self._cached_rdds(rdds)
+        stats.reachable, stats.app_id = True, app_id
+        stats.sessions_online, stats.sessions_total, stats.running_requests = self._sessions()
+        stats.executors = len(executors)
+        stats.storage_memory_bytes = sum(e.get("maxMemory", 0) for e in executors)
+        stats.storage_memory_used_bytes = sum(e.get("memoryUsed", 0) for e in executors)
+        stats.cached_tables = sum(1 for rdd in cached.values() if rdd.get("numCachedPartitions", 0))
+        stats.cached_memory_bytes = sum(rdd.get("memoryUsed", 0) for rdd in cached.values())
+        stats.cached_disk_bytes = sum(rdd.get("diskUsed", 0) for rdd in cached.values())
+        return stats
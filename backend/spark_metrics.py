@@ -0,0 +1,141 @@
+import asyncio
+import json
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional
+import config
+from models import ClusterUtilization, SparkApplicationMetrics, SparkWorkerMetrics
+
+
+def fetch_json(url: str, timeout: float) -> dict:
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return json.load(resp)
+
+
+def classify(cores_used: int, cores_total: int, waiting_apps: int) -> str:
+    """Summarize utilization as idle, busy or saturated"""
+    if cores_total and cores_used / cores_total >= config.SPARK_SATURATION_THRESHOLD or waiting_apps:
+        return "saturated"
+    return "busy" if cores_used else "idle"
+
+
+def aggregate(master: dict, worker_pages: Dict[str, Optional[dict]]) -> ClusterUtilization:
+    """Combine the master's /json with each worker UI's /json into one view.
+
+    ``worker_pages`` maps worker IDs to their UI payload, or None when the
+    worker UI could not be reached; executor counts then fall back to zero.
+    """
+    workers = []
+    executors_per_app: Dict[str, int] = {}
+    for worker in master.get("workers", []):
+        page = worker_pages.get(worker["id"]) or {}
+        executors = page.get("executors", [])
+        for executor in executors:
+            app_id = executor.get("appid")
+            executors_per_app[app_id] = executors_per_app.get(app_id, 0) + 1
+        workers.append(SparkWorkerMetrics(
+            id=worker["id"],
+            host=worker.get("host", ""),
+            state=worker.get("state", "UNKNOWN"),
+            ui_url=worker.get("webuiaddress"),
+            cores=worker.get("cores", 0),
+            cores_used=worker.get("coresused", 0),
+            memory_mb=worker.get("memory", 0),
+            memory_used_mb=worker.get("memoryused", 0),
+            executors=len(executors),
+            last_heartbeat=worker.get("lastheartbeat")
+        ))
+
+    applications = [
+        SparkApplicationMetrics(
+            id=app["id"],
+            name=app.get("name", ""),
+            state=app.get("state", "UNKNOWN"),
+            cores=app.get("cores", 0),
+            memory_per_executor_mb=app.get("memoryperexecutor", app.get("memoryperslave", 0)),
+            executors=executors_per_app.get(app["id"], 0),
+            duration_ms=app.get("duration", 0)
+        )
+        for app in master.get("activeapps", [])
+    ]
+
+    # Only ALIVE workers contribute capacity; dead ones linger in the master's list
+    alive = [w for w in workers if w.state == "ALIVE"]
+    cores_total = sum(w.cores for w in alive)
+    cores_used = sum(w.cores_used for w in alive)
+    memory_total = sum(w.memory_mb for w in alive)
+    memory_used = sum(w.memory_used_mb for w in alive)
+    waiting = sum(1 for a in applications if a.state == "WAITING")
+
+    return ClusterUtilization(
+        state=classify(cores_used, cores_total, waiting),
+        alive_workers=len(alive),
+        cores_total=cores_total,
+        cores_used=cores_used,
+        memory_total_mb=memory_total,
+        memory_used_mb=memory_used,
+        core_utilization=round(cores_used / cores_total, 3) if cores_total else 0.0,
+        memory_utilization=round(memory_used / memory_total, 3) if memory_total else 0.0,
+        running_applications=sum(1 for a in applications if a.state == "RUNNING"),
+        waiting_applications=waiting,
+        active_executors=sum(w.executors for w in alive),
+        workers=workers,
+        applications=applications
+    )
+
+
+class SparkMetricsPoller:
+    """Polls the Spark master's /json and every worker UI's /json.
+
+    Point ``master_url`` at any HTTP server that serves the same JSON
+    (e.g. a local stand-in) to exercise it without a cluster.
+    """
+
+    def __init__(self, master_url: Optional[str] = None, timeout: Optional[float] = None):
+        self.master_url = (master_url or config.SPARK_METRICS_URL).rstrip("/")
+        self.timeout = timeout or config.SPARK_METRICS_TIMEOUT
+
+    async def _fetch(self, url: str) -> dict:
+        return await asyncio.to_thread(fetch_json, url, self.timeout)
+
+    async def _fetch_worker(self, worker: dict) -> Optional[dict]:
+        url = worker.get("webuiaddress")
+        # Decommissioned workers still report the executors they are draining
+        if not url or worker.get("state") == "DEAD":
+            return None
+        try:
+            return await self._fetch(f"{url.rstrip('/')}/json/")
+        except (OSError, ValueError) as e:
+            print(f"Error polling worker {worker.get('id')}: {e}")
+            return None
+
+    async def poll(self) -> ClusterUtilization:
+        """Collect a fresh utilization view; never raises"""
+        collected_at = datetime.now().isoformat()
+        try:
+            master = await self._fetch(f"{self.master_url}/json")
+        except (OSError, ValueError) as e:
+            return ClusterUtilization(state="unreachable", error=str(e), collected_at=collected_at)
+
+        workers: List[dict] = master.get("workers", [])
+        pages = await asyncio.gather(*(self._fetch_worker(w) for w in workers))
+        utilization = aggregate(master, {w["id"]: page for w, page in zip(workers, pages)})
+        utilization.collected_at = collected_at
+        return utilization
+
+    async def decommission_worker(self, host: str) -> bool:
+        """Ask the master to stop scheduling on a worker and move its executors off"""
+        data = urllib.parse.urlencode({"host": host}).encode()
+        request = urllib.request.Request(f"{self.master_url}/workers/kill/", data=data, method="POST")
+
+        def send():
+            with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                return resp.status
+
+        try:
+            await asyncio.to_thread(send)
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error decommissioning worker on {host}: {e}")
+            return False
@@ -0,0 +1,137 @@
+from typing import Dict, List
+import config
+from models import ClusterConfig, WorkerConfig
+from capacity import format_memory, parse_memory_mb
+
+
+# Per-profile overrides on top of the topology-derived settings.
+# "partitions_per_core" sets spark.sql.shuffle.partitions and spark.default.parallelism.
+PROFILES: Dict[str, dict] = {
+    "default": {
+        "partitions_per_core": 2,
+        "conf": {},
+    },
+    # Large scans, joins and writes: more, smaller shuffle partitions and bigger input splits
+    "etl": {
+        "partitions_per_core": 3,
+        "conf": {
+            "spark.memory.storageFraction": "0.3",
+            "spark.sql.files.maxPartitionBytes": "256m",
+            "spark.sql.adaptive.skewJoin.enabled": "true",
+            "spark.sql.sources.partitionOverwriteMode": "dynamic",
+        },
+    },
+    # Iterative training over cached data: keep more of the heap for storage
+    "ml": {
+        "partitions_per_core": 2,
+        "conf": {
+            "spark.memory.fraction": "0.7",
+            "spark.memory.storageFraction": "0.6",
+            "spark.driver.memory": "2g",
+            "spark.driver.maxResultSize": "1g",
+            "spark.rdd.compress": "true",
+        },
+    },
+    # Small interactive queries: one partition per core and no waiting for data locality
+    "low-latency": {
+        "partitions_per_core": 1,
+        "conf": {
+            "spark.locality.wait": "0s",
+            "spark.scheduler.mode": "FAIR",
+            "spark.sql.adaptive.coalescePartitions.minPartitionSize": "1m",
+            "spark.sql.autoBroadcastJoinThreshold": "64m",
+        },
+    },
+}
+
+
+def executor_shape(workers: List[WorkerConfig]) -> tuple[int, str]:
+    """Executor cores and memory that fit on every worker.
+
+    Cores are capped by the smallest worker, and at 5 so a big worker runs
+    several executors; memory is the tightest per-core share of any worker.
+    Overhead needs no room here: container limits already add it on top.
+    Raises ValueError for a worker without cores, which can't run an executor.
+    """
+    if any(w.cores < 1 for w in workers):
+        raise ValueError("Every worker needs at least 1 core")
+    cores = max(1, min(5, min(w.cores for w in workers)))
+    per_core_mb = min(parse_memory_mb(w.memory) // w.cores for w in workers)
+    memory_mb = max(512, per_core_mb * cores // 128 * 128)
+    return cores, format_memory(memory_mb)
+
+
+def spark_defaults(cluster_config: ClusterConfig) -> Dict[str, str]:
+    """spark-defaults.conf properties for a cluster's worker shapes and profile"""
+    workers = cluster_config.get_worker_configs()
+    profile = PROFILES[cluster_config.spark_profile]
+    total_cores = sum(w.cores for w in workers)
+    partitions = str(max(1, total_cores * profile["partitions_per_core"]))
+    executor_cores, executor_memory = executor_shape(workers)
+
+    properties = {
+        "spark.master": f"spark://spark-master:{config.SPARK_MASTER_PORT}",
+        "spark.executor.cores": str(executor_cores),
+        "spark.executor.memory": executor_memory,
+        "spark.driver.memory": "1g",
+        "spark.sql.shuffle.partitions": partitions,
+        "spark.default.parallelism": partitions,
+        "spark.sql.adaptive.enabled": "true",
+        "spark.sql.adaptive.coalescePartitions.enabled": "true",
+        "spark.serializer": "org.apache.spark.serializer.KryoSerializer",
+        "spark.sql.execution.arrow.pyspark.enabled": "true",
+        "spark.sql.execution.arrow.pyspark.fallback.enabled": "true",
+    }
+    if config.EVENT_LOG_ENABLED:
+        # Uncompressed, unrolled logs, so the backend's analyzer can stream them
+        event_dir = f"file://{config.SPARK_EVENTS_CONTAINER_DIR}"
+        properties.update({
+            "spark.eventLog.enabled": "true",
+            "spark.eventLog.dir": event_dir,
+            "spark.eventLog.compress": "false",
+            "spark.eventLog.rolling.enabled": "false",
+            "spark.history.fs.logDirectory": event_dir,
+        })
+    if cluster_config.shuffle_service:
+        # Shuffle output outlives its executor, so idle executors can be given back
+        properties.update({
+            "spark.shuffle.service.enabled": "true",
+            "spark.shuffle.service.port": str(config.SHUFFLE_SERVICE_PORT),
+            "spark.dynamicAllocation.enabled": "true",
+            "spark.dynamicAllocation.executorIdleTimeout": "60s",
+        })
+    properties.update(profile["conf"])
+    properties.update(cluster_config.spark_conf)
+    return properties
+
+
+def warmup_settings(cluster_config: ClusterConfig) -> dict:
+    """warmup.json for the Jupyter kernels' startup hook (docker/jupyter/spark_warmup.py).
+
+    spark-defaults.conf still supplies the cluster's tuning; these settings
+    only add dynamic allocation down to zero executors, so a kernel that
+    sits idle gives its cores back to the cluster.
+    """
+    conf = {
+        "spark.dynamicAllocation.enabled": "true",
+        "spark.dynamicAllocation.minExecutors": "0",
+        "spark.dynamicAllocation.executorIdleTimeout": config.KERNEL_WARMUP_IDLE_TIMEOUT,
+    }
+    if not cluster_config.shuffle_service:
+        # Without the external shuffle service, keep executors whose shuffle output is still needed
+        conf["spark.dynamicAllocation.shuffleTracking.enabled"] = "true"
+    return {
+        "enabled": cluster_config.kernel_warmup,
+        "master": f"spark://spark-master:{config.SPARK_MASTER_PORT}",
+        "app_name": "PySpark Playground",
+        "conf": conf,
+    }
+
+
+def render_spark_defaults(cluster_config: ClusterConfig) -> str:
+    lines = [
+        "# Generated by the PySpark Playground backend from the cluster configuration",
+        f"# Profile: {cluster_config.spark_profile}",
+    ]
+    lines += [f"{key} {value}" for key, value in sorted(spark_defaults(cluster_config).items())]
+    return "\n".join(lines) + "\n"
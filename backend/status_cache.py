@@ -0,0 +1,174 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Optional
+import config
+import metrics
+from models import ClusterStatus, ClusterUtilization
+from cluster_manager import ClusterManager
+from events import EventBroadcaster
+from spark_metrics import SparkMetricsPoller
+
+
+class StatusCache:
+    """Keeps a cluster status snapshot current in the background.
+
+    A ``docker events`` stream for the compose project triggers a refresh
+    whenever a container changes state; a periodic refresh covers missed
+    events and hosts where the event stream is unavailable. Readers get the
+    last snapshot without spawning any process. Every change to the
+    snapshot bumps ``version`` and is published as a ``status`` event.
+
+    While the cluster runs, Spark master and worker metrics are polled on
+    their own schedule and attached to the snapshot as ``utilization``.
+    """
+
+    def __init__(self, cluster_manager: ClusterManager,
+                 broadcaster: Optional[EventBroadcaster] = None,
+                 spark_metrics: Optional[SparkMetricsPoller] = None):
+        self.cluster_manager = cluster_manager
+        self.broadcaster = broadcaster
+        self.spark_metrics = spark_metrics or SparkMetricsPoller(cluster_manager.layout.metrics_url)
+        self.utilization: Optional[ClusterUtilization] = None
+        self.version = 0
+        self.snapshot: Optional[ClusterStatus] = None
+        self.updated_at: Optional[float] = None
+        self.updated_wall: Optional[datetime] = None
+        self._stale = asyncio.Event()
+        self._poll_now = asyncio.Event()
+        self._refresh_lock = asyncio.Lock()
+        self._tasks = []
+        self._events_process: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self):
+        """Take an initial snapshot and start the background watchers"""
+        await self.refresh()
+        self._poll_now.set()
+        self._tasks = [
+            asyncio.create_task(self._refresh_loop()),
+            asyncio.create_task(self._watch_events()),
+            asyncio.create_task(self._metrics_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._events_process and self._events_process.returncode is None:
+            self._events_process.kill()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def invalidate(self):
+        """Request a refresh soon, e.g. after a lifecycle operation"""
+        self._stale.set()
+
+    async def get(self) -> ClusterStatus:
+        """Return the cached status annotated with its age"""
+        if self.snapshot is None:
+            await self.refresh()
+        age = time.monotonic() - self.updated_at
+        return self.snapshot.model_copy(update={
+            "snapshot_age": round(age, 3),
+            "updated_at": self.updated_wall.isoformat()
+        })
+
+    async def refresh(self):
+        """Query docker for the current status and replace the snapshot"""
+        async with self._refresh_lock:
+            status = await self.cluster_manager.get_cluster_status()
+            if status.running:
+                status.utilization = self.utilization
+            else:
+                self.utilization = None
+            changed = self.snapshot is None or status != self.snapshot
+            if self.snapshot is not None and status.running != self.snapshot.running:
+                metrics.CLUSTER_STATE_CHANGES.labels("running" if status.running else "stopped").inc()
+                if status.running:
+                    self._poll_now.set()
+            self.snapshot = status
+            self.updated_at = time.monotonic()
+            self.updated_wall = datetime.now()
+
+        if changed:
+            await self._publish()
+
+    async def _publish(self):
+        self.version += 1
+        if self.broadcaster:
+            current = await self.get()
+            self.broadcaster.publish("status", current.model_dump())
+
+    async def refresh_utilization(self):
+        """Poll Spark metrics and attach them to the snapshot if they changed"""
+        if not self.snapshot or not self.snapshot.running:
+            return
+        utilization = await self.spark_metrics.poll()
+        # Timestamps and app durations move on every poll; only publish real changes
+        ignored = {"collected_at": True, "applications": {"__all__": {"duration_ms"}}}
+        changed = (self.utilization is None
+                   or utilization.model_dump(exclude=ignored) != self.utilization.model_dump(exclude=ignored))
+        self.utilization = utilization
+        async with self._refresh_lock:
+            if not self.snapshot.running:
+                return
+            self.snapshot = self.snapshot.model_copy(update={"utilization": utilization})
+        if changed:
+            await self._publish()
+
+    async def _metrics_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._poll_now.wait(), config.SPARK_METRICS_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._poll_now.clear()
+            try:
+                await self.refresh_utilization()
+            except Exception as e:
+                print(f"Error polling Spark metrics: {e}")
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stale.wait(), config.STATUS_REFRESH_INTERVAL)
+                # Let a burst of container events settle into one refresh
+                await asyncio.sleep(config.STATUS_EVENT_DEBOUNCE)
+            except asyncio.TimeoutError:
+                pass
+            self._stale.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing cluster status: {e}")
+
+    async def _watch_events(self):
+        """Follow `docker events` for the compose project and mark the cache stale"""
+        backoff = 1
+        while True:
+            try:
+                self._events_process = await asyncio.create_subprocess_exec(
+                    "docker", "events",
+                    "--format", "{{json .}}",
+                    "--filter", "type=container",
+                    "--filter", f"label=com.docker.compose.project={self.cluster_manager.layout.project}",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                async for line in self._events_process.stdout:
+                    backoff = 1
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if event.get("status") in config.STATUS_WATCHED_EVENTS:
+                        self._stale.set()
+                await self._events_process.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Docker event stream unavailable: {e}")
+
+            # Stream ended; the periodic refresh keeps the cache current meanwhile
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
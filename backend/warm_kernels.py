@@ -0,0 +1,69 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+import config
+from models import ClusterConfig, WarmKernel, WarmKernelStats
+from spark_metrics import fetch_json
+
+
+class WarmKernelMonitor:
+    """Reports the SparkSessions pre-warmed by the Jupyter kernels' startup hook.
+
+    The hook writes one JSON record per kernel to ``KERNEL_STATS_DIR`` and
+    removes it when the kernel exits. Jupyter's kernel list adds each
+    kernel's activity, and identifies records left behind by kernels that
+    were killed; those are deleted.
+    """
+
+    def __init__(self, stats_dir: Path = config.KERNEL_STATS_DIR, jupyter_url: Optional[str] = None):
+        self.stats_dir = stats_dir
+        self.jupyter_url = (jupyter_url or config.JUPYTER_URL).rstrip("/")
+
+    def _read_records(self) -> Dict[str, dict]:
+        records = {}
+        for path in self.stats_dir.glob("*.json"):
+            try:
+                with open(path, 'r') as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            records[record.get("kernel_id", path.stem)] = record
+        return records
+
+    async def _running_kernels(self) -> Optional[Dict[str, dict]]:
+        """Jupyter's running kernels by ID, or None if Jupyter can't be reached"""
+        try:
+            kernels = await asyncio.to_thread(fetch_json, f"{self.jupyter_url}/api/kernels",
+                                              config.SPARK_METRICS_TIMEOUT)
+        except (OSError, ValueError):
+            return None
+        return {k["id"]: k for k in kernels}
+
+    async def stats(self, cluster_config: ClusterConfig) -> WarmKernelStats:
+        records = await asyncio.to_thread(self._read_records)
+        running = await self._running_kernels()
+        kernels: List[WarmKernel] = []
+        for kernel_id, record in records.items():
+            if running is not None and kernel_id not in running:
+                (self.stats_dir / f"{kernel_id}.json").unlink(missing_ok=True)
+                continue
+            jupyter_kernel = (running or {}).get(kernel_id, {})
+            kernels.append(WarmKernel(
+                **record,
+                execution_state=jupyter_kernel.get("execution_state"),
+                last_activity=jupyter_kernel.get("last_activity")
+            ))
+
+        warm_times = [k.warm_seconds for k in kernels if k.status == "ready" and k.warm_seconds is not None]
+        return WarmKernelStats(
+            enabled=cluster_config.kernel_warmup,
+            idle_timeout=config.KERNEL_WARMUP_IDLE_TIMEOUT,
+            pool_size=sum(1 for k in kernels if k.status == "ready"),
+            warming=sum(1 for k in kernels if k.status == "warming"),
+            failed=sum(1 for k in kernels if k.status == "failed"),
+            mean_warm_seconds=round(sum(warm_times) / len(warm_times), 3) if warm_times else None,
+            max_warm_seconds=max(warm_times, default=None),
+            jupyter_reachable=running is not None,
+            kernels=sorted(kernels, key=lambda k: k.started_at, reverse=True)
+        )
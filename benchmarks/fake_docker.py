@@ -0,0 +1,121 @@
+"""Stand-in for the `docker-compose` and `docker` executables used by the backend.
+
+load_test.py installs it behind two shell shims that set FAKE_DOCKER_MODE
+to "compose" or "docker". It keeps the set of "running"
+services of each compose project (-p) in a JSON state file and sleeps
+for configurable delays so the backend can be exercised without Docker:
+
+    FAKE_DOCKER_STATE        path of the state file
+    FAKE_COMPOSE_UP_DELAY    seconds `docker-compose up` takes (default 2)
+    FAKE_COMPOSE_DOWN_DELAY  seconds `docker-compose down` takes (default 1)
+    FAKE_COMPOSE_PS_DELAY    seconds `docker-compose ps` takes (default 0.2)
+    FAKE_COMPOSE_RM_DELAY    seconds `docker-compose rm` takes (default 0.5)
+    FAKE_DOCKER_LOG_RATE     lines/s `docker logs -f` prints per container (default 5)
+"""
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+
+STATE_FILE = Path(os.getenv("FAKE_DOCKER_STATE", "/tmp/fake-docker-state.json"))
+SERVICE_PATTERN = re.compile(r"^  ([A-Za-z0-9_-]+):\s*$", re.MULTILINE)
+# docker-compose options that come before the subcommand
+GLOBAL_OPTIONS = {"-p": "project", "--project-name": "project", "-f": "file", "--file": "file",
+                  "--project-directory": "directory"}
+
+
+def delay(name: str, default: float):
+    time.sleep(float(os.getenv(name, default)))
+
+
+def load_state() -> dict:
+    """Running services by compose project"""
+    try:
+        state = json.loads(STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    # Older state files hold a single project's list
+    return {"": state} if isinstance(state, list) else state
+
+
+def load_running(project: str = "") -> list:
+    return load_state().get(project, [])
+
+
+def save_running(services: list, project: str = ""):
+    state = load_state()
+    state[project] = sorted(set(services))
+    STATE_FILE.write_text(json.dumps(state))
+
+
+def compose_services(compose_file: str = "docker-compose.yml") -> list:
+    """Services of the compose file that `up` starts by default (no profile)"""
+    try:
+        text = Path(compose_file).read_text()
+    except OSError:
+        return []
+    section = text.split("\nservices:", 1)[-1].split("\nnetworks:", 1)[0]
+    parts = SERVICE_PATTERN.split(section)
+    # split() alternates between service names and their bodies
+    return [name for name, body in zip(parts[1::2], parts[2::2]) if "\n    profiles:" not in body]
+
+
+def positional(args: list) -> list:
+    return [a for a in args if not a.startswith("-")]
+
+
+def docker_compose(args: list) -> int:
+    options = {}
+    while len(args) > 1 and args[0] in GLOBAL_OPTIONS:
+        options[GLOBAL_OPTIONS[args[0]]], args = args[1], args[2:]
+    project = options.get("project", "")
+    command, rest = (args[0], args[1:]) if args else ("", [])
+    if command == "up" and "--no-start" in rest:
+        pass
+    elif command == "up":
+        delay("FAKE_COMPOSE_UP_DELAY", 2)
+        services = positional(rest) or compose_services(options.get("file", "docker-compose.yml"))
+        save_running(load_running(project) + services, project)
+    elif command == "down":
+        delay("FAKE_COMPOSE_DOWN_DELAY", 1)
+        save_running([], project)
+    elif command == "rm":
+        delay("FAKE_COMPOSE_RM_DELAY", 0.5)
+        removed = set(positional(rest))
+        save_running([s for s in load_running(project) if s not in removed], project)
+    elif command == "ps":
+        delay("FAKE_COMPOSE_PS_DELAY", 0.2)
+        for service in load_running(project):
+            print(service)
+    return 0
+
+
+def container_running(name: str) -> bool:
+    """Container names are service names, prefixed with "<cluster>-" outside the default project"""
+    return any(name == s or name.endswith(f"-{s}") for services in load_state().values() for s in services)
+
+
+def docker(args: list) -> int:
+    if args and args[0] == "events":
+        # Behave like an idle event stream
+        while True:
+            time.sleep(3600)
+    if args and args[0] == "logs":
+        # Print Spark-like output until the container stops
+        name = positional(args[1:])[-1]
+        interval = 1 / float(os.getenv("FAKE_DOCKER_LOG_RATE", 5))
+        n = 0
+        while container_running(name):
+            n += 1
+            level = "WARN" if n % 10 == 0 else "INFO"
+            print(f"{time.strftime('%y/%m/%d %H:%M:%S')} {level} Worker: heartbeat {n} from {name}", flush=True)
+            time.sleep(interval)
+    return 0
+
+
+if __name__ == "__main__":
+    handler = docker_compose if os.getenv("FAKE_DOCKER_MODE") == "compose" else docker
+    sys.exit(handler(sys.argv[1:]))
@@ -0,0 +1,159 @@
+"""Stand-in for the Docker Engine API on a UNIX socket.
+
+Serves the few endpoints backend/docker_client.py uses, over HTTP/1.1
+keep-alive, so the client's connection pool can be exercised without a
+daemon:
+
+    python benchmarks/fake_docker_socket.py --socket /tmp/fake-docker.sock --containers spark-master
+    DOCKER_SOCKET=/tmp/fake-docker.sock python backend/main.py
+
+Besides the containers it knows, the server can misbehave the way a real
+daemon does: ``drop_idle`` closes every connection after its response
+(the daemon's idle keep-alive timeout), and ``hang_up`` names request
+paths whose connection is closed after reading the request, without an
+answer. Every request is recorded with the connection it arrived on.
+"""
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class FakeDockerDaemon(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, containers: Iterable[str] = ()):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.containers: Dict[str, str] = {name: "running" for name in containers}
+        self.requests: List[tuple] = []  # (connection number, method, path)
+        self.connections = 0
+        self.drop_idle = False
+        self.hang_up: Set[str] = set()
+        self.lock = threading.Lock()
+        super().__init__(socket_path, Handler)
+
+    def count(self, method: str, path: str) -> int:
+        return sum(1 for _, m, p in self.requests if m == method and p == path)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeDockerDaemon
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            self.connection_number = self.server.connections
+        # UNIX sockets have no peer address; BaseHTTPRequestHandler expects one
+        self.client_address = ("fake-docker", 0)
+
+    def reply(self, status: int, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Like an idle timeout on the daemon: the client still thinks the connection is open
+        if self.server.drop_idle:
+            self.close_connection = True
+
+    def error(self, status: int, message: str):
+        self.reply(status, {"message": message})
+
+    def handle_request(self, method: str):
+        path = self.path.split("?")[0]
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        with self.server.lock:
+            self.server.requests.append((self.connection_number, method, path))
+        if path in self.server.hang_up:
+            self.close_connection = True
+            return
+
+        parts = path.strip("/").split("/")
+        containers = self.server.containers
+        if method == "GET" and path == "/_ping":
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+            if self.server.drop_idle:
+                self.close_connection = True
+        elif method == "GET" and path == "/info":
+            self.reply(200, {"NCPU": os.cpu_count(), "MemTotal": 8 * 1024 ** 3})
+        elif method == "GET" and path == "/containers/json":
+            self.reply(200, [{"Names": [f"/{name}"], "State": state} for name, state in containers.items()])
+        elif parts[0] == "containers" and len(parts) >= 2:
+            self.container_request(method, parts[1], parts[2] if len(parts) > 2 else None)
+        else:
+            self.error(404, f"page not found: {path}")
+
+    def container_request(self, method: str, name: str, action: Optional[str]):
+        containers = self.server.containers
+        if name not in containers:
+            self.error(404, f"No such container: {name}")
+        elif method == "GET" and action == "json":
+            self.reply(200, {"Name": f"/{name}", "State": {"Status": containers[name]}})
+        elif method == "POST" and action in ("start", "stop", "kill"):
+            state = "running" if action == "start" else "exited"
+            if containers[name] == state and action != "kill":
+                self.reply(304)
+            else:
+                containers[name] = state
+                self.reply(204)
+        elif method == "DELETE" and action is None:
+            del containers[name]
+            self.reply(204)
+        else:
+            self.error(500, f"unsupported: {method} {self.path}")
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(socket_path: str, containers: Iterable[str] = ()) -> FakeDockerDaemon:
+    server = FakeDockerDaemon(socket_path, containers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default="/tmp/fake-docker.sock")
+    parser.add_argument("--containers", nargs="*", default=[], help="names of running containers")
+    parser.add_argument("--drop-idle", action="store_true", help="close every connection after its response")
+    args = parser.parse_args()
+
+    server = serve(args.socket, args.containers)
+    server.drop_idle = args.drop_idle
+    print(f"Fake Docker Engine API on {args.socket} with {len(server.containers)} container(s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Stand-in for the Spark master and worker web UIs' JSON endpoints.
+
+Serves the master's /json on one port and each worker's /json/ on the
+following ports, so the backend's metrics poller can be exercised without
+a cluster:
+
+    python benchmarks/fake_spark.py --port 19090 --workers 3 --cores 2 --busy 4
+    SPARK_METRICS_URL=http://localhost:19090 python backend/main.py
+
+--busy spreads that many used cores over the workers as executors of one
+running application; --waiting adds an application waiting for resources.
+POST /workers/kill/ with host=<host> decommissions that worker like the
+real master: it stops being ALIVE and its executors go away.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+
+def build_state(args) -> tuple[dict, list]:
+    """Return the master payload and one payload per worker"""
+    now_ms = int(time.time() * 1000)
+    app_id = "app-20240101000000-0000"
+    workers, pages = [], []
+    remaining = args.busy
+    for i in range(1, args.workers + 1):
+        used = min(args.cores, remaining)
+        remaining -= used
+        worker_id = f"worker-20240101000000-172.18.0.{i + 2}-{40000 + i}"
+        workers.append({
+            "id": worker_id,
+            "host": f"172.18.0.{i + 2}",
+            "port": 40000 + i,
+            "webuiaddress": f"http://localhost:{args.port + i}",
+            "cores": args.cores,
+            "coresused": used,
+            "coresfree": args.cores - used,
+            "memory": args.memory_mb,
+            "memoryused": args.executor_memory_mb if used else 0,
+            "memoryfree": args.memory_mb - (args.executor_memory_mb if used else 0),
+            "state": "ALIVE",
+            "lastheartbeat": now_ms
+        })
+        executors = [{"id": i - 1, "memory": args.executor_memory_mb, "appid": app_id,
+                      "appdesc": {"name": "fake-app"}}] if used else []
+        pages.append({
+            "id": worker_id,
+            "masterurl": "spark://spark-master:7077",
+            "cores": args.cores,
+            "coresused": used,
+            "memory": args.memory_mb,
+            "memoryused": args.executor_memory_mb if used else 0,
+            "executors": executors,
+            "finishedexecutors": []
+        })
+
+    apps = []
+    if args.busy:
+        apps.append({"id": app_id, "name": "fake-app", "cores": args.busy, "user": "jovyan",
+                     "memoryperexecutor": args.executor_memory_mb, "starttime": now_ms,
+                     "state": "RUNNING", "duration": 1000})
+    if args.waiting:
+        apps.append({"id": "app-20240101000000-0001", "name": "fake-waiting", "cores": 0,
+                     "user": "jovyan", "memoryperexecutor": args.executor_memory_mb,
+                     "starttime": now_ms, "state": "WAITING", "duration": 0})
+
+    master = {
+        "url": "spark://spark-master:7077",
+        "workers": workers,
+        "aliveworkers": len(workers),
+        "cores": sum(w["cores"] for w in workers),
+        "coresused": sum(w["coresused"] for w in workers),
+        "memory": sum(w["memory"] for w in workers),
+        "memoryused": sum(w["memoryused"] for w in workers),
+        "activeapps": apps,
+        "completedapps": [],
+        "status": "ALIVE"
+    }
+    return master, pages
+
+
+def decommission(master: dict, pages: list, host: str):
+    for worker, page in zip(master["workers"], pages):
+        if worker["host"] == host:
+            worker.update(state="DECOMMISSIONED", coresused=0, memoryused=0)
+            page.update(coresused=0, memoryused=0, executors=[])
+
+
+def serve(port: int, paths: tuple, payload: dict,
+          on_kill: Optional[Callable[[str], None]] = None) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not on_kill or self.path.rstrip("/") != "/workers/kill":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            for host in parse_qs(self.rfile.read(length).decode()).get("host", []):
+                on_kill(host)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in paths:
+                self.send_error(404)
+                return
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=19090, help="master port; workers use the next ports")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--cores", type=int, default=2, help="cores per worker")
+    parser.add_argument("--memory-mb", type=int, default=2048, help="memory per worker")
+    parser.add_argument("--executor-memory-mb", type=int, default=1024)
+    parser.add_argument("--busy", type=int, default=0, help="cores in use by a running application")
+    parser.add_argument("--waiting", action="store_true", help="add an application waiting for resources")
+    args = parser.parse_args()
+
+    master, pages = build_state(args)
+    serve(args.port, ("/json", "/json/"), master, on_kill=lambda host: decommission(master, pages, host))
+    for i, page in enumerate(pages, 1):
+        serve(args.port + i, ("/json", "/json/"), page)
+    print(f"Fake Spark master on http://localhost:{args.port} with {len(pages)} worker(s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Load-test the backend API against a fake docker-compose.
+
+Starts backend/main.py with fake `docker-compose`/`docker` executables on
+PATH, simulates dashboard clients polling status, logs and the notebook
+list while one client keeps applying configuration changes, then reports
+p50/p95/p99 latency and requests/sec per endpoint.
+
+    python benchmarks/load_test.py --clients 12 --duration 30
+    python benchmarks/load_test.py --compare benchmarks/results/<earlier>.json
+
+The backend runs from a copy of the repository in a temporary directory,
+so its docker-compose.yml and .playground/ state never touch the real
+cluster's. Results are written to benchmarks/results/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+BENCH_DIR = Path(__file__).parent
+BASE_DIR = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+# Endpoints a dashboard tab polls, with their relative request weight
+POLL_ENDPOINTS = [
+    ("GET /api/cluster/status", "GET", "/api/cluster/status", 5),
+    ("GET /api/cluster/logs", "GET", "/api/cluster/logs", 3),
+    ("GET /api/notebooks/list", "GET", "/api/notebooks/list", 1),
+]
+
+
+class HttpClient:
+    """Tiny keep-alive HTTP/1.1 client so the benchmark has no dependencies"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None) -> tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Length: {len(payload)}\r\n")
+        if body is not None:
+            head += "Content-Type: application/json\r\n"
+        self.writer.write(head.encode() + b"\r\n" + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode().partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding") == "chunked":
+            content = b""
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                content += chunk[:-2]
+        else:
+            content = await self.reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, content
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+
+class Recorder:
+    """Collects per-endpoint latencies and errors"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def timed(self, client: HttpClient, name: str, method: str, path: str,
+                    body: Optional[dict] = None) -> Optional[bytes]:
+        started = time.perf_counter()
+        try:
+            status, content = await client.request(method, path, body)
+        except Exception:
+            await client.close()
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return content
+
+    def summary(self, duration: float) -> Dict[str, dict]:
+        report = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies.get(name, []))
+            report[name] = {
+                "requests": len(samples),
+                "errors": self.errors.get(name, 0),
+                "rps": round(len(samples) / duration, 2),
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+            }
+        return report
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    rank = (len(samples) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+async def dashboard_client(recorder: Recorder, host: str, port: int, deadline: float,
+                           think_time: float):
+    """One open dashboard tab polling at a weighted mix of endpoints"""
+    client = HttpClient(host, port)
+    weights = [weight for *_, weight in POLL_ENDPOINTS]
+    while time.monotonic() < deadline:
+        name, method, path, _ = random.choices(POLL_ENDPOINTS, weights)[0]
+        await recorder.timed(client, name, method, path)
+        await asyncio.sleep(random.uniform(0, think_time * 2))
+    await client.close()
+
+
+async def config_client(recorder: Recorder, host: str, port: int, deadline: float,
+                        interval: float):
+    """A user repeatedly applying worker configurations"""
+    client = HttpClient(host, port)
+    while time.monotonic() < deadline:
+        workers = [{"memory": random.choice(["512m", "1g", "2g"]), "cores": random.randint(1, 2)}
+                   for _ in range(random.randint(1, 4))]
+        await recorder.timed(client, "POST /api/cluster/config", "POST", "/api/cluster/config",
+                             {"workers": workers})
+        await asyncio.sleep(interval)
+    await client.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def install_shims(bin_dir: Path):
+    """Put docker-compose and docker wrappers around fake_docker.py on a PATH directory"""
+    for name, mode in (("docker-compose", "compose"), ("docker", "docker")):
+        shim = bin_dir / name
+        shim.write_text(
+            f'#!/bin/sh\nFAKE_DOCKER_MODE={mode} exec "{sys.executable}" "{BENCH_DIR / "fake_docker.py"}" "$@"\n'
+        )
+        shim.chmod(0o755)
+
+
+async def wait_until_ready(host: str, port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = HttpClient(host, port)
+        try:
+            status, _ = await client.request("GET", "/api/cluster/status")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            await client.close()
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Backend did not become ready")
+
+
+async def run_load(args, host: str, port: int) -> Dict[str, dict]:
+    await wait_until_ready(host, port)
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + args.duration
+    tasks = [dashboard_client(recorder, host, port, deadline, args.think_time)
+             for _ in range(args.clients)]
+    if args.config_interval > 0:
+        tasks.append(config_client(recorder, host, port, deadline, args.config_interval))
+    await asyncio.gather(*tasks)
+    return recorder.summary(time.monotonic() - started)
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> bool:
+    """Print per-endpoint deltas; returns False if any p95 regressed beyond the threshold"""
+    ok = True
+    print(f"\n{'endpoint':32} {'p95 base':>10} {'p95 now':>10} {'delta':>8} {'rps base':>9} {'rps now':>9}")
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        delta = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        flag = ""
+        if delta > threshold:
+            ok = False
+            flag = "  REGRESSION"
+        print(f"{name:32} {base['p95_ms']:>10.2f} {stats['p95_ms']:>10.2f} {delta:>7.1f}% "
+              f"{base['rps']:>9.2f} {stats['rps']:>9.2f}{flag}")
+    return ok
+
+
+def print_report(report: Dict[str, dict]):
+    print(f"\n{'endpoint':32} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in report.items():
+        print(f"{name:32} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.2f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+
+def copy_backend(root: Path) -> Path:
+    """Copy what the backend reads into ``root``, where it then writes its compose file and state"""
+    for name in ("backend", "docker", "frontend", "notebooks"):
+        shutil.copytree(BASE_DIR / name, root / name, ignore=shutil.ignore_patterns("__pycache__", "runs"))
+    return root / "backend"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=12, help="concurrent dashboard clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run the load")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean pause between polls per client")
+    parser.add_argument("--config-interval", type=float, default=5.0,
+                        help="seconds between config changes (0 disables the config client)")
+    parser.add_argument("--up-delay", type=float, default=2.0, help="fake docker-compose up duration")
+    parser.add_argument("--down-delay", type=float, default=1.0, help="fake docker-compose down duration")
+    parser.add_argument("--ps-delay", type=float, default=0.2, help="fake docker-compose ps duration")
+    parser.add_argument("--label", default="", help="free-form label stored with the results")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="p95 increase in percent that counts as a regression")
+    args = parser.parse_args()
+
+    host, port = "127.0.0.1", free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_dir = Path(tmp) / "bin"
+        bin_dir.mkdir()
+        install_shims(bin_dir)
+        backend_dir = copy_backend(Path(tmp) / "playground")
+        env = dict(
+            os.environ,
+            PATH=f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            BACKEND_HOST=host,
+            BACKEND_PORT=str(port),
+            # Force the CLI path so every docker call goes through the shim
+            DOCKER_SOCKET=str(bin_dir / "no-docker.sock"),
+            FAKE_DOCKER_STATE=str(bin_dir / "state.json"),
+            FAKE_COMPOSE_UP_DELAY=str(args.up_delay),
+            FAKE_COMPOSE_DOWN_DELAY=str(args.down_delay),
+            FAKE_COMPOSE_PS_DELAY=str(args.ps_delay),
+            # No Spark runs behind the fake docker-compose, so don't wait for it to register
+            READY_TIMEOUT="0",
+            # The random configs may ask for more than this machine has
+            PLACEMENT_MODE="off",
+        )
+        server = subprocess.Popen(
+            [sys.executable, "main.py"], cwd=backend_dir, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            report = asyncio.run(run_load(args, host, port))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    print_report(report)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    result_file = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(result_file, 'w') as f:
+        json.dump({
+            "label": args.label,
+            "created_at": datetime.now().isoformat(),
+            "settings": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+            "endpoints": report
+        }, f, indent=2)
+    print(f"\nResults written to {result_file}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)["endpoints"]
+        if not compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
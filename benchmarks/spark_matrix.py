@@ -0,0 +1,160 @@
+"""Benchmark a fixed Spark workload suite across worker topologies.
+
+Each topology is a ClusterConfig (plus an optional "name"), e.g.
+
+    [{"name": "4 small", "workers": [{"memory": "1g", "cores": 1}, ...]},
+     {"name": "1 large", "workers": [{"memory": "4g", "cores": 4}]}]
+
+For every topology the cluster is placed on the host and reconfigured
+through ClusterManager, as POST /api/cluster/config does, the suite in spark_workloads.py runs
+as a driver inside the Jupyter container, and wall time, shuffle bytes and
+executor utilization are collected into a comparison table.
+
+With --local no Docker is needed: each topology runs in local[N] mode with
+N = its total worker cores.
+
+    python benchmarks/spark_matrix.py benchmarks/topologies.example.json --local --rows 200000
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+
+import config  # noqa: E402
+from cluster_manager import ClusterManager  # noqa: E402
+from clusters import default_cluster_config  # noqa: E402
+from models import ClusterConfig  # noqa: E402
+from readiness import ReadinessProbe  # noqa: E402
+
+
+RESULTS_DIR = BENCH_DIR / "results"
+WORKLOAD_SCRIPT = BENCH_DIR / "spark_workloads.py"
+# Where ./data is mounted in the Jupyter and worker containers
+CONTAINER_DATA_DIR = "/home/jovyan/data"
+
+
+def load_topologies(path: Path) -> List[tuple[str, ClusterConfig]]:
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    topologies = []
+    for i, entry in enumerate(entries, 1):
+        name = entry.pop("name", f"topology-{i}")
+        topologies.append((name, ClusterConfig(**entry)))
+    return topologies
+
+
+async def apply_topology(manager: ClusterManager, cluster_config: ClusterConfig, timeout: float) -> ClusterConfig:
+    """Place and apply a topology as POST /api/cluster/config does, then wait for every worker to register.
+
+    Returns the config applied, which PLACEMENT_MODE=scale may have shrunk; raises if it can't be applied.
+    """
+    cluster_config, notes = manager.check_placement(cluster_config)
+    for note in notes:
+        print(f"   {note}")
+    success, message = await manager.update_cluster_config(cluster_config, wait_ready=timeout)
+    if not success:
+        raise RuntimeError(message)
+    return cluster_config
+
+
+def run_workload(command: List[str], stdin: Optional[bytes] = None) -> dict:
+    result = subprocess.run(command, input=stdin, capture_output=True)
+    for line in result.stdout.decode(errors="replace").splitlines():
+        if line.startswith("BENCH_RESULT "):
+            return json.loads(line[len("BENCH_RESULT "):])
+    raise RuntimeError(result.stderr.decode(errors="replace")[-2000:] or "Workload produced no result")
+
+
+def workload_args(args, label: str, master: str, data_dir: str) -> List[str]:
+    return ["--master", master, "--data-dir", data_dir, "--rows", str(args.rows),
+            "--seed", str(args.seed), "--jobs", args.jobs, "--label", label]
+
+
+def print_table(results: List[dict]):
+    print(f"\n{'topology':20} {'cores':>5} {'job':12} {'wall s':>8} {'shuffle MB':>11} {'spill MB':>9} {'util':>6}")
+    for entry in results:
+        if "error" in entry:
+            last_line = entry["error"].strip().splitlines()[-1] if entry["error"].strip() else "unknown"
+            print(f"{entry['topology']:20} {entry['total_cores']:>5} ERROR: {last_line[:100]}")
+            continue
+        for job, stats in entry["jobs"].items():
+            shuffle_mb = (stats["shuffle_read_bytes"] + stats["shuffle_write_bytes"]) / 1024 / 1024
+            print(f"{entry['topology']:20} {entry['total_cores']:>5} {job:12} {stats['wall_seconds']:>8.2f} "
+                  f"{shuffle_mb:>11.1f} {stats['spill_bytes'] / 1024 / 1024:>9.1f} {stats['mean_utilization']:>6.2f}")
+
+
+async def run_matrix(args) -> List[dict]:
+    manager = ClusterManager()
+    manager.readiness = ReadinessProbe(metrics_url=args.master_ui)
+    if not args.local:
+        # Pick up the applied config and the running containers as the backend does on startup,
+        # so a topology that only changes workers leaves the master and Jupyter running
+        success, message = await manager.reconcile(default_cluster_config())
+        print(message)
+        if not success:
+            raise RuntimeError(message)
+    results = []
+    for name, cluster_config in load_topologies(args.topologies):
+        workers = cluster_config.get_worker_configs()
+        total_cores = sum(w.cores for w in workers)
+        entry = {"topology": name, "total_cores": total_cores,
+                 "workers": [w.model_dump() for w in workers]}
+        print(f"== {name}: {len(workers)} worker(s), {total_cores} core(s)")
+        try:
+            if args.local:
+                command = [sys.executable, str(WORKLOAD_SCRIPT),
+                           *workload_args(args, name, f"local[{total_cores}]", str(config.DATA_DIR / "bench"))]
+                entry.update(run_workload(command))
+            else:
+                applied = await apply_topology(manager, cluster_config, args.ready_timeout)
+                if applied != cluster_config:
+                    workers = applied.get_worker_configs()
+                    entry.update(total_cores=sum(w.cores for w in workers), workers=[w.model_dump() for w in workers])
+                # The driver runs in the Jupyter container so executors can reach it
+                command = ["docker", "exec", "-i", args.jupyter_container, "python", "-",
+                           *workload_args(args, name, "spark://spark-master:7077", f"{CONTAINER_DATA_DIR}/bench")]
+                entry.update(run_workload(command, stdin=WORKLOAD_SCRIPT.read_bytes()))
+        except Exception as e:
+            entry["error"] = str(e)
+        results.append(entry)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("topologies", type=Path, help="JSON list of cluster configurations")
+    parser.add_argument("--local", action="store_true", help="run in local[N] mode without Docker")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="rows in the synthetic fact table")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", default="scan,aggregation,join,shuffle,ml")
+    parser.add_argument("--master-ui", default="http://localhost:9090")
+    parser.add_argument("--jupyter-container", default="jupyter")
+    parser.add_argument("--ready-timeout", type=float, default=180)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_matrix(args))
+    print_table(results)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    result_file = RESULTS_DIR / f"spark_matrix_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(result_file, 'w') as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(),
+            "mode": "local" if args.local else "cluster",
+            "rows": args.rows,
+            "seed": args.seed,
+            "results": results
+        }, f, indent=2)
+    print(f"\nResults written to {result_file}")
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
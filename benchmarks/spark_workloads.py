@@ -0,0 +1,213 @@
+"""Fixed Spark workload suite used by spark_matrix.py.
+
+Runs as a Spark driver (locally or inside the Jupyter container), builds a
+reproducible synthetic dataset under --data-dir if it is not there yet,
+runs each job and prints one line "BENCH_RESULT <json>" with wall time,
+shuffle bytes and per-executor utilization per job.
+"""
+import argparse
+import json
+import time
+import urllib.request
+from typing import Callable, Dict, List
+
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+
+
+JOBS = ["scan", "aggregation", "join", "shuffle", "ml"]
+
+
+def hashed(column: str, seed: int, salt: str) -> "F.Column":
+    """Deterministic pseudo-random non-negative long that does not depend on partitioning"""
+    return F.abs(F.xxhash64(F.col(column), F.lit(seed), F.lit(salt)))
+
+
+def ensure_dataset(spark: SparkSession, data_dir: str, rows: int, seed: int) -> Dict[str, str]:
+    """Write the facts, dimension and houses tables once per (rows, seed)"""
+    base = f"{data_dir.rstrip('/')}/rows={rows}_seed={seed}"
+    paths = {name: f"{base}/{name}" for name in ("facts", "dims", "houses")}
+    try:
+        spark.read.parquet(paths["houses"]).limit(1).collect()
+        return paths
+    except Exception:
+        pass
+
+    ids = spark.range(rows)
+    facts = ids.select(
+        F.col("id"),
+        (hashed("id", seed, "key") % 10000).alias("key"),
+        (hashed("id", seed, "category") % 50).alias("category"),
+        ((hashed("id", seed, "value") % 1000000) / 100.0).alias("value"),
+        F.sha2(F.col("id").cast("string"), 256).alias("payload")
+    )
+    facts.write.mode("overwrite").parquet(paths["facts"])
+
+    dims = spark.range(10000).select(
+        F.col("id").alias("key"),
+        F.concat(F.lit("dim-"), F.col("id")).alias("label"),
+        (hashed("id", seed, "weight") % 100).alias("weight")
+    )
+    dims.write.mode("overwrite").parquet(paths["dims"])
+
+    # Scaled-up version of the house data in notebooks/templates/ml_example.ipynb
+    houses = ids.select(
+        (hashed("id", seed, "bedrooms") % 5 + 1).alias("bedrooms"),
+        (hashed("id", seed, "bathrooms") % 4 + 1).alias("bathrooms"),
+        (hashed("id", seed, "sqft") % 3000 + 600).alias("sqft"),
+        (hashed("id", seed, "age") % 40).alias("age"),
+        (hashed("id", seed, "noise") % 50000).alias("noise")
+    ).withColumn(
+        "price",
+        F.col("sqft") * 150 + F.col("bedrooms") * 20000 + F.col("bathrooms") * 15000
+        - F.col("age") * 2500 + F.col("noise")
+    ).drop("noise")
+    houses.write.mode("overwrite").parquet(paths["houses"])
+    return paths
+
+
+def job_scan(spark: SparkSession, paths: Dict[str, str]):
+    spark.read.parquet(paths["facts"]).agg(F.sum("value"), F.max(F.length("payload"))).collect()
+
+
+def job_aggregation(spark: SparkSession, paths: Dict[str, str]):
+    (spark.read.parquet(paths["facts"])
+        .groupBy("key", "category")
+        .agg(F.count("*"), F.avg("value"), F.stddev("value"))
+        .write.format("noop").mode("overwrite").save())
+
+
+def job_join(spark: SparkSession, paths: Dict[str, str]):
+    facts = spark.read.parquet(paths["facts"])
+    # Disable broadcast for this job so the join really shuffles both sides
+    spark.conf.set("spark.sql.autoBroadcastJoinThreshold", "-1")
+    try:
+        (facts.join(spark.read.parquet(paths["dims"]), "key")
+            .groupBy("label").agg(F.sum(F.col("value") * F.col("weight")))
+            .write.format("noop").mode("overwrite").save())
+    finally:
+        spark.conf.unset("spark.sql.autoBroadcastJoinThreshold")
+
+
+def job_shuffle(spark: SparkSession, paths: Dict[str, str]):
+    (spark.read.parquet(paths["facts"])
+        .repartition(F.col("payload"))
+        .orderBy("value", "payload")
+        .write.format("noop").mode("overwrite").save())
+
+
+def job_ml(spark: SparkSession, paths: Dict[str, str]):
+    """The pipeline from ml_example.ipynb: assemble, scale, fit linear regression, evaluate"""
+    from pyspark.ml.evaluation import RegressionEvaluator
+    from pyspark.ml.feature import StandardScaler, VectorAssembler
+    from pyspark.ml.regression import LinearRegression
+
+    df = spark.read.parquet(paths["houses"])
+    assembler = VectorAssembler(inputCols=["bedrooms", "bathrooms", "sqft", "age"], outputCol="raw_features")
+    df_assembled = assembler.transform(df)
+    scaler_model = StandardScaler(inputCol="raw_features", outputCol="features",
+                                  withStd=True, withMean=True).fit(df_assembled)
+    df_scaled = scaler_model.transform(df_assembled)
+    train_data, test_data = df_scaled.randomSplit([0.8, 0.2], seed=42)
+    lr_model = LinearRegression(featuresCol="features", labelCol="price", maxIter=100,
+                                regParam=0.1, elasticNetParam=0.8).fit(train_data)
+    RegressionEvaluator(labelCol="price", predictionCol="prediction",
+                        metricName="rmse").evaluate(lr_model.transform(test_data))
+
+
+JOB_FUNCTIONS: Dict[str, Callable[[SparkSession, Dict[str, str]], None]] = {
+    "scan": job_scan,
+    "aggregation": job_aggregation,
+    "join": job_join,
+    "shuffle": job_shuffle,
+    "ml": job_ml,
+}
+
+
+class StatusApi:
+    """Reads job, stage and executor metrics from the driver's REST API"""
+
+    def __init__(self, spark: SparkSession):
+        self.ui_url = spark.sparkContext.uiWebUrl
+        self.app_id = spark.sparkContext.applicationId
+
+    def get(self, path: str):
+        with urllib.request.urlopen(f"{self.ui_url}/api/v1/applications/{self.app_id}{path}", timeout=10) as resp:
+            return json.load(resp)
+
+    def executors(self) -> Dict[str, dict]:
+        return {e["id"]: e for e in self.get("/executors")}
+
+    def group_stage_ids(self, group: str) -> List[int]:
+        # The listener may lag slightly behind the action returning
+        deadline = time.monotonic() + 10
+        while True:
+            jobs = [j for j in self.get("/jobs") if j.get("jobGroup") == group]
+            if jobs and all(j["status"] != "RUNNING" for j in jobs) or time.monotonic() > deadline:
+                return [stage_id for j in jobs for stage_id in j["stageIds"]]
+            time.sleep(0.2)
+
+    def shuffle_bytes(self, stage_ids: List[int]) -> Dict[str, int]:
+        wanted = set(stage_ids)
+        stages = [s for s in self.get("/stages") if s["stageId"] in wanted]
+        return {
+            "shuffle_read_bytes": sum(s.get("shuffleReadBytes", 0) for s in stages),
+            "shuffle_write_bytes": sum(s.get("shuffleWriteBytes", 0) for s in stages),
+            "spill_bytes": sum(s.get("diskBytesSpilled", 0) for s in stages),
+        }
+
+
+def utilization(before: Dict[str, dict], after: Dict[str, dict], wall: float) -> Dict[str, float]:
+    """Fraction of each executor's core-time spent running tasks during the job"""
+    executors = {k: v for k, v in after.items() if k != "driver"} or after
+    result = {}
+    for executor_id, stats in executors.items():
+        busy_ms = stats.get("totalDuration", 0) - before.get(executor_id, {}).get("totalDuration", 0)
+        cores = max(stats.get("totalCores", 1), 1)
+        result[executor_id] = round(busy_ms / 1000 / (wall * cores), 3) if wall > 0 else 0.0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--master", required=True)
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", default=",".join(JOBS))
+    parser.add_argument("--label", default="benchmark")
+    args = parser.parse_args()
+
+    spark = (SparkSession.builder
+             .appName(f"benchmark-{args.label}")
+             .master(args.master)
+             .getOrCreate())
+    spark.sparkContext.setLogLevel("WARN")
+    api = StatusApi(spark)
+
+    dataset_started = time.perf_counter()
+    paths = ensure_dataset(spark, args.data_dir, args.rows, args.seed)
+    results = {"label": args.label, "dataset_seconds": round(time.perf_counter() - dataset_started, 3),
+               "default_parallelism": spark.sparkContext.defaultParallelism, "jobs": {}}
+
+    for name in args.jobs.split(","):
+        spark.sparkContext.setJobGroup(name, f"benchmark {name}")
+        before = api.executors()
+        started = time.perf_counter()
+        JOB_FUNCTIONS[name](spark, paths)
+        wall = time.perf_counter() - started
+        after = api.executors()
+        per_executor = utilization(before, after, wall)
+        results["jobs"][name] = {
+            "wall_seconds": round(wall, 3),
+            **api.shuffle_bytes(api.group_stage_ids(name)),
+            "executor_utilization": per_executor,
+            "mean_utilization": round(sum(per_executor.values()) / len(per_executor), 3) if per_executor else 0.0,
+        }
+
+    spark.stop()
+    print("BENCH_RESULT " + json.dumps(results), flush=True)
+
+
+if __name__ == "__main__":
+    main()
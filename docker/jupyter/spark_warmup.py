@@ -0,0 +1,76 @@
+"""IPython startup hook: build the kernel's SparkSession before the first cell runs.
+
+Installed into the Jupyter image's default IPython profile. The backend turns it
+on and off through warmup.json, which it writes next to spark-defaults.conf in
+SPARK_CONF_DIR, so the session gets the cluster's tuning. The session is built
+on a background thread; a notebook's own ``SparkSession.builder...getOrCreate()``
+then returns it, waiting only for whatever part of the startup is left.
+
+Dynamic allocation with no minimum lets an idle kernel give its executors back,
+so warm kernels don't hold the cluster's cores between cells.
+"""
+
+
+def _playground_warmup(shell):
+    # Startup files run in the notebook's namespace; keep every helper local
+    import atexit
+    import json
+    import os
+    import threading
+    import time
+    from datetime import datetime
+
+    try:
+        with open(os.path.join(os.environ["SPARK_CONF_DIR"], "warmup.json")) as f:
+            settings = json.load(f)
+    except (KeyError, OSError, ValueError):
+        return
+    if not settings.get("enabled"):
+        return
+
+    try:
+        from ipykernel.connect import get_connection_file
+        kernel_id = os.path.basename(get_connection_file())[len("kernel-"):-len(".json")]
+    except Exception:
+        kernel_id = f"pid-{os.getpid()}"
+    stats_dir = os.environ.get("PLAYGROUND_KERNEL_DIR")
+    path = os.path.join(stats_dir, f"{kernel_id}.json") if stats_dir else None
+    record = {"kernel_id": kernel_id, "status": "warming", "started_at": datetime.now().isoformat()}
+
+    def write_record():
+        if not path:
+            return
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def remove_record():
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def warm_up():
+        started = time.monotonic()
+        try:
+            from pyspark.sql import SparkSession
+            builder = SparkSession.builder.master(settings["master"]).appName(settings["app_name"])
+            for key, value in settings.get("conf", {}).items():
+                builder = builder.config(key, value)
+            spark = builder.getOrCreate()
+            shell.user_ns.setdefault("spark", spark)
+            record.update(status="ready", app_id=spark.sparkContext.applicationId)
+        except Exception as e:
+            record.update(status="failed", error=str(e).splitlines()[0] if str(e) else type(e).__name__)
+        record["warm_seconds"] = round(time.monotonic() - started, 3)
+        write_record()
+
+    write_record()
+    atexit.register(remove_record)
+    threading.Thread(target=warm_up, name="spark-warmup", daemon=True).start()
+
+
+_playground_warmup(get_ipython())  # noqa: F821 (defined when IPython runs startup files)
+del _playground_warmup
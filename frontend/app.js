@@ -13,15 +13,68 @@ document.addEventListener('DOMContentLoaded', () => {
     refreshNotebooks();
     refreshLogs();
     renderWorkers();
+    loadClusterConfig();
 
-    // Auto-refresh status every 5 seconds
-    setInterval(refreshClusterStatus, 5000);
+    // Receive status and log changes as they happen, polling only as a fallback
+    connectEvents();
+});
+
+// Live Updates
+let eventSource = null;
+let statusPoller = null;
+let logsPoller = null;
+
+function connectEvents() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    eventSource = new EventSource(`${API_BASE}/api/cluster/events`);
+
+    eventSource.addEventListener('status', (event) => {
+        renderClusterStatus(JSON.parse(event.data));
+    });
+
+    eventSource.addEventListener('logs', (event) => {
+        applyLogPage(JSON.parse(event.data));
+    });
 
+    eventSource.onopen = () => {
+        stopPolling();
+    };
+
+    eventSource.onerror = () => {
+        // Keep the dashboard fresh while the stream is down
+        startPolling();
+        if (eventSource.readyState === EventSource.CLOSED) {
+            eventSource = null;
+            setTimeout(connectEvents, 10000);
+        }
+    };
+}
+
+function startPolling() {
+    if (statusPoller) {
+        return;
+    }
+    // Auto-refresh status every 5 seconds
+    statusPoller = setInterval(refreshClusterStatus, 5000);
     // Auto-refresh logs every 3 seconds
-    setInterval(refreshLogs, 3000);
-});
+    logsPoller = setInterval(refreshLogs, 3000);
+}
+
+function stopPolling() {
+    clearInterval(statusPoller);
+    clearInterval(logsPoller);
+    statusPoller = null;
+    logsPoller = null;
+}
 
 // Worker Management
+// Shapes offered in the worker table; others (e.g. scaled to fit the host) are shown as-is
+const MEMORY_OPTIONS = ['512m', '1g', '2g', '4g', '8g'];
+
 function renderWorkers() {
     const tbody = document.getElementById('workersTableBody');
     tbody.innerHTML = '';
@@ -32,6 +85,7 @@ function renderWorkers() {
             <td><strong>Worker ${index + 1}</strong></td>
             <td>
                 <select class="form-control-small" onchange="updateWorker(${index}, 'memory', this.value)">
+                    ${MEMORY_OPTIONS.includes(worker.memory) ? '' : `<option value="${worker.memory}" selected>${worker.memory}</option>`}
                     <option value="512m" ${worker.memory === '512m' ? 'selected' : ''}>512 MB</option>
                     <option value="1g" ${worker.memory === '1g' ? 'selected' : ''}>1 GB</option>
                     <option value="2g" ${worker.memory === '2g' ? 'selected' : ''}>2 GB</option>
@@ -85,30 +139,55 @@ async function refreshClusterStatus() {
     try {
         const response = await fetch(`${API_BASE}/api/cluster/status`);
         const status = await response.json();
+        renderClusterStatus(status);
+    } catch (error) {
+        console.error('Error fetching cluster status:', error);
+    }
+}
 
-        // Update status indicator
-        const statusEl = document.getElementById('clusterStatus');
-        if (status.running) {
-            statusEl.innerHTML = '<span class="status-badge status-online">Online</span>';
-            document.getElementById('masterLink').classList.remove('disabled');
-        } else {
-            statusEl.innerHTML = '<span class="status-badge status-offline">Offline</span>';
-            document.getElementById('masterLink').classList.add('disabled');
-        }
+function renderClusterStatus(status) {
+    // Update status indicator
+    const statusEl = document.getElementById('clusterStatus');
+    const startup = status.startup;
+    if (status.running && startup && !startup.ready) {
+        // Containers are up but Spark or Jupyter is not usable yet
+        const ready = startup.components.filter(c => c.ready).length;
+        const label = startup.timed_out ? 'Not Ready' : `Starting ${ready}/${startup.components.length}`;
+        statusEl.innerHTML = `<span class="status-badge status-starting">${label}</span>`;
+        document.getElementById('masterLink').classList.remove('disabled');
+    } else if (status.running) {
+        statusEl.innerHTML = '<span class="status-badge status-online">Online</span>';
+        document.getElementById('masterLink').classList.remove('disabled');
+    } else {
+        statusEl.innerHTML = '<span class="status-badge status-offline">Offline</span>';
+        document.getElementById('masterLink').classList.add('disabled');
+    }
 
-        // Update worker count
-        document.getElementById('workerCount').textContent = status.worker_count;
+    // Update worker count
+    document.getElementById('workerCount').textContent = status.worker_count;
 
-        // Animate refresh icon
-        const refreshIcon = document.getElementById('refreshIcon');
-        refreshIcon.style.transform = 'rotate(360deg)';
-        setTimeout(() => {
-            refreshIcon.style.transform = 'rotate(0deg)';
-        }, 500);
+    // Update utilization reported by the Spark master
+    document.getElementById('clusterUtilization').textContent = formatUtilization(status.utilization);
 
-    } catch (error) {
-        console.error('Error fetching cluster status:', error);
+    // Animate refresh icon
+    const refreshIcon = document.getElementById('refreshIcon');
+    refreshIcon.style.transform = 'rotate(360deg)';
+    setTimeout(() => {
+        refreshIcon.style.transform = 'rotate(0deg)';
+    }, 500);
+}
+
+function formatUtilization(utilization) {
+    if (!utilization) {
+        return '-';
     }
+    if (utilization.state === 'unreachable') {
+        return 'Master unreachable';
+    }
+    const memoryGb = (mb) => (mb / 1024).toFixed(1);
+    return `${utilization.state}: ${utilization.cores_used}/${utilization.cores_total} cores, ` +
+        `${memoryGb(utilization.memory_used_mb)}/${memoryGb(utilization.memory_total_mb)} GB, ` +
+        `${utilization.running_applications} app(s), ${utilization.active_executors} executor(s)`;
 }
 
 async function startCluster() {
@@ -119,9 +198,9 @@ async function startCluster() {
         });
 
         if (response.ok) {
+            const result = await response.json();
             showToast('✓ Cluster start initiated', 'success');
-            setTimeout(refreshClusterStatus, 2000);
-            setTimeout(refreshLogs, 1000);
+            trackJob(result.data.job_id, 'Cluster start');
         } else {
             const error = await response.json();
             showToast(`✗ Failed to start cluster: ${error.detail}`, 'error');
@@ -145,9 +224,9 @@ async function stopCluster() {
         });
 
         if (response.ok) {
-            showToast('✓ Cluster stopped successfully', 'success');
-            setTimeout(refreshClusterStatus, 2000);
-            setTimeout(refreshLogs, 1000);
+            const result = await response.json();
+            showToast('✓ Cluster stop initiated', 'success');
+            trackJob(result.data.job_id, 'Cluster stop');
         } else {
             const error = await response.json();
             showToast(`✗ Failed to stop cluster: ${error.detail}`, 'error');
@@ -159,12 +238,44 @@ async function stopCluster() {
     }
 }
 
+// Applied Configuration
+// Settings without a control in the UI (spark_conf, shuffle_service, ...) are sent back unchanged
+let clusterSettings = {};
+
+async function loadClusterConfig() {
+    try {
+        const [configResponse, defaultsResponse] = await Promise.all([
+            fetch(`${API_BASE}/api/cluster/config`),
+            fetch(`${API_BASE}/api/cluster/spark-defaults`)
+        ]);
+        const { workers: appliedWorkers, ...settings } = await configResponse.json();
+        const defaults = await defaultsResponse.json();
+        clusterSettings = settings;
+        if (appliedWorkers && appliedWorkers.length > 0) {
+            workers = appliedWorkers;
+            renderWorkers();
+        }
+
+        const select = document.getElementById('sparkProfile');
+        select.innerHTML = defaults.profiles.map(profile =>
+            `<option value="${escapeHtml(profile)}">${escapeHtml(profile)}</option>`
+        ).join('');
+        select.value = defaults.profile;
+        document.getElementById('kernelWarmup').checked = Boolean(settings.kernel_warmup);
+        document.getElementById('connectServer').checked = Boolean(settings.connect_server);
+    } catch (error) {
+        console.error('Error loading cluster configuration:', error);
+    }
+}
+
 async function applyConfig() {
     const config = {
-        workers: workers.map(w => ({
-            memory: w.memory,
-            cores: w.cores
-        }))
+        ...clusterSettings,
+        // Keep per-worker settings such as local_dirs
+        workers: workers.map(w => ({ ...w })),
+        spark_profile: document.getElementById('sparkProfile').value,
+        kernel_warmup: document.getElementById('kernelWarmup').checked,
+        connect_server: document.getElementById('connectServer').checked
     };
 
     console.log('Applying config:', config);
@@ -182,8 +293,10 @@ async function applyConfig() {
         if (response.ok) {
             const result = await response.json();
             showToast(`✓ ${result.message}`, 'success');
-            setTimeout(refreshClusterStatus, 3000);
-            setTimeout(refreshLogs, 1000);
+            // Workers may have been scaled down to fit the host
+            workers = result.data.workers;
+            renderWorkers();
+            trackJob(result.data.job_id, 'Configuration');
         } else {
             const error = await response.json();
             const errorMsg = typeof error.detail === 'string'
@@ -201,34 +314,121 @@ async function applyConfig() {
     }
 }
 
-// Logs Management
-async function refreshLogs() {
-    try {
-        const response = await fetch(`${API_BASE}/api/cluster/logs`);
-        const data = await response.json();
+// Background Jobs
+const trackedJobs = new Set();
 
-        const logsContainer = document.getElementById('logsContainer');
+async function trackJob(jobId, label) {
+    // Rapid repeated requests may be merged into the same job
+    if (trackedJobs.has(jobId)) {
+        return;
+    }
+    trackedJobs.add(jobId);
 
-        if (data.logs && data.logs.length > 0) {
-            logsContainer.innerHTML = data.logs.map(log =>
-                `<div class="log-entry">${escapeHtml(log)}</div>`
-            ).join('');
+    try {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const response = await fetch(`${API_BASE}/api/jobs/${jobId}`);
+            if (!response.ok) {
+                break;
+            }
+
+            const job = await response.json();
+            if (!eventSource || eventSource.readyState !== EventSource.OPEN) {
+                refreshLogs();
+            }
+            if (job.status === 'succeeded') {
+                showToast(`✓ ${label} finished: ${job.message}`, 'success');
+                break;
+            }
+            if (job.status === 'failed' || job.status === 'cancelled') {
+                showToast(`✗ ${label} failed: ${job.message}`, 'error');
+                break;
+            }
+        }
+    } catch (error) {
+        console.error('Error tracking job:', error);
+    } finally {
+        trackedJobs.delete(jobId);
+        refreshClusterStatus();
+    }
+}
 
-            // Auto-scroll to bottom
-            logsContainer.scrollTop = logsContainer.scrollHeight;
-        } else {
-            logsContainer.innerHTML = '<div class="logs-empty">No logs yet. Logs will appear when you perform cluster operations.</div>';
+// Logs Management
+// Entries shown in the panel, and the cursor to fetch newer ones after
+const LOG_DISPLAY_LIMIT = 500;
+let logEntries = [];
+let logsCursor = null;
+
+async function refreshLogs() {
+    try {
+        const params = new URLSearchParams();
+        if (logsCursor !== null) {
+            params.set('since', logsCursor);
         }
+        const response = await fetch(`${API_BASE}/api/cluster/logs?${params}`);
+        const page = await response.json();
+        // Without a cursor the server returns the latest entries
+        page.reset = page.reset || logsCursor === null || page.gap;
+        applyLogPage(page);
     } catch (error) {
         console.error('Error fetching logs:', error);
     }
 }
 
+function applyLogPage(page) {
+    if (page.reset) {
+        logEntries = [];
+    }
+    // The stream may repeat entries the initial page already carried
+    const lastSeq = logEntries.length ? logEntries[logEntries.length - 1].seq : 0;
+    logEntries = logEntries.concat(page.entries.filter(entry => entry.seq > lastSeq)).slice(-LOG_DISPLAY_LIMIT);
+    logsCursor = page.cursor;
+    renderLogSources(page.sources);
+    renderLogs();
+}
+
+function renderLogSources(sources) {
+    const select = document.getElementById('logSource');
+    const selected = select.value;
+    const options = ['', ...sources];
+    if (selected && !options.includes(selected)) {
+        options.push(selected);
+    }
+    select.innerHTML = options.map(source =>
+        `<option value="${escapeHtml(source)}">${source ? escapeHtml(source) : 'All sources'}</option>`
+    ).join('');
+    select.value = selected;
+}
+
+function changeLogSource() {
+    renderLogs();
+}
+
+function renderLogs() {
+    const logsContainer = document.getElementById('logsContainer');
+    const source = document.getElementById('logSource').value;
+    const logs = source ? logEntries.filter(entry => entry.source === source) : logEntries;
+
+    if (logs.length > 0) {
+        logsContainer.innerHTML = logs.map(entry =>
+            `<div class="log-entry log-${entry.level}">` +
+            `<span class="log-source">${escapeHtml(entry.timestamp.slice(11, 19))} ${escapeHtml(entry.source)}</span>` +
+            `${escapeHtml(entry.message)}</div>`
+        ).join('');
+
+        // Auto-scroll to bottom
+        logsContainer.scrollTop = logsContainer.scrollHeight;
+    } else {
+        logsContainer.innerHTML = '<div class="logs-empty">No logs yet. Logs will appear when you perform cluster operations.</div>';
+    }
+}
+
 async function clearLogs() {
     try {
         await fetch(`${API_BASE}/api/cluster/logs/clear`, {
             method: 'POST'
         });
+        logsCursor = null;
         refreshLogs();
         showToast('✓ Logs cleared', 'success');
     } catch (error) {
@@ -237,26 +437,43 @@ async function clearLogs() {
 }
 
 // Notebook Management
-async function refreshNotebooks() {
+const NOTEBOOK_PAGE_SIZE = 50;
+let notebooksCursor = null;
+
+function renderNotebookItem(nb) {
+    return `
+        <div class="notebook-item">
+            <div class="notebook-info">
+                <div class="notebook-name">${escapeHtml(nb.name)}</div>
+                <div class="notebook-meta">Template: ${escapeHtml(nb.template)} • Created: ${new Date(nb.created_at).toLocaleString()}</div>
+            </div>
+            <div class="notebook-actions">
+                <button class="btn-icon" onclick="openNotebook('${nb.id}')" title="Open">📂</button>
+                <button class="btn-icon btn-delete" onclick="deleteNotebook('${nb.id}')" title="Delete">🗑️</button>
+            </div>
+        </div>
+    `;
+}
+
+async function refreshNotebooks(append = false) {
     try {
-        const response = await fetch(`${API_BASE}/api/notebooks/list`);
+        const params = new URLSearchParams({ limit: NOTEBOOK_PAGE_SIZE });
+        if (append && notebooksCursor) {
+            params.set('cursor', notebooksCursor);
+        }
+        const response = await fetch(`${API_BASE}/api/notebooks/list?${params}`);
         const data = await response.json();
 
         const listEl = document.getElementById('notebookList');
-
-        if (data.notebooks && data.notebooks.length > 0) {
-            listEl.innerHTML = data.notebooks.map(nb => `
-                <div class="notebook-item">
-                    <div class="notebook-info">
-                        <div class="notebook-name">${escapeHtml(nb.name)}</div>
-                        <div class="notebook-meta">Template: ${escapeHtml(nb.template)} • Created: ${new Date(nb.created_at).toLocaleString()}</div>
-                    </div>
-                    <div class="notebook-actions">
-                        <button class="btn-icon" onclick="openNotebook('${nb.id}')" title="Open">📂</button>
-                        <button class="btn-icon btn-delete" onclick="deleteNotebook('${nb.id}')" title="Delete">🗑️</button>
-                    </div>
-                </div>
-            `).join('');
+        const existing = append ? listEl.querySelectorAll('.notebook-item') : [];
+        notebooksCursor = data.next_cursor;
+
+        if (existing.length > 0 || (data.notebooks && data.notebooks.length > 0)) {
+            const previous = Array.from(existing).map(el => el.outerHTML).join('');
+            const loadMore = notebooksCursor
+                ? `<button class="btn-small" onclick="refreshNotebooks(true)">Load more (${data.total - existing.length - data.notebooks.length} left)</button>`
+                : '';
+            listEl.innerHTML = previous + data.notebooks.map(renderNotebookItem).join('') + loadMore;
         } else {
             listEl.innerHTML = '<p class="empty-state">No notebooks created yet.</p>';
         }
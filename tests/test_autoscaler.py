@@ -0,0 +1,98 @@
+"""Autoscaler scale-down against the stand-in Spark master in benchmarks/fake_spark.py"""
+import asyncio
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import config
+import compose_model
+import fake_spark
+from autoscaler import Autoscaler
+from cluster_layout import ClusterLayout, port_in_use
+from cluster_manager import ClusterManager
+from models import AutoscalePolicy, ClusterConfig, ClusterPorts, ClusterStatus, WorkerConfig
+from status_cache import StatusCache
+
+
+class RecordingJobManager:
+    """Records the worker lists the autoscaler would apply instead of running docker-compose"""
+
+    def __init__(self):
+        self.scaled = []
+
+    def is_busy(self, cluster_id=None) -> bool:
+        return False
+
+    def submit(self, kind, run, cluster_id=None, **kwargs):
+        self.scaled.append(kind)
+
+
+def free_port_block(count: int, start: int = 19100) -> int:
+    for base in range(start, start + 2000, count):
+        if not any(port_in_use(port) for port in range(base, base + count)):
+            return base
+    raise RuntimeError("no free ports for the fake Spark master")
+
+
+def start_fake_spark(workers: int, cores: int, busy: int) -> tuple[int, list]:
+    port = free_port_block(workers + 1)
+    args = Namespace(port=port, workers=workers, cores=cores, memory_mb=2048, executor_memory_mb=1024,
+                     busy=busy, waiting=False)
+    master, pages = fake_spark.build_state(args)
+    servers = [fake_spark.serve(port, ("/json", "/json/"), master,
+                                on_kill=lambda host: fake_spark.decommission(master, pages, host))]
+    servers += [fake_spark.serve(port + i, ("/json", "/json/"), page) for i, page in enumerate(pages, 1)]
+    return port, servers
+
+
+def test_scale_down_drains_and_retires_the_last_worker():
+    # Every worker runs an executor, so spark-worker-3 has to drain before it is removed
+    port, servers = start_fake_spark(workers=3, cores=2, busy=6)
+    try:
+        # The master UI and worker UIs sit where the fake serves them; the other ports are unused
+        ports = ClusterPorts(master=port - 6, master_ui=port, jupyter=port - 5, history=port - 4,
+                             connect=port - 3, connect_ui=port - 2, worker_ui_base=port)
+        manager = ClusterManager(ClusterLayout("autoscale-test", ports))
+        manager.config = ClusterConfig(workers=[WorkerConfig(memory="2g", cores=2) for _ in range(3)])
+        status_cache = StatusCache(manager)
+        status_cache.snapshot = ClusterStatus(running=True, worker_count=3)
+        jobs = RecordingJobManager()
+        log = []
+        autoscaler = Autoscaler(manager, status_cache, jobs, log.append)
+        autoscaler.policy = AutoscalePolicy(enabled=True, min_workers=1, max_workers=2)
+
+        async def run():
+            status_cache.utilization = await status_cache.spark_metrics.poll()
+            # decide() asks for one worker less; _start_drain decommissions spark-worker-3
+            await autoscaler.evaluate()
+            assert autoscaler.draining == 3, log
+            assert not jobs.scaled
+            # The snapshot taken before the decommission still shows its executor
+            await autoscaler.evaluate()
+            assert "waiting for spark-worker-3" in autoscaler.last_decision
+            assert not jobs.scaled
+            # The master moved the executor off; _continue_drain retires the worker
+            status_cache.utilization = await status_cache.spark_metrics.poll()
+            worker = next(w for w in status_cache.utilization.workers if w.ui_url.endswith(f":{port + 3}"))
+            assert worker.state == "DECOMMISSIONED"
+            await autoscaler.evaluate()
+            assert autoscaler.draining is None
+            assert jobs.scaled == ["autoscale"]
+
+        asyncio.run(run())
+        assert not any("could not decommission" in line for line in log)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+def test_compose_enables_decommissioning():
+    template = config.DOCKER_COMPOSE_TEMPLATE.read_text()
+    assert "-Dspark.master.ui.decommission.allow.mode=ALLOW" in template
+    service = compose_model.worker_service(ClusterLayout(), 1, WorkerConfig(), "spark-worker:test")
+    opts = next(env for env in service["environment"] if env.startswith("SPARK_WORKER_OPTS="))
+    assert "-Dspark.decommission.enabled=true" in opts
@@ -0,0 +1,79 @@
+"""DockerClient against the stand-in Engine API in benchmarks/fake_docker_socket.py"""
+import http.client
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import fake_docker_socket
+from docker_client import DockerAPIError, DockerClient
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = fake_docker_socket.serve(str(tmp_path / "docker.sock"), ["spark-master", "spark-worker-1"])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(daemon):
+    client = DockerClient(socket_path=daemon.server_address, pool_size=2, timeout=5)
+    yield client
+    client.close()
+
+
+def test_requests_reuse_a_pooled_connection(daemon, client):
+    assert client.ping()
+    assert len(client.list_containers()) == 2
+    assert client.inspect_container("spark-master")["State"]["Status"] == "running"
+    assert daemon.connections == 1
+    assert {conn for conn, _, _ in daemon.requests} == {1}
+
+
+def test_connection_closed_by_the_daemon_is_replaced(daemon, client):
+    daemon.drop_idle = True
+    assert client.ping()
+    # The pooled connection is closed on the daemon's side by now; it is dropped, not reused
+    assert len(client.list_containers()) == 2
+    client.stop_container("spark-worker-1")
+    assert daemon.containers["spark-worker-1"] == "exited"
+    assert daemon.connections == 3
+    assert daemon.count("POST", "/containers/spark-worker-1/stop") == 1
+
+
+def test_idempotent_request_is_retried_after_a_hang_up(daemon, client):
+    daemon.hang_up.add("/containers/spark-master/json")
+    with pytest.raises((http.client.HTTPException, ConnectionError)):
+        client.inspect_container("spark-master")
+    # Sent once on the pooled connection and once more on a fresh one
+    assert daemon.count("GET", "/containers/spark-master/json") == 2
+
+
+def test_non_idempotent_request_is_not_resent(daemon, client):
+    assert client.ping()
+    daemon.hang_up.add("/containers/spark-worker-1/stop")
+    with pytest.raises((http.client.HTTPException, ConnectionError)):
+        client.stop_container("spark-worker-1")
+    assert daemon.count("POST", "/containers/spark-worker-1/stop") == 1
+
+
+def test_error_responses_map_to_results_and_exceptions(daemon, client):
+    assert client.inspect_container("missing") is None
+    client.stop_container("missing")  # 404 on stop means there is nothing to stop
+    client.start_container("spark-master")  # 304: already running
+    with pytest.raises(DockerAPIError) as excinfo:
+        client._request("POST", "/containers/spark-master/pause")
+    assert excinfo.value.status == 500
+    assert "unsupported" in excinfo.value.message
+    client.remove_container("spark-worker-1")
+    assert "spark-worker-1" not in daemon.containers
+
+
+def test_unreachable_daemon_is_reported_unavailable(tmp_path):
+    assert not DockerClient(socket_path=str(tmp_path / "missing.sock"), timeout=1).available()